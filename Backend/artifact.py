@@ -0,0 +1,214 @@
+"""
+Memory-mapped model artifacts
+
+    python artifact.py export rf_model_k2_dispo.pkl   # writes rf_model_k2_dispo.artifact
+    python artifact.py inspect rf_model_k2_dispo.artifact
+    python artifact.py verify rf_model_k2_dispo.artifact
+
+An artifact holds the same dict as a model .pkl (model, scaler, label
+encoder, feature_names, feature_means), split in three parts:
+
+    magic (8 bytes) | header length (8 bytes, little endian) | JSON header
+    | object skeleton | array blobs, each starting on a 64-byte boundary
+
+The skeleton is a protocol-5 pickle with every contiguous array taken out of
+band, so it is a few KB even for a large forest. Loading maps the file
+read-only and hands the blobs to the unpickler as buffers, so it skips
+parsing the pickle stream. Arrays that the unpickled objects keep as given
+(the KNN training matrix, scaler and encoder arrays) stay read-only views of
+the mapping, shared by every process through the page cache. Objects that
+copy their state in __setstate__ do not: a Random Forest's tree node and
+value arrays end up on each process's heap as they would from the .pkl.
+The header records a content hash over the skeleton and blobs (checked on
+load, and usable as a model version), a digest of the .pkl it came from,
+and a readable summary.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+
+MAGIC = b'EXOART01'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+SUFFIX = '.artifact'
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+def artifact_path(model_path):
+    return os.path.splitext(model_path)[0] + SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _content_hash(skeleton, blobs):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(skeleton)
+    for blob in blobs:
+        digest.update(blob)
+    return digest.hexdigest()
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _summary(model_data):
+    summary = {'feature_names': [str(name) for name in model_data.get('feature_names', [])]}
+    model = model_data.get('model')
+    if model is not None:
+        summary['estimator'] = type(model).__name__
+    label_encoder = model_data.get('label_encoder')
+    if label_encoder is not None:
+        summary['classes'] = [str(c) for c in label_encoder.classes_]
+    return summary
+
+
+def export_artifact(model_path, path=None):
+    """Write the artifact for a model .pkl; returns its path"""
+    path = path or artifact_path(model_path)
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+
+    buffers = []
+    skeleton = pickle.dumps(model_data, protocol=5, buffer_callback=buffers.append)
+    blobs = [buffer.raw() for buffer in buffers]
+
+    # Blob offsets depend on the header length, which depends on the offsets: repeat until it fits
+    header = {
+        'format_version': FORMAT_VERSION,
+        'content_hash': _content_hash(skeleton, blobs),
+        'source': {'name': os.path.basename(model_path), 'digest': file_digest(model_path)},
+        'created_at': time.time(),
+        'summary': _summary(model_data),
+        'skeleton': None,
+        'blobs': [],
+    }
+    header_size = 0
+    while True:
+        offset = _aligned(16 + header_size)
+        header['skeleton'] = [offset, len(skeleton)]
+        offset += len(skeleton)
+        header['blobs'] = []
+        for blob in blobs:
+            offset = _aligned(offset)
+            header['blobs'].append([offset, blob.nbytes])
+            offset += blob.nbytes
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        if len(encoded) <= header_size:
+            break
+        # Leave room for the offsets growing a digit or two
+        header_size = len(encoded) + 64
+    encoded = encoded.ljust(header_size)
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', header_size) + encoded)
+        for (offset, _), data in zip([header['skeleton']] + header['blobs'], [skeleton] + blobs):
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(data)
+    os.replace(tmp, path)
+    return path
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        prefix = f.read(16)
+        if len(prefix) != 16 or prefix[:8] != MAGIC:
+            raise ArtifactError(f"{path} is not a model artifact")
+        (size,) = struct.unpack('<Q', prefix[8:])
+        header = json.loads(f.read(size))
+    if header['format_version'] != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported artifact version {header['format_version']} in {path}")
+    return header
+
+
+def load_artifact(path, verify=True):
+    """
+    (model_data, header) from an artifact. Arrays are read-only views of a
+    shared read-only mapping of the file. With verify, the content hash is
+    recomputed first and a mismatch raises ArtifactError.
+    """
+    header = read_header(path)
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+    offset, length = header['skeleton']
+    skeleton = view[offset:offset + length]
+    blobs = [view[offset:offset + length] for offset, length in header['blobs']]
+    if verify and _content_hash(skeleton, blobs) != header['content_hash']:
+        raise ArtifactError(f"{path} is corrupt: content hash mismatch")
+    # The arrays keep the views, and the views keep the mapping, alive
+    return pickle.loads(skeleton, buffers=blobs), header
+
+
+def artifact_version(model_path):
+    """(mtime_ns, content hash) of the artifact next to a model file, or None without one"""
+    path = artifact_path(model_path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+        return mtime, read_header(path)['content_hash']
+    except (OSError, ArtifactError, ValueError, KeyError):
+        return None
+
+
+def load_model_file(model_path, verify=True):
+    """
+    Load a model .pkl, preferring its artifact when one exported from this
+    exact file sits next to it. Returns (model_data, content hash or None).
+    A path ending in .artifact is loaded directly.
+    """
+    if model_path.endswith(SUFFIX):
+        model_data, header = load_artifact(model_path, verify)
+        return model_data, header['content_hash']
+
+    path = artifact_path(model_path)
+    if os.path.exists(path):
+        try:
+            header = read_header(path)
+            if header['source']['digest'] == file_digest(model_path):
+                model_data, header = load_artifact(path, verify)
+                return model_data, header['content_hash']
+            print(f"Ignoring {path}: exported from a different version of {model_path}")
+        except (ArtifactError, OSError, ValueError) as e:
+            print(f"Ignoring {path}: {e}")
+
+    with open(model_path, 'rb') as f:
+        return pickle.load(f), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command in ('export', 'inspect', 'verify'):
+        sub.add_parser(command).add_argument('path')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        started = time.perf_counter()
+        path = export_artifact(args.path)
+        print(f"Wrote {path} ({os.path.getsize(path) / 1024:.1f} KiB) in {time.perf_counter() - started:.2f} s")
+    elif args.command == 'inspect':
+        header = read_header(args.path)
+        header['blob_bytes'] = sum(length for _, length in header.pop('blobs'))
+        print(json.dumps(header, indent=2))
+    else:
+        load_artifact(args.path, verify=True)
+        print(f"OK: {args.path} matches its content hash")
+
+
+if __name__ == '__main__':
+    main()
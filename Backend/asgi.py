@@ -0,0 +1,174 @@
+"""
+ASGI entry point for the prediction API
+
+    cd Backend
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+Connections are held by the event loop, so idle or slow clients cost no
+threads. Each request runs the Flask view from server.py on a worker thread:
+
+- /predict, /batch_predict, /upload_predict and /explain run on the inference pool
+  (ASGI_INFERENCE_THREADS, default: one per CPU), which bounds how much
+  CPU-bound scoring a process runs at once; excess requests wait on the
+  loop, not in a thread.
+- Every other route (dataset listing, uploads, downloads, ...) runs on the
+  I/O pool (ASGI_IO_THREADS, default 32), so file access never blocks the
+  loop or queues behind inference.
+
+Request bodies are streamed to the view as they arrive and response bodies
+are sent as they are produced, so the streaming endpoints keep bounded
+memory. With MICRO_BATCHING=1, give the inference pool at least
+MICRO_BATCH_MAX_SIZE threads so enough requests can wait in one batch.
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from server import app as flask_app
+
+INFERENCE_PATHS = ('/predict', '/batch_predict', '/upload_predict', '/explain')
+
+
+class ReceiveStream(io.RawIOBase):
+    """wsgi.input that pulls ASGI body messages from the loop on demand"""
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and self._more:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._more = False
+                break
+            self._buffer += message.get('body', b'')
+            self._more = message.get('more_body', False)
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        del self._buffer[:n]
+        return n
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE' or name == 'CONTENT_LENGTH':
+            key = name
+        else:
+            key = f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class WsgiBridge:
+    """Serve a WSGI app over ASGI, dispatching each request to a thread pool by path"""
+
+    def __init__(self, wsgi_app, inference_threads=None, io_threads=32):
+        self.wsgi_app = wsgi_app
+        self.inference_executor = ThreadPoolExecutor(
+            max_workers=inference_threads or os.cpu_count() or 1, thread_name_prefix='inference'
+        )
+        self.io_executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix='io')
+
+    def executor_for(self, path):
+        if path.startswith(INFERENCE_PATHS):
+            return self.inference_executor
+        return self.io_executor
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        loop = asyncio.get_running_loop()
+        body = io.BufferedReader(ReceiveStream(receive, loop), buffer_size=64 * 1024)
+        environ = build_environ(scope, body)
+        await loop.run_in_executor(self.executor_for(scope['path']), self.run_wsgi, environ, send, loop)
+
+    def run_wsgi(self, environ, send, loop):
+        """Runs on a worker thread; every send is handed back to the loop and awaited"""
+        def send_sync(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers
+            ]
+            return write
+
+        def send_start():
+            if not response.get('started'):
+                response['started'] = True
+                send_sync({
+                    'type': 'http.response.start',
+                    'status': response['status'],
+                    'headers': response['headers'],
+                })
+
+        def write(data):
+            send_start()
+            send_sync({'type': 'http.response.body', 'body': data, 'more_body': True})
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    write(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        send_start()
+        send_sync({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.inference_executor.shutdown(wait=True)
+                self.io_executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = WsgiBridge(
+    flask_app,
+    inference_threads=int(os.environ.get('ASGI_INFERENCE_THREADS', '0')) or None,
+    io_threads=int(os.environ.get('ASGI_IO_THREADS', '32'))
+)
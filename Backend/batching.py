@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-row predictions into batched model calls
+
+    Rows are queued per key (dataset, model_type). A worker thread per key
+    takes the first waiting row, keeps collecting until `max_batch_size` rows
+    are queued or `max_wait` seconds have passed since that first row
+    arrived (rows already waiting are always taken), then runs `score_fn(key, matrix)` once and fans the per-row
+    results back out to the waiting callers.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait=0.002):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queues = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _queue_for(self, key):
+        with self._lock:
+            q = self._queues.get(key)
+            if q is None:
+                q = self._queues[key] = queue.Queue()
+                self._stats[key] = {
+                    'requests': 0,
+                    'batches': 0,
+                    'max_batch_size': 0,
+                    'batch_size_histogram': {},
+                    'total_wait_ms': 0.0,
+                    'max_wait_ms': 0.0,
+                    'errors': 0,
+                }
+                worker = threading.Thread(target=self._run, args=(key, q), daemon=True)
+                worker.start()
+            return q
+
+    def submit(self, key, row, timeout=None):
+        """Queue one feature row and block until its batch has been scored"""
+        future = Future()
+        self._queue_for(key).put((row, future, time.monotonic()))
+        return future.result(timeout=timeout)
+
+    def _collect(self, q):
+        first = q.get()
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(q.get(timeout=remaining))
+                else:
+                    # Past the deadline: still take whatever is already waiting
+                    batch.append(q.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self, key, q):
+        while True:
+            batch = self._collect(q)
+            started = time.monotonic()
+            futures = [item[1] for item in batch]
+            try:
+                results = self.score_fn(key, np.vstack([item[0] for item in batch]))
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                self._stats[key]['errors'] += 1
+            self._record(key, batch, started)
+
+    def _record(self, key, batch, started):
+        stats = self._stats[key]
+        size = len(batch)
+        waits = [(started - item[2]) * 1000 for item in batch]
+        # Power-of-two buckets: "1", "2", "4", ... up to max_batch_size
+        bucket = str(1 << (size - 1).bit_length())
+        stats['requests'] += size
+        stats['batches'] += 1
+        stats['max_batch_size'] = max(stats['max_batch_size'], size)
+        stats['batch_size_histogram'][bucket] = stats['batch_size_histogram'].get(bucket, 0) + 1
+        stats['total_wait_ms'] += sum(waits)
+        stats['max_wait_ms'] = max(stats['max_wait_ms'], max(waits))
+
+    def stats(self):
+        """Queue depth, batch size and wait-time metrics per key"""
+        report = {}
+        for key, q in list(self._queues.items()):
+            stats = self._stats[key]
+            batches = stats['batches'] or 1
+            requests = stats['requests'] or 1
+            report['/'.join(key)] = {
+                'queue_depth': q.qsize(),
+                'requests': stats['requests'],
+                'batches': stats['batches'],
+                'errors': stats['errors'],
+                'mean_batch_size': stats['requests'] / batches,
+                'max_batch_size': stats['max_batch_size'],
+                'batch_size_histogram': dict(stats['batch_size_histogram']),
+                'mean_wait_ms': stats['total_wait_ms'] / requests,
+                'max_wait_ms': stats['max_wait_ms'],
+            }
+        return report
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def feature_digest(vector, quant_bits=16):
+    """
+    Hash a feature vector (already in feature_names order) after canonicalizing it
+
+    Values are float64, so 1, 1.0 and "1" agree; -0.0 becomes 0.0; and the
+    lowest `quant_bits` mantissa bits are cleared so inputs that differ only
+    by float noise share an entry (16 bits is ~1e-11 relative).
+    """
+    canonical = np.ascontiguousarray(vector, dtype=np.float64) + 0.0
+    if quant_bits:
+        mask = np.uint64(0xFFFFFFFFFFFFFFFF ^ ((1 << quant_bits) - 1))
+        canonical = canonical.view(np.uint64) & mask
+    return hashlib.blake2b(canonical.tobytes(), digest_size=16).hexdigest()
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction results with a TTL and a size bound
+
+    Keys are (dataset, model_type, model_version, feature_digest); the size
+    of an entry is the length of its JSON encoding plus a fixed overhead.
+    """
+
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, size, expires = item
+            if self.ttl and expires < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = len(json.dumps(value)) + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.size_bytes -= size
+
+    def invalidate(self, dataset=None, model_type=None):
+        """Drop every entry for a (dataset, model_type), or everything when called bare"""
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (dataset is None or key[0] == dataset)
+                     and (model_type is None or key[1] == model_type)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset_name TEXT PRIMARY KEY,
+    total_rows INTEGER NOT NULL,
+    total_columns INTEGER NOT NULL,
+    target_column TEXT NOT NULL,
+    feature_count INTEGER NOT NULL,
+    uploaded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS datasets_rows ON datasets (total_rows, dataset_name);
+CREATE INDEX IF NOT EXISTS datasets_columns ON datasets (total_columns, dataset_name);
+CREATE INDEX IF NOT EXISTS datasets_uploaded ON datasets (uploaded_at, dataset_name);
+CREATE INDEX IF NOT EXISTS datasets_target ON datasets (target_column, dataset_name);
+"""
+
+# Public sort key -> column; each has an index ending in dataset_name, which breaks ties
+SORT_COLUMNS = {
+    'name': 'dataset_name',
+    'rows': 'total_rows',
+    'columns': 'total_columns',
+    'uploaded': 'uploaded_at',
+}
+
+FIELDS = ('dataset_name', 'total_rows', 'total_columns', 'target_column', 'feature_count', 'uploaded_at')
+
+
+class DatasetCatalog:
+    """
+    SQLite index of the uploaded datasets' summary fields
+
+    The *_metadata.json files stay the full record (feature stats and all);
+    the catalog holds one row per dataset so listing, sorting and filtering
+    never touch them. Pages are read with keyset pagination on an index, so
+    a page costs the same at the start of the catalog as deep into it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            # Readers never block the writer (and the other way round)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(metadata, uploaded_at):
+        return (
+            metadata['dataset_name'],
+            int(metadata['total_rows']),
+            int(metadata['total_columns']),
+            metadata['target_column'],
+            len(metadata['feature_columns']),
+            uploaded_at,
+        )
+
+    def put(self, metadata, uploaded_at=None):
+        """Insert or replace a dataset from its metadata dict"""
+        row = self._row(metadata, time.time() if uploaded_at is None else uploaded_at)
+        with self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO datasets ({', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    def remove(self, name):
+        """Drop a dataset; True if it was listed"""
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM datasets WHERE dataset_name = ?', (name,)).rowcount > 0
+
+    def get(self, name):
+        row = self._connect().execute(
+            f"SELECT {', '.join(FIELDS)} FROM datasets WHERE dataset_name = ?", (name,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def count(self):
+        return self._connect().execute('SELECT COUNT(*) FROM datasets').fetchone()[0]
+
+    def page(self, limit, sort='name', descending=False, after=None, offset=0,
+             name=None, target_column=None, min_rows=None, max_rows=None):
+        """
+        (rows, total) for one page of datasets matching the filters
+
+        `after` is the (sort value, dataset_name) of the last row of the
+        previous page; it replaces `offset`, which SQLite has to skip over
+        row by row. `name` matches a substring of the dataset name.
+        """
+        column = SORT_COLUMNS[sort]
+        where, params = [], []
+        if name:
+            escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("dataset_name LIKE ? ESCAPE '\\'")
+            params.append(f'%{escaped}%')
+        if target_column is not None:
+            where.append('target_column = ?')
+            params.append(target_column)
+        if min_rows is not None:
+            where.append('total_rows >= ?')
+            params.append(min_rows)
+        if max_rows is not None:
+            where.append('total_rows <= ?')
+            params.append(max_rows)
+
+        conn = self._connect()
+        filters = f"WHERE {' AND '.join(where)}" if where else ''
+        total = conn.execute(f'SELECT COUNT(*) FROM datasets {filters}', params).fetchone()[0]
+
+        direction = 'DESC' if descending else 'ASC'
+        page_where = list(where)
+        page_params = list(params)
+        if after is not None:
+            if column == 'dataset_name':
+                page_where.append(f"dataset_name {'<' if descending else '>'} ?")
+                page_params.append(after[1])
+            else:
+                page_where.append(f"({column}, dataset_name) {'<' if descending else '>'} (?, ?)")
+                page_params.extend(after)
+            offset = 0
+        order = f'{column} {direction}' if column == 'dataset_name' else f'{column} {direction}, dataset_name {direction}'
+        page_filters = f"WHERE {' AND '.join(page_where)}" if page_where else ''
+        rows = conn.execute(
+            f"SELECT {', '.join(FIELDS)} FROM datasets {page_filters} ORDER BY {order} LIMIT ? OFFSET ?",
+            page_params + [limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def rebuild(self, upload_folder):
+        """Re-index every *_metadata.json in upload_folder in one transaction; returns the count"""
+        rows = []
+        for filename in os.listdir(upload_folder):
+            if not filename.endswith('_metadata.json'):
+                continue
+            path = os.path.join(upload_folder, filename)
+            try:
+                with open(path, 'r') as f:
+                    rows.append(self._row(json.load(f), os.stat(path).st_mtime))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Skipping {path} in dataset catalog: {e}")
+        with self._connect() as conn:
+            conn.execute('DELETE FROM datasets')
+            conn.executemany(f"INSERT OR REPLACE INTO datasets ({', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
@@ -0,0 +1,231 @@
+"""
+NumPy runtime for the 1D-CNN models
+
+    python cnn_runtime.py export best_model_k2.keras   # writes best_model_k2.cnn.npz
+    python cnn_runtime.py check best_model_k2.keras    # max abs difference against Keras
+
+`export` loads the Keras model (the only step that needs TensorFlow) and
+writes its layer list and weights to a .npz bundle next to it. The server
+runs the bundle with CnnRuntime: batched NumPy conv/pool/dense layers in
+float32, with each BatchNormalization folded into a scale and shift at
+export time and Dropout dropped. A bundle records a digest of the .keras
+file it came from and is ignored once that file changes.
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+    'softmax': lambda x: _softmax(x),
+}
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def bundle_path(model_path):
+    return os.path.splitext(model_path)[0] + '.cnn.npz'
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def _pad_amounts(length, kernel, stride, dilation, padding):
+    """(left, right, output length) for 'valid', 'same' and 'causal' padding, as Keras computes them"""
+    span = dilation * (kernel - 1) + 1
+    if padding == 'valid':
+        return 0, 0, (length - span) // stride + 1
+    if padding == 'causal':
+        return span - 1, 0, (length - 1) // stride + 1
+    out = -(-length // stride)
+    total = max((out - 1) * stride + span - length, 0)
+    return total // 2, total - total // 2, out
+
+
+def _windows(x, kernel, stride, dilation, out):
+    """(n, out, kernel, channels) stack of the sliding windows"""
+    stop = stride * (out - 1) + 1
+    return np.stack([x[:, j * dilation:j * dilation + stop:stride, :] for j in range(kernel)], axis=2)
+
+
+def export_layers(model):
+    """Layer specs and weight arrays for a Sequential 1D-CNN"""
+    layers, arrays = [], {}
+    for index, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        config = layer.get_config()
+        weights = [np.asarray(w, dtype=np.float32) for w in layer.get_weights()]
+        spec = {'type': kind}
+
+        if kind in ('InputLayer', 'Dropout'):
+            continue
+        if kind == 'Conv1D':
+            if config.get('groups', 1) != 1 or config.get('data_format', 'channels_last') != 'channels_last':
+                raise ValueError(f"Unsupported Conv1D configuration in {layer.name}")
+            spec.update(stride=config['strides'][0], dilation=config['dilation_rate'][0],
+                        padding=config['padding'], activation=config['activation'])
+            arrays[f'{index}_kernel'] = weights[0]
+            arrays[f'{index}_bias'] = weights[1] if config['use_bias'] else np.zeros(weights[0].shape[-1], np.float32)
+        elif kind == 'Dense':
+            spec.update(activation=config['activation'])
+            arrays[f'{index}_kernel'] = weights[0]
+            arrays[f'{index}_bias'] = weights[1] if config['use_bias'] else np.zeros(weights[0].shape[-1], np.float32)
+        elif kind == 'BatchNormalization':
+            if config['axis'] not in (-1, [-1]):
+                raise ValueError(f"Unsupported BatchNormalization axis in {layer.name}")
+            weights = list(weights)
+            gamma = weights.pop(0) if config['scale'] else 1
+            beta = weights.pop(0) if config['center'] else 0
+            mean, variance = weights
+            scale = gamma / np.sqrt(variance + config['epsilon'])
+            arrays[f'{index}_scale'] = np.asarray(scale, dtype=np.float32)
+            arrays[f'{index}_shift'] = np.asarray(beta - mean * scale, dtype=np.float32)
+        elif kind in ('MaxPooling1D', 'AveragePooling1D'):
+            spec.update(pool=config['pool_size'][0], stride=config['strides'][0], padding=config['padding'])
+        elif kind == 'Activation':
+            spec.update(activation=config['activation'])
+        elif kind not in ('Flatten', 'GlobalAveragePooling1D', 'GlobalMaxPooling1D'):
+            raise ValueError(f"Unsupported layer {kind} ({layer.name})")
+
+        if spec.get('activation', 'linear') not in ACTIVATIONS:
+            raise ValueError(f"Unsupported activation {spec['activation']} in {layer.name}")
+        spec['index'] = index
+        layers.append(spec)
+    return layers, arrays
+
+
+def export_model(model_path, path=None):
+    """Convert a .keras file into a NumPy bundle; returns the bundle path"""
+    from tensorflow.keras.models import load_model
+
+    path = path or bundle_path(model_path)
+    layers, arrays = export_layers(load_model(model_path))
+    header = {'format_version': FORMAT_VERSION, 'source_digest': file_digest(model_path), 'layers': layers}
+    np.savez(path, header=np.array(json.dumps(header)), **arrays)
+    return path
+
+
+class CnnRuntime:
+    """Runs an exported bundle; predict() mirrors keras Model.predict for these models"""
+
+    def __init__(self, header, arrays):
+        if header['format_version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported CNN bundle version {header['format_version']}")
+        self.layers = header['layers']
+        self.source_digest = header['source_digest']
+        self.arrays = arrays
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            header = json.loads(str(f['header']))
+            arrays = {name: f[name] for name in f.files if name != 'header'}
+        return cls(header, arrays)
+
+    def _conv1d(self, x, spec, kernel, bias):
+        size = kernel.shape[0]
+        left, right, out = _pad_amounts(x.shape[1], size, spec['stride'], spec['dilation'], spec['padding'])
+        if left or right:
+            x = np.pad(x, ((0, 0), (left, right), (0, 0)))
+        windows = _windows(x, size, spec['stride'], spec['dilation'], out)
+        n = len(x)
+        y = windows.reshape(n * out, -1) @ kernel.reshape(-1, kernel.shape[-1])
+        return y.reshape(n, out, -1) + bias
+
+    def _pool(self, x, spec):
+        left, right, out = _pad_amounts(x.shape[1], spec['pool'], spec['stride'], 1, spec['padding'])
+        maximum = spec['type'] == 'MaxPooling1D'
+        if left or right:
+            x = np.pad(x, ((0, 0), (left, right), (0, 0)), constant_values=-np.inf if maximum else np.nan)
+        windows = _windows(x, spec['pool'], spec['stride'], 1, out)
+        return windows.max(axis=2) if maximum else np.nanmean(windows, axis=2)
+
+    def predict(self, x, verbose=0, batch_size=None, logits=False):
+        """Class probabilities, or with `logits` the last layer's output before its activation"""
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 2:
+            x = x[:, :, np.newaxis]
+        last = len(self.layers) - 1
+        for position, spec in enumerate(self.layers):
+            kind, index = spec['type'], spec['index']
+            if kind == 'Conv1D':
+                x = self._conv1d(x, spec, self.arrays[f'{index}_kernel'], self.arrays[f'{index}_bias'])
+            elif kind == 'Dense':
+                x = x @ self.arrays[f'{index}_kernel'] + self.arrays[f'{index}_bias']
+            elif kind == 'BatchNormalization':
+                x = x * self.arrays[f'{index}_scale'] + self.arrays[f'{index}_shift']
+            elif kind in ('MaxPooling1D', 'AveragePooling1D'):
+                x = self._pool(x, spec)
+            elif kind == 'Flatten':
+                x = x.reshape(len(x), -1)
+            elif kind == 'GlobalAveragePooling1D':
+                x = x.mean(axis=1)
+            elif kind == 'GlobalMaxPooling1D':
+                x = x.max(axis=1)
+            if 'activation' in spec and not (logits and position == last):
+                x = ACTIVATIONS[spec['activation']](x)
+        return x
+
+
+def load_cnn_runtime(model_path):
+    """
+    CnnRuntime for a .keras path if an export of that exact file exists next
+    to it, else None (the caller falls back to Keras)
+    """
+    path = bundle_path(model_path)
+    if not os.path.exists(path):
+        return None
+    runtime = CnnRuntime.load(path)
+    if os.path.exists(model_path) and runtime.source_digest != file_digest(model_path):
+        print(f"Ignoring {path}: exported from a different version of {model_path}")
+        return None
+    return runtime
+
+
+def check(model_path, n_samples=1000, seed=0):
+    """Largest absolute probability difference between the bundle and Keras"""
+    from tensorflow.keras.models import load_model
+
+    model = load_model(model_path)
+    runtime = load_cnn_runtime(model_path)
+    if runtime is None:
+        raise SystemExit(f"No current export for {model_path}; run 'export' first")
+    steps = model.input_shape[1]
+    x = np.random.default_rng(seed).normal(0, 1.5, (n_samples, steps, 1)).astype(np.float32)
+    expected = np.asarray(model.predict(x, verbose=0))
+    actual = runtime.predict(x)
+    return {
+        'max_abs_diff': float(np.abs(actual - expected).max()),
+        'label_agreement': float((actual.argmax(1) == expected.argmax(1)).mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    for command in ('export', 'check'):
+        sub.add_parser(command).add_argument('model_path')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        print(f"Wrote {export_model(args.model_path)}")
+    else:
+        result = check(args.model_path)
+        print(f"max abs difference {result['max_abs_diff']:.3g}, label agreement {result['label_agreement']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
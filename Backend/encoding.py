@@ -0,0 +1,127 @@
+"""
+Response encodings: fast JSON, binary formats and compression
+
+- OrjsonProvider: Flask JSON provider backed by orjson when it is
+  installed. Output matches the default provider's (sorted keys), except
+  that NaN and infinity become null instead of invalid JSON. Anything orjson
+  cannot handle goes through the default provider.
+- negotiate() / encode_body(): MessagePack (application/msgpack, needs
+  msgpack) and Arrow IPC streams (application/vnd.apache.arrow.stream, needs
+  pyarrow) chosen from the Accept header. Arrow is only offered for columnar
+  payloads: the table goes in the record batch and the rest of the payload
+  is stored as JSON in the schema metadata under b'response'.
+- choose_coding() / compress(): zstd (needs zstandard) or gzip, chosen
+  from Accept-Encoding.
+"""
+import gzip
+import importlib.util
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+from lazy import LazyModule
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# pyarrow takes a while to import, so it is only imported by the first Arrow response
+pa = LazyModule('pyarrow') if importlib.util.find_spec('pyarrow') else None
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding"""
+
+    def _options(self):
+        options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options())
+        except (orjson.JSONEncodeError, TypeError):
+            return super().dumps(obj).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # e.g. NaN literals, which the json module accepts
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+def media_types(columnar=False):
+    """Response media types this server can produce, JSON first"""
+    offers = [JSON]
+    if msgpack is not None:
+        offers.append(MSGPACK)
+    if pa is not None and columnar:
+        offers.append(ARROW)
+    return offers
+
+
+def negotiate(accept_mimetypes, columnar=False):
+    """Best media type for an Accept header; JSON when nothing else matches"""
+    return accept_mimetypes.best_match(media_types(columnar), default=JSON)
+
+
+def encode_body(payload, media_type, table=None):
+    """
+    Bytes of `payload` as MessagePack, or as an Arrow IPC stream of `table`
+    (column name -> list of values) with the rest of the payload in its metadata
+    """
+    if media_type == MSGPACK:
+        return msgpack.packb(payload, use_bin_type=True)
+    if media_type == ARROW:
+        batch = pa.RecordBatch.from_pydict(table)
+        schema = batch.schema.with_metadata({b'response': json.dumps(payload).encode('utf-8')})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_batch(batch.replace_schema_metadata(schema.metadata))
+        return sink.getvalue().to_pybytes()
+    raise ValueError(f'Unsupported media type: {media_type}')
+
+
+def choose_coding(accept_encodings):
+    """'zstd', 'gzip' or None for an Accept-Encoding header, preferring the client's quality values"""
+    offers = (['zstd'] if zstandard is not None else []) + ['gzip']
+    return accept_encodings.best_match(offers)
+
+
+def compress(body, coding):
+    if coding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
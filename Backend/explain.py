@@ -0,0 +1,111 @@
+"""
+Feature attributions behind /explain
+
+All three explainers take a batch of scaled inputs and work on the whole
+batch at once:
+
+- path_contributions (Random Forest): every (sample, tree) pair walks down
+  its tree together, as in FlatForest.leaves, and each split on the way
+  credits its feature with the change in the node's class distribution.
+  Per sample, the base value (mean root distribution) plus the summed
+  contributions is the forest's predict_proba.
+- nearest_neighbors (KNN): the k training rows the vote came from, with
+  their distances and labels, and each feature's share of the squared
+  distance to them.
+- gradient_times_input (CNN): central-difference gradient of the explained
+  class's log-odds, times the scaled input. The inputs are centered on the
+  training means, so this is attribution relative to an average sample.
+  Log-odds do not flatten out the way a confident softmax probability does;
+  the NumPy runtime provides them from the logits, Keras models from the
+  probabilities. All perturbed copies of the batch go through one predict()
+  call.
+"""
+import numpy as np
+
+from cnn_runtime import CnnRuntime
+
+# Central-difference step in scaled units: well above float32 rounding, far below a feature's spread
+GRADIENT_STEP = 1e-3
+
+
+def path_contributions(forest, X):
+    """
+    (base values (n_classes,), contributions (n_samples, n_features, n_classes))
+    for a FlatForest, in probability units
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    n_samples, n_features = X.shape
+    n_trees = len(forest.roots)
+    n_classes = forest.value.shape[1]
+    flat_X = X.ravel()
+
+    node = np.tile(forest.roots, n_samples)
+    # Row of each (sample, tree) pair's feature values in flat_X, and of its contributions
+    base = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, n_trees)
+    totals = np.zeros(n_samples * n_features * n_classes)
+    class_offsets = np.arange(n_classes)
+    for _ in range(forest.max_depth):
+        feature = forest.feature.take(node)
+        go_right = ~(flat_X.take(base + feature) <= forest.threshold.take(node))
+        child = forest.children.take(2 * node + go_right)
+        delta = forest.value[child] - forest.value[node]
+        slots = ((base + feature) * n_classes)[:, np.newaxis] + class_offsets
+        totals += np.bincount(slots.ravel(), weights=delta.ravel(), minlength=len(totals))
+        # Leaves point at themselves and add nothing, so drop them as they are reached
+        keep = ~forest.is_leaf.take(child)
+        if not keep.all():
+            child, base = child[keep], base[keep]
+            if not len(child):
+                break
+        node = child
+
+    contributions = totals.reshape(n_samples, n_features, n_classes) / n_trees
+    return forest.value[forest.roots].mean(axis=0), contributions
+
+
+def nearest_neighbors(model, X, engine=None):
+    """
+    (distances, training row ids, per-feature squared distance) of the k
+    nearest neighbors of each row, nearest first. The last is
+    (n_samples, n_features): each feature's squared difference averaged over
+    the neighbors, which sums to the mean squared distance.
+    """
+    if engine is not None and getattr(engine, 'mode', None) == 'exact':
+        # The exact index keeps the training rows in their original order
+        squared, ids = engine.kneighbors(X)
+        distances = np.sqrt(squared)
+    else:
+        distances, ids = model.kneighbors(X)
+    neighbors = np.asarray(model._fit_X)[ids]
+    per_feature = ((neighbors - X[:, np.newaxis, :]) ** 2).mean(axis=1)
+    return distances, ids, per_feature
+
+
+def _log_odds(model, X, columns):
+    """log(p / (1 - p)) of class columns[i] for each row i of X"""
+    rows = np.arange(len(X))
+    if isinstance(model, CnnRuntime) and model.layers[-1].get('activation') == 'softmax':
+        logits = model.predict(X[:, :, np.newaxis], logits=True).astype(np.float64)
+        explained = logits[rows, columns]
+        logits[rows, columns] = -np.inf
+        others = logits.max(axis=1)
+        return explained - others - np.log(np.exp(logits - others[:, np.newaxis]).sum(axis=1))
+    probabilities = np.asarray(model.predict(X[:, :, np.newaxis], verbose=0), dtype=np.float64)
+    explained = np.clip(probabilities[rows, columns], 1e-7, 1 - 1e-7)
+    return np.log(explained) - np.log1p(-explained)
+
+
+def gradient_times_input(model, X, columns, step=GRADIENT_STEP):
+    """
+    (n_samples, n_features) gradient of the log-odds of class columns[i]
+    with respect to each scaled input of row i, times that input
+    """
+    n_samples, n_features = X.shape
+    # Rows 2j and 2j + 1 of each sample's block are the input moved up and down along feature j
+    shifts = np.repeat(np.eye(n_features) * step, 2, axis=0)
+    shifts[1::2] *= -1
+    perturbed = (X[:, np.newaxis, :] + shifts).reshape(-1, n_features)
+    log_odds = _log_odds(model, perturbed, np.repeat(columns, 2 * n_features))
+    log_odds = log_odds.reshape(n_samples, n_features, 2)
+    gradients = (log_odds[:, :, 0] - log_odds[:, :, 1]) / (2 * step)
+    return gradients * X
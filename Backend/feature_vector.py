@@ -0,0 +1,113 @@
+"""
+Per-model feature vector builder
+
+A FeatureVectorizer is compiled once per loaded model from its
+feature_names, feature_means and scaler. It copies an input dict straight
+into a preallocated float64 row in feature_names order, fills missing
+features with their training mean (and says which ones it filled), and
+applies a StandardScaler as two in-place vector ops. The subtraction and
+division are the ones StandardScaler.transform performs, so the scaled
+values are bit-for-bit the same as going through a DataFrame.
+"""
+import math
+import threading
+
+import numpy as np
+
+
+class FeatureVectorizer:
+    def __init__(self, feature_names, scaler, feature_means=None, impute=True):
+        self.feature_names = list(feature_names)
+        self.scaler = scaler
+        self.impute = impute
+        means = feature_means if feature_means is not None else {}
+        self.means = np.array([float(means.get(name, np.nan)) for name in self.feature_names])
+
+        # StandardScaler reduces to (x - mean_) / scale_; other scalers go through transform()
+        self.mean_ = self.scale_ = None
+        if type(scaler).__name__ == 'StandardScaler':
+            self.mean_ = scaler.mean_ if scaler.with_mean else None
+            self.scale_ = scaler.scale_ if scaler.with_std else None
+            self._fused = True
+        else:
+            self._fused = False
+        self._local = threading.local()
+
+    @classmethod
+    def from_model_data(cls, model_data, impute=True):
+        return cls(model_data['feature_names'], model_data['scaler'], model_data.get('feature_means'), impute)
+
+    def unimputed(self, row, imputed):
+        """`row` with the features vector() filled in set back to NaN (a copy when there are any)"""
+        if not imputed:
+            return row
+        row = row.copy()
+        row[:, [self.feature_names.index(name) for name in imputed]] = np.nan
+        return row
+
+    def _buffer(self):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            buffer = self._local.buffer = np.empty((1, len(self.feature_names)))
+        return buffer
+
+    def vector(self, features, out=None):
+        """
+        (row, imputed) for one input dict: a (1, n_features) float64 row and
+        the names of the features filled in with their mean
+
+        Without `out` the row is this thread's reusable buffer, valid until the
+        next call on the same thread; pass `out` for a row to keep. Raises
+        ValueError for non-numeric values, and for missing ones when imputation
+        is off or a feature has no mean.
+        """
+        row = self._buffer() if out is None else out
+        flat = row.reshape(-1)
+        missing, bad = [], []
+        for col, name in enumerate(self.feature_names):
+            value = features.get(name)
+            if value is None or value == '':
+                missing.append(col)
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                bad.append(name)
+                continue
+            if math.isnan(value):
+                missing.append(col)
+            elif math.isinf(value):
+                bad.append(name)
+            else:
+                flat[col] = value
+        if bad:
+            raise ValueError(f'Non-numeric values for features: {bad}')
+
+        imputed = []
+        if missing:
+            names = [self.feature_names[col] for col in missing]
+            if not self.impute or np.isnan(self.means[missing]).any():
+                raise ValueError(f'Missing values for features: {names}')
+            flat[missing] = self.means[missing]
+            imputed = names
+        return row, imputed
+
+    def scale(self, matrix, out=None):
+        """Scaled copy of a (n, n_features) matrix (in place when out is matrix)"""
+        if not self._fused:
+            import pandas as pd
+            return self.scaler.transform(pd.DataFrame(matrix, columns=self.feature_names, copy=False))
+        if not np.isfinite(matrix).all():
+            raise ValueError('Input contains NaN or infinity')
+        if self.mean_ is not None:
+            out = np.subtract(matrix, self.mean_, out=out)
+        elif out is None:
+            out = np.array(matrix, dtype=np.float64)
+        if self.scale_ is not None:
+            np.divide(out, self.scale_, out=out)
+        return out
+
+    def transform(self, features):
+        """(scaled row, imputed) for one input dict, in this thread's reusable buffer"""
+        row, imputed = self.vector(features)
+        return self.scale(row, out=row), imputed
@@ -0,0 +1,174 @@
+"""
+Flat-array evaluator for the Random Forest models
+
+    python flat_forest.py bench rf_model_k2_dispo.pkl [--batch-sizes 1,32,1024]
+
+Every tree of a fitted RandomForestClassifier is concatenated into one set
+of node arrays (feature, threshold, children, leaf class distribution).
+A batch walks all trees at once: one gather/compare/step per level over
+every (sample, tree) pair still above a leaf, then the leaf distributions are
+summed tree by tree. Labels come from the same probabilities, so a request
+needs a single traversal instead of predict() followed by predict_proba().
+Small batches run many times faster than through sklearn, whose per-call
+overhead dominates there; batches above `max_rows` are handed to sklearn.
+
+The arithmetic mirrors sklearn's: inputs are cast to float32 before the
+float64 threshold compare, each leaf is taken the way the installed
+DecisionTreeClassifier.predict_proba takes it (re-normalized before 1.5,
+used as stored since), and the trees are accumulated in estimator order
+before dividing by the tree count, so predict_proba is bit-for-bit
+identical.
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+
+def normalizes_leaves():
+    """Whether the installed DecisionTreeClassifier.predict_proba divides each leaf by its sum (up to 1.4 only)"""
+    # Imported here so importing this module does not pull in sklearn; a fitted model has loaded it already
+    import sklearn
+    from sklearn.utils.fixes import parse_version
+    return parse_version(sklearn.__version__) < parse_version('1.5')
+
+
+class FlatForest:
+    """Struct-of-arrays copy of a single-output RandomForestClassifier"""
+
+    def __init__(self, model, max_rows=None):
+        if model.n_outputs_ != 1:
+            raise ValueError('FlatForest supports single-output forests only')
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        sizes = np.array([tree.node_count for tree in trees])
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        n_classes = len(model.classes_)
+        normalize = normalizes_leaves()
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for tree, start in zip(trees, starts):
+            ids = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+            # Leaves point at themselves, so every sample can take max_depth steps
+            lefts.append(np.where(leaf, ids, tree.children_left) + start)
+            rights.append(np.where(leaf, ids, tree.children_right) + start)
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(np.where(leaf, 0.0, tree.threshold))
+            proba = tree.value[:, 0, :n_classes].copy()
+            if normalize:
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer
+            values.append(proba)
+
+        self.feature = np.concatenate(features).astype(np.int32)
+        self.threshold = np.concatenate(thresholds).astype(np.float64)
+        # Children interleaved (left, right) so a step is a single take at 2 * node + go_right
+        self.children = np.column_stack([np.concatenate(lefts), np.concatenate(rights)]).astype(np.int32).ravel()
+        self.is_leaf = self.children[0::2] == np.arange(len(self.children) // 2)
+        self.value = np.ascontiguousarray(np.concatenate(values))
+        self.roots = starts.astype(np.int32)
+        self.max_depth = max(tree.max_depth for tree in trees)
+        self.classes_ = model.classes_
+        # Above this many rows sklearn's compiled traversal is faster (and gives the same bits)
+        self.model = model
+        self.max_rows = max_rows
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.children, self.is_leaf, self.value, self.roots))
+
+    def leaves(self, X):
+        """(n_samples, n_trees) node id of the leaf each sample reaches in each tree"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_samples, n_features = X.shape
+        flat_X = X.ravel()
+        node = np.tile(self.roots, n_samples)
+        # Offset of each (sample, tree) pair's row in flat_X
+        base = np.repeat(np.arange(n_samples, dtype=np.int64) * n_features, len(self.roots))
+        leaves = node.copy()
+        active = np.arange(len(node))
+        for depth in range(self.max_depth):
+            value = flat_X.take(base + self.feature.take(node))
+            go_right = ~(value <= self.threshold.take(node))
+            node = self.children.take(2 * node + go_right)
+            if depth % 4 == 3:
+                # Drop pairs that reached a leaf so deep trees do not drag the rest along
+                done = self.is_leaf.take(node)
+                if done.any():
+                    leaves[active[done]] = node[done]
+                    keep = ~done
+                    node, base, active = node[keep], base[keep], active[keep]
+                    if not len(node):
+                        break
+        leaves[active] = node
+        return leaves.reshape(n_samples, len(self.roots))
+
+    def predict_proba(self, X):
+        if self.max_rows is not None and len(X) > self.max_rows:
+            return self.model.predict_proba(X)
+        # cumsum adds the trees one at a time in estimator order, like sklearn's accumulation
+        proba = np.cumsum(self.value[self.leaves(X)], axis=1)[:, -1]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        """(labels in classes_ terms, probabilities) from one traversal"""
+        proba = self.predict_proba(X)
+        return self.classes_.take(np.argmax(proba, axis=1)), proba
+
+
+def benchmark(model_path, batch_sizes=(1, 32, 1024), repeats=20, seed=0):
+    """Memory and per-batch latency of FlatForest against sklearn's predict + predict_proba"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)['model']
+    forest = FlatForest(model)
+    rng = np.random.default_rng(seed)
+    report = {
+        'trees': len(forest.roots),
+        'nodes': len(forest.feature),
+        'max_depth': int(forest.max_depth),
+        'flat_bytes': forest.nbytes,
+        'sklearn_pickle_bytes': len(pickle.dumps(model)),
+        'batches': [],
+    }
+
+    for batch_size in batch_sizes:
+        X = rng.normal(0, 1, (batch_size, model.n_features_in_))
+        expected = model.predict_proba(X)
+        if not np.array_equal(forest.predict_proba(X), expected):
+            raise AssertionError('FlatForest.predict_proba differs from sklearn')
+
+        def timed(fn):
+            started = time.perf_counter()
+            for _ in range(repeats):
+                fn(X)
+            return (time.perf_counter() - started) / repeats * 1000
+
+        report['batches'].append({
+            'batch_size': batch_size,
+            'sklearn_ms': round(timed(lambda X: (model.predict(X), model.predict_proba(X))), 3),
+            'flat_ms': round(timed(forest.predict), 3),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    bench = sub.add_parser('bench', help='check bit-exactness, report memory and latency')
+    bench.add_argument('model_path')
+    bench.add_argument('--batch-sizes', default='1,32,1024')
+    bench.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    report = benchmark(args.model_path, [int(v) for v in args.batch_sizes.split(',')], args.repeats)
+    print(f"{report['trees']} trees, {report['nodes']} nodes, max depth {report['max_depth']}")
+    print(f"flat arrays {report['flat_bytes'] / 1024:.1f} KiB, sklearn pickle {report['sklearn_pickle_bytes'] / 1024:.1f} KiB")
+    for row in report['batches']:
+        print(f"batch {row['batch_size']:>6}: sklearn {row['sklearn_ms']:>9.3f} ms  flat {row['flat_ms']:>9.3f} ms  (identical predict_proba)")
+
+
+if __name__ == '__main__':
+    main()
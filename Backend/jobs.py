@@ -0,0 +1,271 @@
+"""
+Persistent background jobs for dataset profiling and bulk scoring
+
+    python jobs.py worker                 # one worker process
+    python jobs.py worker --processes 4   # four, each running its own job
+
+Jobs live in an SQLite table (JOB_DB_PATH), so they survive restarts and
+any number of worker processes can share one queue: a worker claims the
+oldest queued job in a single UPDATE, runs the handler that server.py
+registers for its type, and records progress as it goes. A job whose
+worker stops heartbeating is put back in the queue. Results are written
+as numbered chunk files that can be fetched while the job is still running.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    rows_total INTEGER,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    worker TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+"""
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobQueue:
+    def __init__(self, path, results_dir, stale_after=300):
+        self.path = path
+        self.results_dir = results_dir
+        self.stale_after = stale_after
+        self._local = threading.local()
+        os.makedirs(results_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _job(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        job['progress'] = (
+            1.0 if job['status'] == 'done'
+            else min(job['rows_done'] / job['rows_total'], 1.0) if job['rows_total'] else 0.0
+        )
+        return job
+
+    def submit(self, job_type, params, rows_total=None):
+        job_id = uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (job_id, job_type, params, status, rows_total, created_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (job_id, job_type, json.dumps(params), 'queued', rows_total, time.time())
+            )
+        return job_id
+
+    def get(self, job_id):
+        return self._job(self._connect().execute('SELECT * FROM jobs WHERE job_id = ?', (job_id,)).fetchone())
+
+    def list(self, status=None, limit=100):
+        if status:
+            rows = self._connect().execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?', (status, limit))
+        else:
+            rows = self._connect().execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,))
+        return [self._job(row) for row in rows.fetchall()]
+
+    def claim(self, worker):
+        """Atomically take the oldest queued job (requeueing abandoned ones first); None if idle"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND heartbeat_at < ?",
+                (now - self.stale_after,)
+            )
+            row = conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started_at = ?, heartbeat_at = ? "
+                "WHERE job_id = (SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1) "
+                "RETURNING *",
+                (worker, now, now)
+            ).fetchone()
+        return self._job(row)
+
+    def progress(self, job_id, rows_done=None, rows_total=None, chunks=None):
+        """Record progress and heartbeat; raises JobCancelled once a cancel was requested"""
+        with self._connect() as conn:
+            row = conn.execute(
+                'UPDATE jobs SET heartbeat_at = ?, rows_done = COALESCE(?, rows_done), '
+                'rows_total = COALESCE(?, rows_total), chunks = COALESCE(?, chunks) '
+                'WHERE job_id = ? RETURNING cancel_requested',
+                (time.time(), rows_done, rows_total, chunks, job_id)
+            ).fetchone()
+        if row is not None and row[0]:
+            raise JobCancelled(job_id)
+
+    def finish(self, job_id, status, result=None, error=None):
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE job_id = ?',
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+
+    def requeue(self, job_id):
+        """Hand a running job back to the queue (its worker is shutting down)"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE job_id = ? AND status = 'running'", (job_id,))
+
+    def cancel(self, job_id):
+        """Cancel a queued job now, or ask its worker to stop a running one; returns the new status"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT status FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row['status'] == 'queued':
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE job_id = ?", (time.time(), job_id))
+                return 'cancelled'
+            if row['status'] == 'running':
+                conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE job_id = ?', (job_id,))
+            return row['status']
+
+    def delete(self, job_id):
+        """Remove a finished job and its results"""
+        with self._connect() as conn:
+            deleted = conn.execute(
+                f"DELETE FROM jobs WHERE job_id = ? AND status IN ({', '.join('?' * len(FINISHED))})",
+                (job_id,) + FINISHED
+            ).rowcount
+        if deleted:
+            shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+        return bool(deleted)
+
+    def job_dir(self, job_id):
+        return os.path.join(self.results_dir, job_id)
+
+    def chunk_path(self, job_id, index):
+        return os.path.join(self.job_dir(job_id), f'part-{index:05d}.ndjson')
+
+    def write_chunk(self, job_id, index, lines):
+        """Write one result chunk; it only becomes visible once complete"""
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        path = self.chunk_path(job_id, index)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+        os.replace(path + '.tmp', path)
+
+
+def run_worker(queue, handlers, poll_interval=0.5, stop=None):
+    """
+    Claim and run jobs until `stop` is set. A handler is called as
+    handler(queue, job) and returns the job's result dict.
+    """
+    worker = f'{socket.gethostname()}:{os.getpid()}'
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        job = queue.claim(worker)
+        if job is None:
+            stop.wait(poll_interval)
+            continue
+        try:
+            handler = handlers[job['job_type']]
+            queue.finish(job['job_id'], 'done', result=handler(queue, job))
+        except JobCancelled:
+            queue.finish(job['job_id'], 'cancelled')
+        except Exception as e:
+            print(f"Job {job['job_id']} ({job['job_type']}) failed: {e}")
+            queue.finish(job['job_id'], 'failed', error=str(e))
+        except BaseException:
+            # Shutdown mid-job: another worker starts it over
+            queue.requeue(job['job_id'])
+            raise
+
+
+def start_workers(processes):
+    """Start worker processes next to the server; they are stopped when it exits"""
+    import atexit
+
+    script = os.path.abspath(__file__)
+    children = [
+        subprocess.Popen([sys.executable, script, 'worker'], cwd=os.getcwd())
+        for _ in range(processes)
+    ]
+
+    def stop():
+        for child in children:
+            child.terminate()
+        for child in children:
+            try:
+                child.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                child.kill()
+    atexit.register(stop)
+    return children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    worker = sub.add_parser('worker', help='run jobs from the queue')
+    worker.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        children = [subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker'])
+                    for _ in range(args.processes)]
+        try:
+            for child in children:
+                child.wait()
+        except KeyboardInterrupt:
+            for child in children:
+                child.terminate()
+        return
+
+    # The handlers and queue are the server's, so a worker sees the same config and models
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+
+    def shutdown(*_):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"Job worker {os.getpid()} polling {server.job_queue.path}")
+    try:
+        run_worker(server.job_queue, server.JOB_HANDLERS, server.app.config['JOB_POLL_INTERVAL'])
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
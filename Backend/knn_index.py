@@ -0,0 +1,290 @@
+"""
+Vectorized neighbor search for the KNN models
+
+    python knn_index.py export knn_cumi_model.pkl [--nlist 64]
+    python knn_index.py bench knn_cumi_model.pkl [--queries 2000] [--nprobe 1,2,4,8]
+
+The index is built from the scaled training matrix stored in the fitted
+KNeighborsClassifier (`_fit_X` and `_y`) and reproduces its uniform-weight
+vote. Two search modes:
+
+- exact: one BLAS matrix product per batch (|q|^2 - 2 q.X^T + |X|^2) and an
+  argpartition per row. Same neighbors as sklearn, without its per-call
+  overhead.
+- ivf: the training set is clustered into `nlist` k-means cells; a query
+  only scans the `nprobe` cells with the nearest centroids (more if those
+  hold fewer than k rows). `nprobe` trades recall for latency (nprobe ==
+  nlist is exact).
+
+`export` writes the index next to the pickle as <name>.knn_index.npz; the
+server loads it when its recorded source size/mtime still match the pickle
+and builds it in memory otherwise.
+"""
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+
+
+def index_path(model_path):
+    return os.path.splitext(model_path)[0] + '.knn_index.npz'
+
+
+def _source_stamp(model_path):
+    stat = os.stat(model_path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _kmeans(data, nlist, iterations=20, seed=0):
+    """Plain Lloyd's k-means; returns (centroids, assignment)"""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), size=nlist, replace=False)].copy()
+    data_sq = np.einsum('ij,ij->i', data, data)
+    for _ in range(iterations):
+        distances = data_sq[:, None] - 2 * data @ centroids.T + np.einsum('ij,ij->i', centroids, centroids)
+        assignment = np.argmin(distances, axis=1)
+        counts = np.bincount(assignment, minlength=nlist)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, data)
+        nonempty = counts > 0
+        centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+    return centroids, assignment
+
+
+class KnnIndex:
+    """Batched k-nearest-neighbor classifier over a fixed training matrix"""
+
+    def __init__(self, data, labels, n_classes, n_neighbors, centroids=None, offsets=None, nprobe=8):
+        self.data = np.ascontiguousarray(data, dtype=np.float64)
+        self.labels = np.asarray(labels, dtype=np.intp)
+        self.n_classes = n_classes
+        self.n_neighbors = n_neighbors
+        self.data_sq = np.einsum('ij,ij->i', self.data, self.data)
+        # IVF layout: rows of `data` are sorted by cell, cell c is offsets[c]:offsets[c + 1]
+        self.centroids = centroids
+        self.offsets = offsets
+        self.nprobe = nprobe
+        self._members = [] if offsets is None else [
+            np.arange(offsets[cell], offsets[cell + 1]) for cell in range(len(offsets) - 1)
+        ]
+
+    @classmethod
+    def from_model(cls, model, nlist=0, nprobe=8):
+        """Build from a fitted uniform-weight euclidean KNeighborsClassifier"""
+        if model.weights != 'uniform' or model.effective_metric_ != 'euclidean':
+            raise ValueError('KnnIndex supports uniform weights with the euclidean metric only')
+        data = np.asarray(model._fit_X, dtype=np.float64)
+        labels = np.asarray(model._y)
+        n_classes = len(model.classes_)
+        if not nlist:
+            return cls(data, labels, n_classes, model.n_neighbors, nprobe=nprobe)
+
+        centroids, assignment = _kmeans(data, nlist)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+        return cls(data[order], labels[order], n_classes, model.n_neighbors,
+                   centroids=centroids, offsets=offsets, nprobe=nprobe)
+
+    @property
+    def mode(self):
+        return 'exact' if self.centroids is None else 'ivf'
+
+    def save(self, path, model_path):
+        arrays = {
+            'data': self.data,
+            'labels': self.labels,
+            'meta': np.array([self.n_classes, self.n_neighbors], dtype=np.int64),
+            'source': _source_stamp(model_path),
+        }
+        if self.centroids is not None:
+            arrays.update(centroids=self.centroids, offsets=self.offsets)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path, model_path, nprobe=8):
+        """Load an exported index, or None if it was exported from a different pickle"""
+        with np.load(path) as f:
+            if not np.array_equal(f['source'], _source_stamp(model_path)):
+                return None
+            n_classes, n_neighbors = (int(v) for v in f['meta'])
+            centroids = f['centroids'] if 'centroids' in f else None
+            offsets = f['offsets'] if 'offsets' in f else None
+            return cls(f['data'], f['labels'], n_classes, n_neighbors,
+                       centroids=centroids, offsets=offsets, nprobe=nprobe)
+
+    def _search(self, queries, rows):
+        """
+        Partial distances (|x|^2 - 2 q.x, which ranks like |q - x|^2) and row
+        ids of the k nearest among `rows` (None = all rows)
+        """
+        data = self.data if rows is None else self.data[rows]
+        distances = queries @ data.T
+        distances *= -2
+        distances += self.data_sq if rows is None else self.data_sq[rows]
+        k = min(self.n_neighbors, data.shape[0])
+        nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        ids = nearest if rows is None else rows[nearest]
+        return np.take_along_axis(distances, nearest, axis=1), ids
+
+    def _probes(self, queries, k):
+        """
+        (n_queries, nlist) mask of the cells each query scans: its `nprobe`
+        nearest, and then the next nearest until they hold at least k rows,
+        so every neighbor returned is a real training row
+        """
+        centroid_d = np.einsum('ij,ij->i', self.centroids, self.centroids) - 2 * queries @ self.centroids.T
+        order = np.argsort(centroid_d, axis=1)
+        held = np.cumsum(np.diff(self.offsets)[order], axis=1)
+        # Cells needed to reach k rows (all of them when the whole index holds fewer)
+        needed = np.minimum((held < k).sum(axis=1) + 1, len(self.centroids))
+        n_probe = np.maximum(needed, min(self.nprobe, len(self.centroids)))
+        probed = np.zeros(order.shape, dtype=bool)
+        np.put_along_axis(probed, order, np.arange(order.shape[1]) < n_probe[:, None], axis=1)
+        return probed
+
+    def kneighbors(self, queries):
+        """(squared distances, training row ids) of the k nearest neighbors, nearest first"""
+        queries = np.ascontiguousarray(queries, dtype=np.float64)
+        k = self.n_neighbors
+        if self.centroids is None:
+            best_d, best_i = self._search(queries, None)
+        else:
+            probed = self._probes(queries, k)
+
+            cells = np.flatnonzero(probed.any(axis=0))
+            if len(queries) < len(cells):
+                # Few queries: one search per query over its probed cells' rows
+                best_d = np.full((len(queries), k), np.inf)
+                best_i = np.zeros((len(queries), k), dtype=np.intp)
+                for row, row_cells in enumerate(probed):
+                    members = np.concatenate([self._members[cell] for cell in np.flatnonzero(row_cells)])
+                    d, i = self._search(queries[row:row + 1], members)
+                    best_d[row, :d.shape[1]] = d[0]
+                    best_i[row, :i.shape[1]] = i[0]
+                return self._finish(queries, best_d, best_i)
+
+            best_d = np.full((len(queries), k), np.inf)
+            best_i = np.zeros((len(queries), k), dtype=np.intp)
+            # One BLAS call per cell for all queries probing it, merged into a running top-k
+            for cell in cells:
+                members = self._members[cell]
+                if not len(members):
+                    continue
+                which = np.flatnonzero(probed[:, cell])
+                cell_d, cell_i = self._search(queries[which], members)
+                merged_d = np.concatenate([best_d[which], cell_d], axis=1)
+                merged_i = np.concatenate([best_i[which], cell_i], axis=1)
+                keep = np.argpartition(merged_d, k - 1, axis=1)[:, :k]
+                best_d[which] = np.take_along_axis(merged_d, keep, axis=1)
+                best_i[which] = np.take_along_axis(merged_i, keep, axis=1)
+
+        return self._finish(queries, best_d, best_i)
+
+    @staticmethod
+    def _finish(queries, best_d, best_i):
+        """Sort nearest first and turn partial distances into squared distances"""
+        order = np.argsort(best_d, axis=1, kind='stable')
+        best_d = np.take_along_axis(best_d, order, axis=1) + np.einsum('ij,ij->i', queries, queries)[:, None]
+        return np.maximum(best_d, 0), np.take_along_axis(best_i, order, axis=1)
+
+    def predict_proba(self, queries):
+        """Uniform-weight vote, columns in model.classes_ order (like sklearn)"""
+        _, neighbors = self.kneighbors(queries)
+        votes = self.labels[neighbors]
+        flat = votes + self.n_classes * np.arange(len(votes))[:, None]
+        counts = np.bincount(flat.ravel(), minlength=len(votes) * self.n_classes)
+        return counts.reshape(len(votes), self.n_classes) / votes.shape[1]
+
+
+def _default_nlist(model):
+    return max(1, int(np.sqrt(len(model._fit_X))))
+
+
+def load_knn_index(model, model_path, engine, nlist=0, nprobe=8):
+    """
+    Index for a loaded KNN model ('exact' or 'ivf'): the exported sidecar if
+    it is current and of the same mode, else built now (nlist 0 = sqrt(n))
+    """
+    if engine not in ('exact', 'ivf'):
+        raise ValueError(f"Unknown KNN engine: {engine}")
+    path = index_path(model_path)
+    if os.path.exists(path):
+        index = KnnIndex.load(path, model_path, nprobe=nprobe)
+        if index is not None and index.mode == engine:
+            return index
+    if engine == 'exact':
+        return KnnIndex.from_model(model, nprobe=nprobe)
+    return KnnIndex.from_model(model, nlist=nlist or _default_nlist(model), nprobe=nprobe)
+
+
+def benchmark(model_path, n_queries=2000, nprobes=(1, 2, 4, 8), batch_size=256, seed=0):
+    """Latency and recall of the index against the model's own predict_proba"""
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)['model']
+    rng = np.random.default_rng(seed)
+    train = np.asarray(model._fit_X)
+    queries = train[rng.integers(0, len(train), n_queries)] + rng.normal(0, 0.1, (n_queries, train.shape[1]))
+
+    def timed(fn):
+        started = time.perf_counter()
+        out = [fn(queries[i:i + batch_size]) for i in range(0, n_queries, batch_size)]
+        return np.vstack(out), (time.perf_counter() - started) / n_queries * 1e6
+
+    reference, sklearn_us = timed(model.predict_proba)
+    _, reference_ids = model.kneighbors(queries)
+    report = [{'engine': 'sklearn', 'us_per_query': round(sklearn_us, 2), 'recall': 1.0, 'label_agreement': 1.0}]
+
+    candidates = [('exact', KnnIndex.from_model(model))]
+    ivf = KnnIndex.from_model(model, nlist=_default_nlist(model))
+    for nprobe in nprobes:
+        candidates.append((f'ivf nlist={len(ivf.centroids)} nprobe={nprobe}',
+                           KnnIndex(ivf.data, ivf.labels, ivf.n_classes, ivf.n_neighbors,
+                                    centroids=ivf.centroids, offsets=ivf.offsets, nprobe=nprobe)))
+
+    for name, index in candidates:
+        proba, us = timed(index.predict_proba)
+        _, ids = index.kneighbors(queries)
+        # Map IVF row ids back to training rows by value to compare neighbor sets
+        found = index.data[ids]
+        expected = train[reference_ids]
+        hits = (np.abs(found[:, :, None, :] - expected[:, None, :, :]).sum(axis=3) == 0).any(axis=2)
+        report.append({
+            'engine': name,
+            'us_per_query': round(us, 2),
+            'recall': round(float(hits.mean()), 4),
+            'label_agreement': round(float((proba.argmax(1) == reference.argmax(1)).mean()), 4),
+        })
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+    export = sub.add_parser('export', help='write <pickle>.knn_index.npz')
+    export.add_argument('model_path')
+    export.add_argument('--nlist', type=int, default=None, help='IVF cells (0 = exact index; default sqrt(n))')
+    bench = sub.add_parser('bench', help='compare latency and recall against sklearn')
+    bench.add_argument('model_path')
+    bench.add_argument('--queries', type=int, default=2000)
+    bench.add_argument('--batch-size', type=int, default=256)
+    bench.add_argument('--nprobe', default='1,2,4,8')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        with open(args.model_path, 'rb') as f:
+            model = pickle.load(f)['model']
+        nlist = _default_nlist(model) if args.nlist is None else args.nlist
+        index = KnnIndex.from_model(model, nlist=nlist)
+        index.save(index_path(args.model_path), args.model_path)
+        print(f"Wrote {index_path(args.model_path)} ({index.mode}, {len(index.data)} rows)")
+    else:
+        nprobes = [int(v) for v in args.nprobe.split(',')]
+        for row in benchmark(args.model_path, args.queries, nprobes, args.batch_size):
+            print(f"{row['engine']:<28} {row['us_per_query']:>10.2f} us/query  "
+                  f"recall {row['recall']:.4f}  label agreement {row['label_agreement']:.4f}")
+
+
+if __name__ == '__main__':
+    main()
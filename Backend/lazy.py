@@ -0,0 +1,38 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is imported on first attribute access
+
+        pd = LazyModule('pandas')
+
+    Routes that never touch `pd` never pay for importing pandas. Attributes
+    are cached on the proxy after the first lookup, so later accesses cost
+    the same as on the real module.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        value = getattr(self._module or self._load(), attr)
+        setattr(self, attr, value)
+        return value
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
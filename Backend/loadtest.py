@@ -0,0 +1,404 @@
+"""
+Benchmark and load-test suite for the prediction API
+
+    python loadtest.py run                                   # in-process, through the Flask test client
+    python loadtest.py run --url http://localhost:5000 --server-pid 1234
+    python loadtest.py run --datasets cumi --models knn,rf --batch-sizes 1,64 --output before.json
+    python loadtest.py compare before.json after.json        # flags p95/throughput regressions
+
+Synthetic samples are drawn around each model's feature defaults as served by
+/get_features: numeric features get a few percent of Gaussian noise, binary
+features are 0 or 1. Every (dataset, model, batch size) scenario is driven
+through /predict (batch size 1) or /batch_predict for a fixed number of
+requests, spread over `--concurrency` client threads after a few warmup
+calls. The dataset endpoints are measured against a synthetic upload that is
+deleted afterwards. Each scenario reports throughput, p50/p95/p99 latency and
+the server's peak RSS (read from this process in-process, or from
+/proc/<pid>/status over HTTP when --server-pid is given).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then reported as None
+    resource = None
+
+FORMAT_VERSION = 1
+
+
+class TestClientTransport:
+    """Calls the app in this process; one Flask test client per thread"""
+
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None, content_type=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, data=body, content_type=content_type)
+        return response.status_code, response.get_data()
+
+
+class HttpTransport:
+    """Calls a running server over HTTP with the standard library"""
+
+    name = 'http'
+
+    def __init__(self, base_url, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def request(self, method, path, body=None, content_type=None):
+        headers = {'Content-Type': content_type} if content_type else {}
+        req = urllib.request.Request(self.base_url + path, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def post_json(transport, path, payload):
+    return transport.request('POST', path, json.dumps(payload).encode('utf-8'), 'application/json')
+
+
+def multipart(fields, files):
+    """(body, content type) of a multipart/form-data request"""
+    boundary = uuid.uuid4().hex
+    out = io.BytesIO()
+    for name, value in fields.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data) in files.items():
+        out.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                  f'Content-Type: text/csv\r\n\r\n'.encode())
+        out.write(data)
+        out.write(b'\r\n')
+    out.write(f'--{boundary}--\r\n'.encode())
+    return out.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+class SampleGenerator:
+    """Random feature dicts around a model's defaults, from its /get_features response"""
+
+    def __init__(self, features_response, noise=0.05, seed=0):
+        self.names = features_response['features']
+        defaults = features_response['feature_defaults']
+        details = {d['name']: d for d in features_response.get('feature_details', [])}
+        self.means = np.array([defaults.get(name, 0.0) for name in self.names], dtype=np.float64)
+        self.binary = np.array([details.get(name, {}).get('type') == 'binary' for name in self.names])
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    def matrix(self, n):
+        scale = np.maximum(np.abs(self.means) * self.noise, 1e-3)
+        values = self.means + self.rng.normal(0, 1, (n, len(self.names))) * scale
+        values[:, self.binary] = self.rng.integers(0, 2, (n, int(self.binary.sum())))
+        return values
+
+    def samples(self, n):
+        return [dict(zip(self.names, row)) for row in self.matrix(n).tolist()]
+
+
+class RssProbe:
+    """Peak resident set size of the server, in MiB (None when it cannot be read)"""
+
+    def __init__(self, pid=None):
+        self.pid = pid
+
+    def peak_mb(self):
+        if self.pid is not None:
+            try:
+                with open(f'/proc/{self.pid}/status') as f:
+                    for line in f:
+                        if line.startswith('VmHWM:'):
+                            return round(int(line.split()[1]) / 1024, 1)
+            except OSError:
+                return None
+            return None
+        if resource is None:
+            return None
+        # ru_maxrss is KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def measure(call, n_requests, concurrency, warmup=3):
+    """Run `call` n_requests times over `concurrency` threads; latency list (s), errors, wall time"""
+    for _ in range(warmup):
+        call()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    counter = iter(range(n_requests))
+
+    def worker():
+        nonlocal errors
+        local, local_errors = [], 0
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            started = time.perf_counter()
+            ok = call()
+            local.append(time.perf_counter() - started)
+            local_errors += not ok
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(scenario, latencies, errors, wall, rows_per_request, rss):
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+    return dict(
+        scenario,
+        requests=len(latencies),
+        errors=errors,
+        throughput_rps=round(len(latencies) / wall, 2),
+        rows_per_s=round(len(latencies) * rows_per_request / wall, 2),
+        latency_ms={
+            'mean': round(float(latencies_ms.mean()), 3),
+            'p50': round(float(p50), 3),
+            'p95': round(float(p95), 3),
+            'p99': round(float(p99), 3),
+            'max': round(float(latencies_ms.max()), 3),
+        },
+        peak_rss_mb=rss.peak_mb()
+    )
+
+
+def succeeded(status, body):
+    if status != 200:
+        return False
+    try:
+        return json.loads(body).get('success', False)
+    except ValueError:
+        return False
+
+
+def bench_predictions(transport, rss, datasets, models, batch_sizes, n_requests, concurrency, seed):
+    results = []
+    for dataset in datasets:
+        for model_type in models:
+            status, body = transport.request('GET', f'/get_features?dataset={dataset}&model={model_type}')
+            response = json.loads(body) if status == 200 else {}
+            if not response.get('success'):
+                print(f"Skipping {dataset}/{model_type}: {response.get('error', f'HTTP {status}')}")
+                continue
+            generator = SampleGenerator(response, seed=seed)
+
+            for batch_size in batch_sizes:
+                # A pool of distinct payloads, so the prediction cache only sees repeats after a full cycle
+                if batch_size == 1:
+                    path = '/predict'
+                    payloads = [
+                        {'dataset': dataset, 'model': model_type, 'features': sample}
+                        for sample in generator.samples(min(n_requests, 1000))
+                    ]
+                else:
+                    path = '/batch_predict'
+                    payloads = [
+                        {'dataset': dataset, 'model': model_type, 'samples': generator.samples(batch_size)}
+                        for _ in range(min(n_requests, max(1, 20000 // batch_size)))
+                    ]
+                bodies = [json.dumps(payload).encode('utf-8') for payload in payloads]
+                cursor = iter(range(sys.maxsize))
+
+                def call():
+                    body = bodies[next(cursor) % len(bodies)]
+                    return succeeded(*transport.request('POST', path, body, 'application/json'))
+
+                latencies, errors, wall = measure(call, n_requests, concurrency)
+                scenario = {'endpoint': path, 'dataset': dataset, 'model': model_type, 'batch_size': batch_size}
+                results.append(summarize(scenario, latencies, errors, wall, batch_size, rss))
+                print_result(results[-1])
+    return results
+
+
+def bench_datasets(transport, rss, n_requests, concurrency, rows, seed):
+    """Upload a synthetic dataset, time the read endpoints against it, then delete it"""
+    name = f'loadtest_{uuid.uuid4().hex[:8]}'
+    rng = np.random.default_rng(seed)
+    buffer = io.StringIO()
+    buffer.write('id,' + ','.join(f'f{i}' for i in range(8)) + ',label\n')
+    values = rng.normal(0, 1, (rows, 8))
+    labels = rng.choice(['CONFIRMED', 'CANDIDATE', 'FALSE POSITIVE'], rows)
+    for idx, (row, label) in enumerate(zip(values.tolist(), labels)):
+        buffer.write(f'{idx},' + ','.join(f'{v:.6g}' for v in row) + f',{label}\n')
+    data = buffer.getvalue().encode('utf-8')
+
+    results = []
+    body, content_type = multipart({'dataset_name': name, 'target_column': 'label'}, {'file': (f'{name}.csv', data)})
+    started = time.perf_counter()
+    status, response = transport.request('POST', '/upload_dataset', body, content_type)
+    upload_wall = time.perf_counter() - started
+    if not succeeded(status, response):
+        print(f"Skipping dataset endpoints: upload failed ({status})")
+        return results
+    scenario = {'endpoint': '/upload_dataset', 'dataset': name, 'model': None, 'batch_size': rows}
+    results.append(summarize(scenario, [upload_wall], 0, upload_wall, rows, rss))
+    print_result(results[-1])
+
+    try:
+        last_page = max(rows - 50, 0)
+        for path in ('/list_datasets', f'/dataset_info/{name}', f'/preview_dataset/{name}?limit=50',
+                     f'/preview_dataset/{name}?offset={last_page}&limit=50'):
+            def call(path=path):
+                return succeeded(*transport.request('GET', path))
+
+            latencies, errors, wall = measure(call, n_requests, concurrency)
+            scenario = {'endpoint': path.replace(name, '<name>'), 'dataset': name, 'model': None, 'batch_size': None}
+            results.append(summarize(scenario, latencies, errors, wall, 1, rss))
+            print_result(results[-1])
+    finally:
+        transport.request('DELETE', f'/delete_dataset/{name}')
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    if args.url:
+        transport = HttpTransport(args.url)
+        rss = RssProbe(args.server_pid)
+    else:
+        import server
+        transport = TestClientTransport(server.app)
+        rss = RssProbe()
+
+    split = lambda value: [v for v in value.split(',') if v]
+    report = {
+        'format_version': FORMAT_VERSION,
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'transport': transport.name,
+            'target': args.url,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+        },
+        'results': [],
+    }
+    report['results'] += bench_predictions(
+        transport, rss, split(args.datasets), split(args.models),
+        [int(v) for v in split(args.batch_sizes)], args.requests, args.concurrency, args.seed
+    )
+    if not args.skip_datasets:
+        report['results'] += bench_datasets(transport, rss, args.requests, args.concurrency, args.dataset_rows, args.seed)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+def scenario_key(result):
+    return (result['endpoint'], result['dataset'] if result['model'] else None, result['model'], result['batch_size'])
+
+
+def compare(baseline_path, candidate_path, threshold=0.10):
+    """Rows of (scenario, baseline p95, candidate p95, baseline rps, candidate rps, regressed)"""
+    with open(baseline_path) as f:
+        baseline = {scenario_key(r): r for r in json.load(f)['results']}
+    with open(candidate_path) as f:
+        candidate = {scenario_key(r): r for r in json.load(f)['results']}
+
+    rows = []
+    for key in baseline.keys() & candidate.keys():
+        before, after = baseline[key], candidate[key]
+        slower = after['latency_ms']['p95'] > before['latency_ms']['p95'] * (1 + threshold)
+        fewer = after['throughput_rps'] < before['throughput_rps'] * (1 - threshold)
+        rows.append((key, before['latency_ms']['p95'], after['latency_ms']['p95'],
+                     before['throughput_rps'], after['throughput_rps'], slower or fewer))
+    return sorted(rows, key=lambda row: tuple(str(v) for v in row[0]))
+
+
+def describe(key):
+    endpoint, dataset, model_type, batch_size = key
+    parts = [endpoint] + [str(v) for v in (dataset, model_type) if v]
+    if batch_size:
+        parts.append(f'x{batch_size}')
+    return ' '.join(parts)
+
+
+def print_result(result):
+    latency = result['latency_ms']
+    key = scenario_key(result)
+    print(f"{describe(key):<44} {result['throughput_rps']:>9.1f} req/s  p50 {latency['p50']:>8.2f}  "
+          f"p95 {latency['p95']:>8.2f}  p99 {latency['p99']:>8.2f} ms  errors {result['errors']}  "
+          f"rss {result['peak_rss_mb']} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    bench = sub.add_parser('run', help='run the suite and write a JSON report')
+    bench.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    bench.add_argument('--server-pid', type=int, help='pid of the server at --url, for its peak RSS')
+    bench.add_argument('--datasets', default='k2pandc,cumi')
+    bench.add_argument('--models', default='knn,rf,cnn')
+    bench.add_argument('--batch-sizes', default='1,32,256')
+    bench.add_argument('--requests', type=int, default=200, help='requests per scenario')
+    bench.add_argument('--concurrency', type=int, default=4)
+    bench.add_argument('--dataset-rows', type=int, default=20000, help='rows of the synthetic uploaded dataset')
+    bench.add_argument('--skip-datasets', action='store_true', help='only benchmark the prediction endpoints')
+    bench.add_argument('--seed', type=int, default=0)
+    bench.add_argument('--output', default='loadtest_results.json')
+
+    diff = sub.add_parser('compare', help='compare two reports')
+    diff.add_argument('baseline')
+    diff.add_argument('candidate')
+    diff.add_argument('--threshold', type=float, default=0.10, help='relative change counted as a regression')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+        return
+
+    rows = compare(args.baseline, args.candidate, args.threshold)
+    for key, p95_before, p95_after, rps_before, rps_after, regressed in rows:
+        print(f"{describe(key):<44} p95 {p95_before:>8.2f} -> {p95_after:>8.2f} ms  "
+              f"{rps_before:>9.1f} -> {rps_after:>9.1f} req/s{'  REGRESSION' if regressed else ''}")
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+import contextlib
+import threading
+import time
+from bisect import bisect_left
+
+# Seconds, from 10us (a single stage) to 10s (a large upload)
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+# Rows per model call
+SIZE_BUCKETS = tuple(2 ** i for i in range(17))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Histogram:
+    """Prometheus histogram; observe() is a bisect and three adds under a lock"""
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="{}"'.format('+Inf' if bound == float('inf') else repr(float(bound)))
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(float(total))}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class CallbackMetric:
+    """Counter or gauge read at scrape time from `read()`, which returns {label values: value}"""
+
+    def __init__(self, name, help_text, kind, read, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.kind = kind
+        self.read = read
+        self.labelnames = tuple(labelnames)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in sorted(self.read().items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.add(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.add(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name, help_text, kind, read, labelnames=()):
+        return self.add(CallbackMetric(name, help_text, kind, read, labelnames))
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"Error rendering metric {metric.name}: {e}")
+        return '\n'.join(lines) + '\n'
+
+
+class StageTimer:
+    """
+    Stage durations of one request, recorded into a (route, dataset, model,
+    stage) histogram and kept for the request's Server-Timing header
+    """
+
+    __slots__ = ('histogram', 'route', 'dataset', 'model', 'stages')
+
+    def __init__(self, histogram, route, dataset='', model=''):
+        self.histogram = histogram
+        self.route = route
+        self.dataset = dataset
+        self.model = model
+        self.stages = []
+
+    def stage(self, name, dataset=None, model=None):
+        return _Stage(self, name, dataset or self.dataset, model or self.model)
+
+    def server_timing(self):
+        """Server-Timing value; repeated stages (e.g. one per chunk) are summed"""
+        totals = {}
+        for name, seconds in self.stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in totals.items())
+
+
+class NullTimer:
+    """StageTimer stand-in that records nothing"""
+
+    def stage(self, name, dataset=None, model=None):
+        return contextlib.nullcontext()
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'dataset', 'model', 'started')
+
+    def __init__(self, timer, name, dataset, model):
+        self.timer = timer
+        self.name = name
+        self.dataset = dataset
+        self.model = model
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        timer = self.timer
+        timer.histogram.observe((timer.route, self.dataset, self.model, self.name), elapsed)
+        # Stages of another model than the request's (ensemble members) keep their own entry
+        timer.stages.append((self.name if self.model == timer.model else f'{self.name}-{self.model}', elapsed))
+        return False
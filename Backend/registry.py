@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Process-wide store for the models configured in MODELS
+
+    Every (dataset, model_type) entry is loaded once and kept resident.
+    Entries are built by `loader(dataset, model_type, spec)` and tagged with
+    the versions of their files (mtimes by default); when a file changes the
+    entry is rebuilt and swapped in atomically, so readers always see either
+    the old or the new model, never a mix.
+    """
+
+    def __init__(self, models, loader, eager=False, reload_interval=0, path_version=None):
+        self.models = models
+        self.loader = loader
+        # Version of one backing file; its mtime unless the loader reads more than that file
+        self.path_version = path_version or (lambda path: os.stat(path).st_mtime_ns)
+        self.reload_interval = reload_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._listeners = []
+        self._last_check = time.monotonic()
+        if eager:
+            self.load_all()
+
+    @staticmethod
+    def model_paths(spec):
+        """Files backing a MODELS entry (CNN entries have two)"""
+        if isinstance(spec, dict):
+            return [spec['model'], spec['preprocessing']]
+        return [spec]
+
+    def file_version(self, dataset, model_type):
+        """Current on-disk version of an entry, one path_version per backing file"""
+        spec = self.models[dataset][model_type]
+        return tuple(self.path_version(path) for path in self.model_paths(spec))
+
+    def keys(self):
+        return [(dataset, model_type)
+                for dataset, models in self.models.items()
+                for model_type in models]
+
+    def add_reload_listener(self, callback):
+        """Call `callback(dataset, model_type)` after an entry has been swapped by reload()"""
+        self._listeners.append(callback)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self, key):
+        dataset, model_type = key
+        version = self.file_version(dataset, model_type)
+        entry = self.loader(dataset, model_type, self.models[dataset][model_type])
+        entry['version'] = version
+        entry['loaded_at'] = time.time()
+        # Single dict assignment, so concurrent readers never see a partial entry
+        self._entries[key] = entry
+        return entry
+
+    def get(self, dataset, model_type):
+        """Return the resident entry, loading it on first use"""
+        if self.reload_interval and time.monotonic() - self._last_check >= self.reload_interval:
+            self._last_check = time.monotonic()
+            self.reload()
+
+        key = (dataset, model_type)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry
+
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key)
+        return entry
+
+    def resident(self, dataset, model_type):
+        """The loaded entry or None, without loading, reload checks or locks"""
+        return self._entries.get((dataset, model_type))
+
+    def load_all(self):
+        """Eagerly load every configured entry, reporting failures instead of raising"""
+        errors = {}
+        for key in self.keys():
+            try:
+                with self._key_lock(key):
+                    self._load(key)
+            except Exception as e:
+                errors['/'.join(key)] = str(e)
+                print(f"Error loading model {key[0]}/{key[1]}: {e}")
+        return errors
+
+    def reload(self, force=False):
+        """
+        Rebuild loaded entries whose files changed on disk (or all of them when
+        `force` is set). Returns the list of reloaded "dataset/model" keys.
+        """
+        reloaded = []
+        for key, entry in list(self._entries.items()):
+            try:
+                if not force and self.file_version(*key) == entry['version']:
+                    continue
+                with self._key_lock(key):
+                    self._load(key)
+                reloaded.append('/'.join(key))
+                for callback in self._listeners:
+                    callback(*key)
+            except Exception as e:
+                # Keep serving the previous version if the new file is unreadable
+                print(f"Error reloading model {key[0]}/{key[1]}: {e}")
+        return reloaded
+
+    def status(self):
+        """Summary of what is resident, for diagnostics endpoints"""
+        return {
+            '/'.join(key): {
+                'version': list(entry['version']),
+                'loaded_at': entry['loaded_at'],
+                'content_hash': entry.get('content_hash'),
+            }
+            for key, entry in self._entries.items()
+        }
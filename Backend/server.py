@@ -1,16 +1,143 @@
-from flask import Flask, request, jsonify, send_file
+import time
+STARTED = time.perf_counter()
+
+from flask import Flask, Request, Response, request, jsonify, send_file, stream_with_context, g, has_request_context
 import pickle
 import numpy as np
-import pandas as pd
-from tensorflow.keras.models import load_model
 import os
+import io
+import shutil
+import csv
 import json
+import hashlib
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from werkzeug.utils import secure_filename
 from flask_cors import CORS, cross_origin
+from registry import ModelRegistry
+from batching import MicroBatcher
+from stats import DatasetProfiler
+from storage import ColumnarWriter, ColumnarDataset
+from cache import PredictionCache, feature_digest
+from worker_pool import InferencePool, StaleModelError
+from knn_index import load_knn_index
+from flat_forest import FlatForest
+from cnn_runtime import load_cnn_runtime
+from feature_vector import FeatureVectorizer
+from catalog import DatasetCatalog, SORT_COLUMNS
+from jobs import JobQueue, start_workers
+from artifact import load_model_file, artifact_version
+from explain import path_contributions, nearest_neighbors, gradient_times_input
+from drift import DriftMonitor
+from encoding import (
+    OrjsonProvider, orjson, JSON, ARROW, negotiate, encode_body, choose_coding, compress
+)
+from lazy import LazyModule
+from metrics import MetricsRegistry, StageTimer, NullTimer, SIZE_BUCKETS
+
+# pandas is only imported by the routes and model loads that use it
+pd = LazyModule('pandas')
+
+class ApiRequest(Request):
+    """Request with per-endpoint upload size caps for the streaming endpoints"""
+    
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'upload_predict':
+            return app.config['UPLOAD_PREDICT_MAX_CONTENT_LENGTH']
+        if self.endpoint == 'upload_dataset':
+            return app.config['UPLOAD_DATASET_MAX_CONTENT_LENGTH']
+        return app.config['MAX_CONTENT_LENGTH']
 
 app = Flask(__name__)
+app.request_class = ApiRequest
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# /upload_predict streams its input, so it is not bound by MAX_CONTENT_LENGTH (None = no limit)
+app.config['UPLOAD_PREDICT_MAX_CONTENT_LENGTH'] = None
+# Rows read, scored and streamed back per chunk by /upload_predict
+app.config['UPLOAD_PREDICT_CHUNK_ROWS'] = int(os.environ.get('UPLOAD_PREDICT_CHUNK_ROWS', '10000'))
+# Uploaded datasets are profiled in chunks, so their cap can be raised well past MAX_CONTENT_LENGTH
+app.config['UPLOAD_DATASET_MAX_CONTENT_LENGTH'] = int(os.environ.get('UPLOAD_DATASET_MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
+# Rows per chunk when profiling uploaded datasets
+app.config['DATASET_CHUNK_ROWS'] = int(os.environ.get('DATASET_CHUNK_ROWS', '50000'))
+# Largest page /preview_dataset will return
+app.config['PREVIEW_MAX_LIMIT'] = int(os.environ.get('PREVIEW_MAX_LIMIT', '1000'))
+# SQLite index of uploaded datasets behind /list_datasets (rebuilt from the metadata files when empty)
+app.config['DATASET_CATALOG_PATH'] = os.environ.get('DATASET_CATALOG_PATH', os.path.join('uploads', 'catalog.sqlite3'))
+# Largest page /list_datasets will return
+app.config['LIST_DATASETS_MAX_LIMIT'] = int(os.environ.get('LIST_DATASETS_MAX_LIMIT', '1000'))
+# Background jobs (jobs.py): SQLite queue and the folder holding their result chunks
+app.config['JOB_DB_PATH'] = os.environ.get('JOB_DB_PATH', os.path.join('uploads', 'jobs.sqlite3'))
+app.config['JOB_RESULTS_FOLDER'] = os.environ.get('JOB_RESULTS_FOLDER', os.path.join('uploads', 'jobs'))
+# Worker processes started by `python server.py` (0 = run `python jobs.py worker` separately)
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', '0'))
+app.config['JOB_POLL_INTERVAL'] = float(os.environ.get('JOB_POLL_INTERVAL', '0.5'))
+# A running job whose worker has not reported progress for this long is queued again
+app.config['JOB_STALE_SECONDS'] = float(os.environ.get('JOB_STALE_SECONDS', '300'))
+# Rows per result chunk of a score_dataset job
+app.config['JOB_CHUNK_ROWS'] = int(os.environ.get('JOB_CHUNK_ROWS', '10000'))
+# Load every model at startup instead of on first use
+app.config['MODEL_PRELOAD'] = os.environ.get('MODEL_PRELOAD', '0') == '1'
+# Seconds between mtime checks for hot reload (0 disables automatic checks)
+app.config['MODEL_RELOAD_INTERVAL'] = float(os.environ.get('MODEL_RELOAD_INTERVAL', '0'))
+# LRU/TTL cache of /predict results keyed by model version and canonicalized features
+app.config['PREDICTION_CACHE'] = os.environ.get('PREDICTION_CACHE', '1') == '1'
+app.config['PREDICTION_CACHE_MAX_BYTES'] = int(os.environ.get('PREDICTION_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+app.config['PREDICTION_CACHE_TTL'] = float(os.environ.get('PREDICTION_CACHE_TTL', '3600'))
+# Low mantissa bits ignored when hashing features (16 bits ~ 1e-11 relative)
+app.config['PREDICTION_CACHE_QUANT_BITS'] = int(os.environ.get('PREDICTION_CACHE_QUANT_BITS', '16'))
+# Pre-forked processes that share the sklearn models and score large batches across cores (0 disables)
+app.config['WORKER_POOL_PROCESSES'] = int(os.environ.get('WORKER_POOL_PROCESSES', '0'))
+# Batches smaller than this are scored in-process; larger ones are split into slices of at least this size
+app.config['WORKER_POOL_MIN_ROWS'] = int(os.environ.get('WORKER_POOL_MIN_ROWS', '512'))
+# Opt-in coalescing of concurrent single-sample /predict calls into batches
+app.config['MICRO_BATCHING'] = os.environ.get('MICRO_BATCHING', '0') == '1'
+app.config['MICRO_BATCH_MAX_SIZE'] = int(os.environ.get('MICRO_BATCH_MAX_SIZE', '64'))
+app.config['MICRO_BATCH_MAX_WAIT_MS'] = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', '2'))
+# KNN search: 'sklearn' (the pickled estimator), 'exact' (vectorized brute force) or 'ivf' (approximate)
+app.config['KNN_ENGINE'] = os.environ.get('KNN_ENGINE', 'sklearn')
+# IVF cells built at load when no exported index exists (0 = sqrt of the training rows)
+app.config['KNN_NLIST'] = int(os.environ.get('KNN_NLIST', '0'))
+# IVF cells scanned per query: higher is closer to exact, lower is faster
+app.config['KNN_NPROBE'] = int(os.environ.get('KNN_NPROBE', '8'))
+# RF scoring: 'flat' (flat-array evaluator, bit-identical to sklearn) or 'sklearn'
+app.config['RF_ENGINE'] = os.environ.get('RF_ENGINE', 'flat')
+# Larger batches go to sklearn's compiled traversal, which wins at that size
+app.config['RF_FLAT_MAX_ROWS'] = int(os.environ.get('RF_FLAT_MAX_ROWS', '512'))
+# Soft-vote weights of model "ensemble" per dataset, e.g. {"k2pandc": {"rf": 2, "knn": 1, "cnn": 1}}
+# Unlisted models weigh 1; a weight of 0 leaves the model out
+app.config['ENSEMBLE_WEIGHTS'] = json.loads(os.environ.get('ENSEMBLE_WEIGHTS', '{}'))
+# Threads running ensemble members concurrently (the request thread runs one member itself)
+app.config['ENSEMBLE_THREADS'] = int(os.environ.get('ENSEMBLE_THREADS', '8'))
+# Models to load and score once at startup: comma-separated dataset:model pairs, or 'all'
+app.config['WARMUP'] = os.environ.get('WARMUP', '')
+# CNN: 'auto' runs the NumPy export (cnn_runtime.py) when one is current, else Keras; 'keras' always uses Keras
+app.config['CNN_RUNTIME'] = os.environ.get('CNN_RUNTIME', 'auto')
+# Fill features missing from a /predict request with their training mean (reported as
+# imputed_features) instead of rejecting the request
+app.config['FEATURE_IMPUTATION'] = os.environ.get('FEATURE_IMPUTATION', '1') == '1'
+# Check the content hash of memory-mapped model artifacts (artifact.py) when loading them
+app.config['ARTIFACT_VERIFY'] = os.environ.get('ARTIFACT_VERIFY', '1') == '1'
+# Most samples one /explain request may ask for
+app.config['EXPLAIN_MAX_SAMPLES'] = int(os.environ.get('EXPLAIN_MAX_SAMPLES', '1000'))
+# Add a Server-Timing header with per-stage durations to every response
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') == '1'
+# Track /predict and /batch_predict inputs against each model's training statistics (GET /drift)
+app.config['DRIFT_MONITOR'] = os.environ.get('DRIFT_MONITOR', '1') == '1'
+# Observations a feature needs before /drift scores it
+app.config['DRIFT_MIN_SAMPLES'] = int(os.environ.get('DRIFT_MIN_SAMPLES', '100'))
+# PSI at which /drift flags a feature as drifted (0.1-0.25 is usually read as moderate)
+app.config['DRIFT_PSI_THRESHOLD'] = float(os.environ.get('DRIFT_PSI_THRESHOLD', '0.25'))
+# Encode JSON with orjson when it is installed
+app.config['FAST_JSON'] = os.environ.get('FAST_JSON', '1') == '1'
+# Compress responses with zstd or gzip when the client accepts it...
+app.config['RESPONSE_COMPRESSION'] = os.environ.get('RESPONSE_COMPRESSION', '1') == '1'
+# ...and the body is at least this large
+app.config['RESPONSE_COMPRESSION_MIN_BYTES'] = int(os.environ.get('RESPONSE_COMPRESSION_MIN_BYTES', '1024'))
+if app.config['FAST_JSON'] and orjson is not None:
+    app.json = OrjsonProvider(app)
 CORS(app)
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
@@ -82,68 +209,218 @@ FEATURE_MAPPING_FILES = {
 }
 
 def load_sklearn_model(model_path):
-    """Load scikit-learn models (KNN, RF)"""
-    with open(model_path, 'rb') as f:
-        model_data = pickle.load(f)
-    return model_data
+    """Load scikit-learn models (KNN, RF); (model_data, artifact content hash or None)"""
+    return load_model_file(model_path, verify=app.config['ARTIFACT_VERIFY'])
 
 def load_cnn_model_data(model_path, preprocessing_path):
     """Load CNN model and preprocessing objects"""
-    model = load_model(model_path)
-    with open(preprocessing_path, 'rb') as f:
-        preprocessing_data = pickle.load(f)
-    return model, preprocessing_data
+    model = load_cnn_runtime(model_path) if app.config['CNN_RUNTIME'] == 'auto' else None
+    if model is None:
+        # TensorFlow is only imported when there is no NumPy export to serve
+        print(f"No current NumPy export of {model_path}; loading it with TensorFlow")
+        try:
+            from tensorflow.keras.models import load_model
+        except ImportError:
+            raise RuntimeError(
+                f"TensorFlow is not installed and {model_path} has no current NumPy export; "
+                f"run `python cnn_runtime.py export {model_path}`"
+            )
+        model = load_model(model_path)
+    preprocessing_data, content_hash = load_model_file(preprocessing_path, verify=app.config['ARTIFACT_VERIFY'])
+    return model, preprocessing_data, content_hash
+
+def input_fingerprint(model_data):
+    """Models with equal fingerprints take the same scaled input (same features, same scaler)"""
+    return hashlib.sha1(pickle.dumps((list(model_data['feature_names']), model_data['scaler']))).hexdigest()
+
+def load_model_entry(dataset, model_type, spec):
+    """
+    Load a MODELS entry into the shape shared by the prediction paths:
+    'model' is the estimator or Keras model and 'model_data' holds the
+    scaler, label encoder, feature_names and feature_means.
+    """
+    if model_type == 'cnn':
+        model, preprocessing_data, content_hash = load_cnn_model_data(spec['model'], spec['preprocessing'])
+        entry = {'model': model, 'model_data': preprocessing_data}
+    else:
+        model_data, content_hash = load_sklearn_model(spec)
+        entry = {'model': model_data['model'], 'model_data': model_data}
+        # 'engine' replaces the estimator's predict_proba with a faster equivalent
+        if model_type == 'knn' and app.config['KNN_ENGINE'] != 'sklearn':
+            entry['engine'] = load_knn_index(
+                model_data['model'], spec, app.config['KNN_ENGINE'],
+                nlist=app.config['KNN_NLIST'], nprobe=app.config['KNN_NPROBE']
+            )
+        elif model_type == 'rf' and app.config['RF_ENGINE'] == 'flat':
+            entry['engine'] = FlatForest(model_data['model'], max_rows=app.config['RF_FLAT_MAX_ROWS'])
+    # Set when the model came from an artifact (artifact.py); None for a plain .pkl
+    entry['content_hash'] = content_hash
+    entry['input_key'] = input_fingerprint(entry['model_data'])
+    entry['vectorizer'] = FeatureVectorizer.from_model_data(entry['model_data'], app.config['FEATURE_IMPUTATION'])
+    return entry
+
+def model_file_version(path):
+    """A model file's mtime plus the mtime and content hash of its artifact, which is loaded in its place"""
+    return (os.stat(path).st_mtime_ns, artifact_version(path))
+
+model_registry = ModelRegistry(
+    MODELS,
+    load_model_entry,
+    eager=app.config['MODEL_PRELOAD'],
+    reload_interval=app.config['MODEL_RELOAD_INTERVAL'],
+    path_version=model_file_version
+)
+
+prediction_cache = PredictionCache(
+    max_bytes=app.config['PREDICTION_CACHE_MAX_BYTES'],
+    ttl=app.config['PREDICTION_CACHE_TTL']
+) if app.config['PREDICTION_CACHE'] else None
+
+if prediction_cache is not None:
+    # Results of a replaced model must never be served again
+    model_registry.add_reload_listener(prediction_cache.invalidate)
+
+drift_monitor = DriftMonitor(
+    min_samples=app.config['DRIFT_MIN_SAMPLES'],
+    psi_threshold=app.config['DRIFT_PSI_THRESHOLD']
+) if app.config['DRIFT_MONITOR'] else None
+
+if drift_monitor is not None:
+    # A replaced model has a new reference; start its statistics over
+    model_registry.add_reload_listener(drift_monitor.reset)
+
+metrics = MetricsRegistry()
+request_seconds = metrics.histogram(
+    'http_request_duration_seconds', 'Time to produce a response (streamed bodies excluded)',
+    ('route', 'method', 'status')
+)
+stage_seconds = metrics.histogram(
+    'prediction_stage_duration_seconds', 'Time spent in each stage of a prediction',
+    ('route', 'dataset', 'model', 'stage')
+)
+error_count = metrics.counter(
+    'http_request_errors_total', 'Responses with a 4xx or 5xx status', ('route', 'status')
+)
+batch_rows = metrics.histogram(
+    'prediction_batch_rows', 'Rows scored per model call', ('dataset', 'model'), buckets=SIZE_BUCKETS
+)
+metrics.callback(
+    'prediction_cache_events_total', 'Prediction cache lookups and removals', 'counter',
+    lambda: {
+        (event,): prediction_cache.stats()[event]
+        for event in ('hits', 'misses', 'evictions', 'expirations', 'invalidations')
+    } if prediction_cache is not None else {},
+    ('event',)
+)
+metrics.callback(
+    'prediction_cache_bytes', 'Approximate size of the cached results', 'gauge',
+    lambda: {(): prediction_cache.size_bytes} if prediction_cache is not None else {}
+)
+metrics.callback(
+    'resident_models', 'Models currently loaded', 'gauge',
+    lambda: {(): len(model_registry.status())}
+)
+metrics.callback(
+    'feature_drift_psi', 'Population stability index of live inputs against the training reference', 'gauge',
+    lambda: drift_monitor.psi() if drift_monitor is not None else {},
+    ('dataset', 'model', 'feature')
+)
+
+def current_timer():
+    """The request's StageTimer; work outside a request is recorded under route 'background'"""
+    if has_request_context() and 'timer' in g:
+        return g.timer
+    return StageTimer(stage_seconds, 'background')
 
-def predict_sklearn(model_data, features):
-    """Make prediction using sklearn models"""
+def stage(name, dataset=None, model_type=None):
+    """Context manager timing one stage of the current request"""
+    return current_timer().stage(name, dataset, model_type)
+
+def observe_inputs(dataset, model_type, entry, matrix):
+    """Fold a request's feature matrix into the drift monitor; never fails the request"""
+    if drift_monitor is None:
+        return
     try:
-        # Create DataFrame
-        input_df = pd.DataFrame([features], columns=model_data['feature_names'])
-        
-        # Scale the input
-        input_scaled = model_data['scaler'].transform(input_df)
+        with stage('drift'):
+            drift_monitor.observe(dataset, model_type, entry, matrix)
+    except Exception as e:
+        print(f"Drift monitor error for {dataset}/{model_type}: {e}")
+
+def prediction_cache_key(dataset, model_type, entry, row):
+    """Cache key for a single-sample request's complete, unscaled input row"""
+    digest = feature_digest(row, app.config['PREDICTION_CACHE_QUANT_BITS'])
+    # An artifact's content hash names the model itself; file mtimes are the fallback
+    return (dataset, model_type, entry['content_hash'] or entry['version'], digest)
+
+def predict_sklearn(model_data, features, engine=None, vectorizer=None, vectorized=None):
+    """Make prediction using sklearn models (`vectorized`: the (row, imputed) already built from features)"""
+    try:
+        vectorizer = vectorizer or FeatureVectorizer.from_model_data(model_data, app.config['FEATURE_IMPUTATION'])
         
-        # Get prediction
-        prediction = model_data['model'].predict(input_scaled)[0]
-        prediction_label = model_data['label_encoder'].inverse_transform([prediction])[0]
+        # Build the input row in feature_names order, imputing missing features
+        if vectorized is None:
+            with stage('features'):
+                vectorized = vectorizer.vector(features)
+        input_row, imputed = vectorized
         
-        # Get probabilities
-        probabilities = model_data['model'].predict_proba(input_scaled)[0]
+        # Scale the input
+        with stage('scale'):
+            input_scaled = vectorizer.scale(input_row, out=input_row)
+        
+        # Get prediction and probabilities
+        with stage('inference'):
+            if engine is not None:
+                # One pass: the label is the argmax of the probabilities, as in sklearn
+                probabilities = engine.predict_proba(input_scaled)[0]
+                prediction = model_data['model'].classes_[np.argmax(probabilities)]
+            else:
+                prediction = model_data['model'].predict(input_scaled)[0]
+                probabilities = model_data['model'].predict_proba(input_scaled)[0]
+        with stage('decode'):
+            prediction_label = model_data['label_encoder'].inverse_transform([prediction])[0]
         all_classes = model_data['label_encoder'].classes_
         
         # Create confidence dictionary
         confidence_dict = {str(all_classes[i]): float(probabilities[i] * 100) 
                           for i in range(len(all_classes))}
         
-        return {
+        return with_imputed({
             'success': True,
             'prediction': str(prediction_label),
             'confidence_scores': confidence_dict
-        }
+        }, imputed)
     except Exception as e:
         return {
             'success': False,
             'error': str(e)
         }
 
-def predict_cnn(model, preprocessing_data, features):
-    """Make prediction using CNN model"""
+def predict_cnn(model, preprocessing_data, features, vectorizer=None, vectorized=None):
+    """Make prediction using CNN model (`vectorized`: the (row, imputed) already built from features)"""
     try:
-        # Create DataFrame
-        input_df = pd.DataFrame([features], columns=preprocessing_data['feature_names'])
+        vectorizer = vectorizer or FeatureVectorizer.from_model_data(preprocessing_data, app.config['FEATURE_IMPUTATION'])
+        
+        # Build the input row in feature_names order, imputing missing features
+        if vectorized is None:
+            with stage('features'):
+                vectorized = vectorizer.vector(features)
+        input_row, imputed = vectorized
         
         # Scale the input
-        input_scaled = preprocessing_data['scaler'].transform(input_df)
+        with stage('scale'):
+            input_scaled = vectorizer.scale(input_row, out=input_row)
         
         # Reshape for CNN
         input_reshaped = input_scaled.reshape(input_scaled.shape[0], input_scaled.shape[1], 1)
         
         # Get prediction probabilities
-        probabilities = model.predict(input_reshaped, verbose=0)[0]
+        with stage('inference'):
+            probabilities = model.predict(input_reshaped, verbose=0)[0]
         
         # Get predicted class
         prediction = np.argmax(probabilities)
-        prediction_label = preprocessing_data['label_encoder'].inverse_transform([prediction])[0]
+        with stage('decode'):
+            prediction_label = preprocessing_data['label_encoder'].inverse_transform([prediction])[0]
         
         # Get all classes
         all_classes = preprocessing_data['label_encoder'].classes_
@@ -152,32 +429,305 @@ def predict_cnn(model, preprocessing_data, features):
         confidence_dict = {str(all_classes[i]): float(probabilities[i] * 100) 
                           for i in range(len(all_classes))}
         
-        return {
+        return with_imputed({
             'success': True,
             'prediction': str(prediction_label),
             'confidence_scores': confidence_dict
-        }
+        }, imputed)
     except Exception as e:
         return {
             'success': False,
             'error': str(e)
         }
 
+def with_imputed(result, imputed):
+    """Report the features a prediction filled in with their training mean"""
+    if imputed:
+        result['imputed_features'] = imputed
+    return result
+
+def build_feature_matrix(feature_names, samples):
+    """
+    Turn a list of feature dicts into one float64 matrix in feature_names order.
+    
+    Returns (matrix, errors) where errors maps sample index to a message for
+    rows that are not usable (missing, non-numeric or infinite values); those
+    rows must be skipped.
+    """
+    matrix = np.full((len(samples), len(feature_names)), np.nan)
+    errors = {}
+    for idx, sample in enumerate(samples):
+        if not isinstance(sample, dict):
+            errors[idx] = 'Sample must be an object of feature values'
+            continue
+        
+        row = matrix[idx]
+        try:
+            # None becomes NaN, numeric strings are parsed
+            row[:] = [sample.get(name) for name in feature_names]
+        except (TypeError, ValueError):
+            bad = []
+            for col, name in enumerate(feature_names):
+                try:
+                    row[col] = np.nan if sample.get(name) is None else float(sample[name])
+                except (TypeError, ValueError):
+                    bad.append(name)
+            errors[idx] = f'Non-numeric values for features: {bad}'
+            continue
+        
+        # Infinity parses as a float but cannot be scaled
+        infinite = np.isinf(row)
+        if infinite.any():
+            errors[idx] = f'Non-numeric values for features: {[feature_names[col] for col in np.flatnonzero(infinite)]}'
+            continue
+        
+        missing = np.isnan(row)
+        if missing.any():
+            errors[idx] = f'Missing values for features: {[feature_names[col] for col in np.flatnonzero(missing)]}'
+    return matrix, errors
+
+def scale_matrix(entry, matrix):
+    """Apply a model's scaler to a feature matrix in its feature_names order"""
+    with stage('scale'):
+        return entry['vectorizer'].scale(matrix)
+
+def predict_proba_batch(entry, model_type, matrix):
+    """Scale a feature matrix once and score it with a single model call"""
+    return predict_proba_scaled(entry, model_type, scale_matrix(entry, matrix))
+
+def predict_proba_scaled(entry, model_type, input_scaled, timer=None):
+    """Probability matrix for already-scaled inputs (timed on `timer`, default the request's)"""
+    with (timer or current_timer()).stage('inference', model=model_type):
+        if model_type == 'cnn':
+            input_reshaped = input_scaled.reshape(input_scaled.shape[0], input_scaled.shape[1], 1)
+            return np.asarray(entry['model'].predict(input_reshaped, verbose=0))
+        if 'engine' in entry:
+            return entry['engine'].predict_proba(input_scaled)
+        return entry['model'].predict_proba(input_scaled)
+
+def decode_predictions(entry, model_type, probabilities):
+    """Vectorized argmax and label decoding for a probability matrix"""
+    label_encoder = entry['model_data']['label_encoder']
+    with stage('decode'):
+        class_idx = np.argmax(probabilities, axis=1)
+        if model_type != 'cnn':
+            # sklearn estimators emit columns in model.classes_ order
+            class_idx = entry['model'].classes_[class_idx]
+        labels = label_encoder.inverse_transform(class_idx)
+    class_names = [str(c) for c in label_encoder.classes_]
+    return labels, class_names
+
+def score_in_worker(entry, model_type, matrix):
+    """predict_proba_batch for the worker pool's children, untimed: they must not take the metrics locks"""
+    return predict_proba_scaled(entry, model_type, entry['vectorizer'].scale(matrix), timer=NullTimer())
+
+inference_pool = InferencePool(
+    model_registry,
+    score_in_worker,
+    app.config['WORKER_POOL_PROCESSES'],
+    min_rows=app.config['WORKER_POOL_MIN_ROWS']
+) if app.config['WORKER_POOL_PROCESSES'] > 0 else None
+
+if inference_pool is not None:
+    model_registry.add_reload_listener(inference_pool.mark_stale)
+
+def predict_proba_parallel(dataset, model_type, entry, matrix):
+    """predict_proba_batch, spread over the worker pool when the batch is large enough"""
+    batch_rows.observe((dataset, model_type), len(matrix))
+    if inference_pool is not None and inference_pool.accepts(model_type, len(matrix)):
+        try:
+            with stage('pool_inference'):
+                return inference_pool.predict_proba((dataset, model_type), entry['version'], matrix)
+        except StaleModelError:
+            # A reload raced the fork; answer in-process and re-fork for the next batch
+            inference_pool.mark_stale()
+        except Exception as e:
+            # The in-process path gives the same answer, just on one core
+            print(f"Worker pool error for {dataset}/{model_type}, scoring in-process: {e}")
+    return predict_proba_batch(entry, model_type, matrix)
+
+def score_matrix(dataset, model_type, entry, matrix):
+    """Score a validated feature matrix, returning one result dict per row"""
+    probabilities = predict_proba_parallel(dataset, model_type, entry, matrix)
+    labels, class_names = decode_predictions(entry, model_type, probabilities)
+    return [
+        {
+            'prediction': str(label),
+            'confidence_scores': dict(zip(class_names, row))
+        }
+        for label, row in zip(labels, (probabilities * 100).tolist())
+    ]
+
+ensemble_executor = ThreadPoolExecutor(
+    max_workers=app.config['ENSEMBLE_THREADS'], thread_name_prefix='ensemble'
+)
+
+def ensemble_weights(dataset):
+    """Soft-vote weight of each model in a dataset's ensemble"""
+    configured = app.config['ENSEMBLE_WEIGHTS'].get(dataset, {})
+    weights = {model_type: float(configured.get(model_type, 1)) for model_type in MODELS[dataset]}
+    return {model_type: weight for model_type, weight in weights.items() if weight > 0}
+
+def member_class_names(entry, model_type):
+    """Class name of each probability column a model emits"""
+    classes = entry['model_data']['label_encoder'].classes_
+    if model_type != 'cnn':
+        classes = classes[entry['model'].classes_]
+    return [str(c) for c in classes]
+
+def score_ensemble(dataset, samples):
+    """
+    Score samples with every model of a dataset at once and soft-vote the results
+    
+    Each distinct feature list is validated once and each distinct scaler
+    input is scaled once; the members then run concurrently, so the latency
+    is close to the slowest member's. Returns (results, errors, info): one
+    result per usable sample in order, {sample index: message} for the rest,
+    and the weights used plus {model_type: message} for members left out.
+    """
+    weights = ensemble_weights(dataset)
+    entries, failed_models = {}, {}
+    for model_type in weights:
+        try:
+            entries[model_type] = model_registry.get(dataset, model_type)
+        except Exception as e:
+            failed_models[model_type] = str(e)
+    if not entries:
+        raise RuntimeError(f'No ensemble model could be loaded for {dataset}: {failed_models}')
+    
+    # A sample has to be usable by every member
+    matrices, errors = {}, {}
+    for entry in entries.values():
+        names = tuple(entry['model_data']['feature_names'])
+        if names not in matrices:
+            with stage('features'):
+                matrices[names], row_errors = build_feature_matrix(list(names), samples)
+            for idx, error in row_errors.items():
+                errors.setdefault(idx, error)
+    valid_idx = [idx for idx in range(len(samples)) if idx not in errors]
+    if not valid_idx:
+        return [], errors, {'weights': {}, 'failed_models': failed_models}
+    
+    for model_type, entry in entries.items():
+        observe_inputs(dataset, model_type, entry, matrices[tuple(entry['model_data']['feature_names'])][valid_idx])
+    
+    scaled = {}
+    for entry in entries.values():
+        if entry['input_key'] not in scaled:
+            matrix = matrices[tuple(entry['model_data']['feature_names'])][valid_idx]
+            scaled[entry['input_key']] = scale_matrix(entry, matrix)
+    
+    # Members on the executor threads record their stages on this request's timer
+    timer = current_timer()
+    
+    def run(model_type):
+        entry = entries[model_type]
+        batch_rows.observe((dataset, model_type), len(valid_idx))
+        probabilities = predict_proba_scaled(entry, model_type, scaled[entry['input_key']], timer)
+        return np.asarray(probabilities, dtype=np.float64), member_class_names(entry, model_type)
+    
+    members = list(entries)
+    futures = {model_type: ensemble_executor.submit(run, model_type) for model_type in members[1:]}
+    outputs = {}
+    for model_type in members:
+        try:
+            outputs[model_type] = futures[model_type].result() if model_type in futures else run(model_type)
+        except Exception as e:
+            failed_models[model_type] = str(e)
+    if not outputs:
+        raise RuntimeError(f'Every ensemble model failed for {dataset}: {failed_models}')
+    
+    # Weighted mean of the members' probabilities over the union of their classes
+    with stage('vote'):
+        class_names = list(dict.fromkeys(name for _, names in outputs.values() for name in names))
+        column = {name: col for col, name in enumerate(class_names)}
+        combined = np.zeros((len(valid_idx), len(class_names)))
+        for model_type, (probabilities, names) in outputs.items():
+            combined[:, [column[name] for name in names]] += weights[model_type] * probabilities
+        combined /= sum(weights[model_type] for model_type in outputs)
+    
+    members_scored = {
+        model_type: (names, np.argmax(probabilities, axis=1), (probabilities * 100).tolist())
+        for model_type, (probabilities, names) in outputs.items()
+    }
+    results = []
+    for row, (winner, scores) in enumerate(zip(np.argmax(combined, axis=1), (combined * 100).tolist())):
+        results.append({
+            'prediction': class_names[winner],
+            'confidence_scores': dict(zip(class_names, scores)),
+            'models': {
+                model_type: {
+                    'prediction': names[best[row]],
+                    'confidence_scores': dict(zip(names, member_scores[row]))
+                }
+                for model_type, (names, best, member_scores) in members_scored.items()
+            }
+        })
+    info = {
+        'weights': {model_type: weights[model_type] for model_type in outputs},
+        'failed_models': failed_models
+    }
+    return results, errors, info
+
+def predict_ensemble(dataset, features):
+    """Single-sample ensemble prediction in the shape of predict_sklearn's result"""
+    results, errors, info = score_ensemble(dataset, [features])
+    if errors:
+        return {'success': False, 'error': errors[0]}
+    return dict(success=True, **results[0], **info)
+
+def score_coalesced(key, matrix):
+    """MicroBatcher callback: score rows queued for one (dataset, model)"""
+    return score_matrix(key[0], key[1], model_registry.get(*key), matrix)
+
+micro_batcher = MicroBatcher(
+    score_coalesced,
+    max_batch_size=app.config['MICRO_BATCH_MAX_SIZE'],
+    max_wait=app.config['MICRO_BATCH_MAX_WAIT_MS'] / 1000
+) if app.config['MICRO_BATCHING'] else None
+
+def predict_coalesced(dataset, model_type, entry, features, vectorized=None):
+    """Single-sample prediction routed through the micro-batcher (`vectorized` must not be a reused buffer)"""
+    if vectorized is None:
+        try:
+            # The row waits in the batcher's queue, so it gets its own array
+            out = np.empty((1, len(entry['model_data']['feature_names'])))
+            vectorized = entry['vectorizer'].vector(features, out=out)
+        except ValueError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    row, imputed = vectorized
+    result = micro_batcher.submit((dataset, model_type), row[0])
+    return with_imputed(dict(result, success=True), imputed)
+
 @app.route('/')
 def home():
     return jsonify({
         'message': 'Exoplanet Prediction API',
         'endpoints': {
             '/predict': 'POST - Make predictions',
+            '/explain': 'POST - Per-feature attributions for one or many predictions',
             '/get_features': 'GET - Get required features for a dataset',
             '/upload_predict': 'POST - Upload CSV and get predictions',
             '/models': 'GET - List available models',
+            '/reload_models': 'POST - Reload models whose files changed',
+            '/batching_stats': 'GET - Micro-batching queue and batch metrics',
+            '/cache_stats': 'GET - Prediction cache counters',
+            '/worker_pool_stats': 'GET - Multi-process inference pool counters',
+            '/startup_stats': 'GET - Import, model load and first-inference timings',
+            '/metrics': 'GET - Prometheus metrics: latency per route and stage, errors, cache and batch sizes',
+            '/drift': 'GET - Input drift of live traffic against each model\'s training statistics; DELETE - Reset it',
             '/upload_dataset': 'POST - Upload custom dataset',
             '/list_datasets': 'GET - List all uploaded datasets',
             '/dataset_info/<name>': 'GET - Get dataset information',
             '/preview_dataset/<name>': 'GET - Preview dataset rows',
             '/download_dataset/<name>': 'GET - Download dataset',
-            '/delete_dataset/<name>': 'DELETE - Delete dataset'
+            '/delete_dataset/<name>': 'DELETE - Delete dataset',
+            '/jobs': 'POST - Queue a profile_dataset or score_dataset job; GET - List jobs',
+            '/jobs/<job_id>': 'GET - Job status and progress; DELETE - Cancel or delete a job',
+            '/jobs/<job_id>/results': 'GET - One NDJSON result chunk of a scoring job'
         }
     })
 
@@ -189,6 +739,193 @@ def list_models():
         'models': model_descriptions
     })
 
+@app.route('/reload_models', methods=['POST'])
+def reload_models():
+    """
+    Hot-reload resident models whose files changed on disk
+    
+    Query params:
+    - force: "1" to reload every resident model regardless of mtime
+    """
+    try:
+        force = request.args.get('force', '0') == '1'
+        reloaded = model_registry.reload(force=force)
+        return jsonify({
+            'success': True,
+            'reloaded': reloaded,
+            'models': model_registry.status()
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/batching_stats', methods=['GET'])
+def batching_stats():
+    """Queue depth, batch size and wait-time metrics of the micro-batcher"""
+    return jsonify({
+        'success': True,
+        'enabled': micro_batcher is not None,
+        'max_batch_size': app.config['MICRO_BATCH_MAX_SIZE'],
+        'max_wait_ms': app.config['MICRO_BATCH_MAX_WAIT_MS'],
+        'queues': micro_batcher.stats() if micro_batcher is not None else {}
+    })
+
+# dataset -> (mtime_ns, read-only mapping); re-parsed only when the CSV changes
+_feature_mappings = {}
+
+# cache key -> (version, serialized body, etag) for pre-serialized GET responses
+_json_response_cache = {}
+
+def parse_feature_mapping(mapping_file):
+    """Parse a feature mapping CSV into a read-only {feature_name: info} mapping"""
+    # Expected columns: feature_name, display_name, description, type, unit
+    mapping = {}
+    with open(mapping_file, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            name = row['feature_name']
+            mapping[name] = MappingProxyType({
+                'display_name': row.get('display_name') or name,
+                'description': row.get('description') or '',
+                'type': row.get('type') or 'numeric',
+                'unit': row.get('unit') or '',
+            })
+    return MappingProxyType(mapping)
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    """Hit/miss/eviction counters and size of the prediction cache"""
+    return jsonify({
+        'success': True,
+        'enabled': prediction_cache is not None,
+        'cache': prediction_cache.stats() if prediction_cache is not None else {}
+    })
+
+@app.route('/worker_pool_stats', methods=['GET'])
+def worker_pool_stats():
+    """Size and usage of the multi-process inference pool"""
+    return jsonify({
+        'success': True,
+        'enabled': inference_pool is not None,
+        'pool': inference_pool.stats() if inference_pool is not None else {}
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of the request, stage, cache and batch metrics"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/drift', methods=['GET'])
+def drift_report():
+    """
+    Per-feature statistics of the inputs each model has scored since startup
+    (or the last reset) and their drift from its training reference
+    
+    Query params:
+    - dataset, model: only report these
+    """
+    try:
+        if drift_monitor is None:
+            return jsonify({
+                'success': True,
+                'enabled': False,
+                'models': {}
+            })
+        return jsonify({
+            'success': True,
+            'enabled': True,
+            'min_samples': drift_monitor.min_samples,
+            'psi_threshold': drift_monitor.psi_threshold,
+            'models': drift_monitor.report(request.args.get('dataset'), request.args.get('model'))
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/drift', methods=['DELETE'])
+def reset_drift():
+    """Start the drift statistics over, for one dataset/model via the same query params or for all"""
+    if drift_monitor is None:
+        return jsonify({
+            'success': True,
+            'reset': 0
+        })
+    return jsonify({
+        'success': True,
+        'reset': drift_monitor.reset(request.args.get('dataset'), request.args.get('model'))
+    })
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.timer = StageTimer(stage_seconds, request.endpoint or 'unknown')
+
+@app.after_request
+def record_request_metrics(response):
+    if 'timer' not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_started
+    route = g.timer.route
+    request_seconds.observe((route, request.method, str(response.status_code)), elapsed)
+    if response.status_code >= 400:
+        error_count.inc((route, str(response.status_code)))
+    if app.config['SERVER_TIMING']:
+        timings = g.timer.server_timing()
+        total = f'total;dur={elapsed * 1000:.3f}'
+        response.headers['Server-Timing'] = f'{timings}, {total}' if timings else total
+    return response
+
+@app.after_request
+def compress_response(response):
+    """zstd/gzip-encode complete responses the client accepts compressed (streamed ones are left alone)"""
+    if (not app.config['RESPONSE_COMPRESSION'] or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.status_code in (204, 206, 304)
+            or response.status_code < 200):
+        return response
+    response.vary.add('Accept-Encoding')
+    coding = choose_coding(request.accept_encodings)
+    body = response.get_data()
+    if coding is None or len(body) < app.config['RESPONSE_COMPRESSION_MIN_BYTES']:
+        return response
+    with stage('compress'):
+        response.set_data(compress(body, coding))
+    response.headers['Content-Encoding'] = coding
+    # The compressed bytes differ, but the content is the same (and 304s still match)
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def negotiated_response(payload, table=None, table_keys=()):
+    """
+    `payload` as JSON, or as MessagePack or (for columnar payloads, whose
+    tabular part is `table`) an Arrow IPC stream when the Accept header asks
+    for it and the encoder is installed. An Arrow body carries the payload
+    minus `table_keys`, whose values the table holds.
+    """
+    media_type = negotiate(request.accept_mimetypes, columnar=table is not None)
+    with stage('serialize'):
+        if media_type == JSON:
+            response = jsonify(payload)
+        elif media_type == ARROW:
+            metadata = {key: value for key, value in payload.items() if key not in table_keys}
+            response = app.response_class(encode_body(metadata, media_type, table), mimetype=media_type)
+        else:
+            response = app.response_class(encode_body(payload, media_type), mimetype=media_type)
+    response.vary.add('Accept')
+    return response
+
+@app.route('/startup_stats', methods=['GET'])
+def startup_stats():
+    """How long the process took to import and to warm up each model"""
+    return jsonify({
+        'success': True,
+        'startup': startup_report
+    })
+
 def load_feature_mapping(dataset):
     """Load feature names and descriptions from CSV mapping file"""
     try:
@@ -196,20 +933,39 @@ def load_feature_mapping(dataset):
         if not mapping_file or not os.path.exists(mapping_file):
             return None
         
-        df = pd.read_csv(mapping_file)
-        # Expected columns: feature_name, display_name, description, type
-        mapping = {}
-        for _, row in df.iterrows():
-            mapping[row['feature_name']] = {
-                'display_name': row.get('display_name', row['feature_name']),
-                'description': row.get('description', ''),
-                'type': row.get('type', 'numeric'),
-            }
+        mtime = os.stat(mapping_file).st_mtime_ns
+        cached = _feature_mappings.get(dataset)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        
+        mapping = parse_feature_mapping(mapping_file)
+        _feature_mappings[dataset] = (mtime, mapping)
         return mapping
     except Exception as e:
         print(f"Error loading feature mapping: {e}")
         return None
 
+def feature_mapping_version(dataset):
+    """mtime of the mapping last parsed for a dataset (None if there is none)"""
+    cached = _feature_mappings.get(dataset)
+    return cached[0] if cached is not None else None
+
+def cached_json_response(cache_key, version, build):
+    """
+    Serve a pre-serialized JSON body, calling `build()` only when `version`
+    changes. The body's hash is sent as an ETag so clients polling with
+    If-None-Match get a 304.
+    """
+    cached = _json_response_cache.get(cache_key)
+    if cached is None or cached[0] != version:
+        body = app.json.dumps(build()).encode('utf-8')
+        cached = (version, body, hashlib.sha1(body).hexdigest())
+        _json_response_cache[cache_key] = cached
+    
+    response = app.response_class(cached[1], mimetype='application/json')
+    response.set_etag(cached[2])
+    return response.make_conditional(request)
+
 
 @app.route('/get_features', methods=['GET'])
 def get_features():
@@ -224,57 +980,49 @@ def get_features():
                     'success': False,
                     'error': 'CNN model only available for cumi dataset'
                 })
-            model_path = MODELS[dataset][model_type]['preprocessing']
-            with open(model_path, 'rb') as f:
-                preprocessing_data = pickle.load(f)
-            feature_names = preprocessing_data['feature_names']
-            feature_means = {k: float(v) for k, v in preprocessing_data['feature_means'].items()}
-        else:
-            model_path = MODELS[dataset][model_type]
-            with open(model_path, 'rb') as f:
-                model_data = pickle.load(f)
-            feature_names = model_data['feature_names']
-            feature_means = {k: float(v) for k, v in model_data['feature_means'].items()}
+        entry = model_registry.get(dataset, model_type)
         
         # Load feature mapping
         feature_mapping = load_feature_mapping(dataset)
         
-        # Build feature details
-        features_with_details = []
-        for feature in feature_names:
-            feature_info = {
-                'name': feature,
-                'default_value': feature_means.get(feature, 0.0)
-            }
+        def build():
+            model_data = entry['model_data']
+            feature_names = model_data['feature_names']
+            feature_means = {k: float(v) for k, v in model_data['feature_means'].items()}
             
-            # Add mapped information if available
-            if feature_mapping and feature in feature_mapping:
-                feature_info.update({
-                    'display_name': feature_mapping[feature]['display_name'],
-                    'description': feature_mapping[feature]['description'],
-                    'type': feature_mapping[feature]['type'],
-                })
-            else:
-                # Fallback to original name
-                feature_info.update({
-                    'display_name': feature,
-                    'description': '',
-                    'type': 'numeric',
-                })
+            # Build feature details
+            features_with_details = []
+            for feature in feature_names:
+                feature_info = {
+                    'name': feature,
+                    'default_value': feature_means.get(feature, 0.0)
+                }
+                
+                # Add mapped information if available
+                if feature_mapping and feature in feature_mapping:
+                    feature_info.update(feature_mapping[feature])
+                else:
+                    # Fallback to original name
+                    feature_info.update({
+                        'display_name': feature,
+                        'description': '',
+                        'type': 'numeric',
+                        'unit': '',
+                    })
+                
+                features_with_details.append(feature_info)
             
-            features_with_details.append(feature_info)
-        
-        response = jsonify({
-            'success': True,
-            'dataset': dataset,
-            'model': model_type,
-            'features': feature_names,  # Keep original for backward compatibility
-            'feature_details': features_with_details,  # New detailed format
-            'feature_defaults': feature_means
-        })
+            return {
+                'success': True,
+                'dataset': dataset,
+                'model': model_type,
+                'features': feature_names,  # Keep original for backward compatibility
+                'feature_details': features_with_details,  # New detailed format
+                'feature_defaults': feature_means
+            }
         
-        response.headers.add('Content-Type', 'application/json')
-        return response
+        version = (entry['version'], feature_mapping_version(dataset))
+        return cached_json_response(('get_features', dataset, model_type), version, build)
     except Exception as e:
         return jsonify({
             'success': False,
@@ -289,7 +1037,7 @@ def predict():
     Expected JSON format:
     {
         "dataset": "k2pandc" or "cumi",
-        "model": "knn", "rf", or "cnn",
+        "model": "knn", "rf", "cnn" or "ensemble",
         "features": {
             "feature1": value1,
             "feature2": value2,
@@ -323,30 +1071,62 @@ def predict():
                 'error': f'Invalid dataset. Choose from: {list(MODELS.keys())}'
             }), 400
         
-        if model_type not in MODELS[dataset]:
+        if model_type not in MODELS[dataset] and model_type != 'ensemble':
             return jsonify({
                 'success': False,
-                'error': f'Invalid model for {dataset}. Choose from: {list(MODELS[dataset].keys())}'
+                'error': f'Invalid model for {dataset}. Choose from: {list(MODELS[dataset].keys()) + ["ensemble"]}'
             }), 400
         
+        g.timer.dataset, g.timer.model = dataset, model_type
+        
         # Load feature mapping for response enrichment
-        feature_mapping = load_feature_mapping(dataset)
+        with stage('feature_mapping'):
+            feature_mapping = load_feature_mapping(dataset)
         
-        # Load and predict
-        if model_type == 'cnn':
-            model_path = MODELS[dataset][model_type]['model']
-            preprocessing_path = MODELS[dataset][model_type]['preprocessing']
-            model, preprocessing_data = load_cnn_model_data(model_path, preprocessing_path)
-            result = predict_cnn(model, preprocessing_data, features)
+        if model_type == 'ensemble':
+            result = predict_ensemble(dataset, features)
         else:
-            model_path = MODELS[dataset][model_type]
-            model_data = load_sklearn_model(model_path)
-            result = predict_sklearn(model_data, features)
+            # Predict with the resident model, reusing cached results for repeated inputs
+            with stage('model_load'):
+                entry = model_registry.get(dataset, model_type)
+            vectorizer = entry['vectorizer']
+            cache_key = cached = None
+            try:
+                # Built once, for the drift monitor, the cache key and the model (which scales it
+                # in place); in its own array, as the micro-batcher may queue it
+                with stage('features'):
+                    vectorized = vectorizer.vector(features, out=np.empty((1, len(vectorizer.feature_names))))
+            except Exception as e:
+                result = {
+                    'success': False,
+                    'error': str(e)
+                }
+            else:
+                input_row, imputed = vectorized
+                if drift_monitor is not None:
+                    # Imputed features are not what the client sent, so they are not counted
+                    observe_inputs(dataset, model_type, entry, vectorizer.unimputed(input_row, imputed))
+                if prediction_cache is not None and not imputed:
+                    with stage('cache'):
+                        cache_key = prediction_cache_key(dataset, model_type, entry, input_row[0])
+                        cached = prediction_cache.get(cache_key)
+                
+                if cached is not None:
+                    result = dict(cached)
+                elif micro_batcher is not None:
+                    result = predict_coalesced(dataset, model_type, entry, features, vectorized)
+                elif model_type == 'cnn':
+                    result = predict_cnn(entry['model'], entry['model_data'], features, vectorizer, vectorized)
+                else:
+                    result = predict_sklearn(entry['model_data'], features, entry.get('engine'), vectorizer, vectorized)
+            
+            if cached is None and cache_key is not None and result.get('success'):
+                prediction_cache.put(cache_key, dict(result))
         
         # Add feature mapping info to response if available
         if result.get('success') and feature_mapping:
             result['feature_info'] = {
-                name: feature_mapping.get(name, {'display_name': name})
+                name: dict(feature_mapping.get(name, {'display_name': name}))
                 for name in features.keys()
             }
         
@@ -376,11 +1156,15 @@ def get_feature_mapping(dataset):
                 'error': f'Feature mapping file not found for dataset: {dataset}'
             }), 404
         
-        return jsonify({
-            'success': True,
-            'dataset': dataset,
-            'feature_mapping': feature_mapping
-        })
+        return cached_json_response(
+            ('get_feature_mapping', dataset),
+            feature_mapping_version(dataset),
+            lambda: {
+                'success': True,
+                'dataset': dataset,
+                'feature_mapping': {name: dict(info) for name, info in feature_mapping.items()}
+            }
+        )
     
     except Exception as e:
         return jsonify({
@@ -396,12 +1180,17 @@ def batch_predict():
     Expected JSON format:
     {
         "dataset": "k2pandc" or "cumi",
-        "model": "knn", "rf", or "cnn",
+        "model": "knn", "rf", "cnn" or "ensemble",
         "samples": [
             {"feature1": value1, "feature2": value2, ...},
             {"feature1": value1, "feature2": value2, ...}
-        ]
+        ],
+        "format": "records" (default) or "columnar"
     }
+    
+    "columnar" lists the classes once and returns one label and one row of
+    confidence scores per sample instead of a dict per sample. The response
+    can also be MessagePack or (columnar only) Arrow IPC, per the Accept header.
     """
     try:
         data = request.get_json()
@@ -409,6 +1198,7 @@ def batch_predict():
         dataset = data.get('dataset', 'k2pandc')
         model_type = data.get('model', 'knn')
         samples = data.get('samples', [])
+        output_format = data.get('format', request.args.get('format', 'records'))
         
         if not samples:
             return jsonify({
@@ -416,33 +1206,77 @@ def batch_predict():
                 'error': 'No samples provided'
             }), 400
         
-        # Load model
-        if model_type == 'cnn':
-            model_path = MODELS[dataset][model_type]['model']
-            preprocessing_path = MODELS[dataset][model_type]['preprocessing']
-            model, preprocessing_data = load_cnn_model_data(model_path, preprocessing_path)
+        if output_format not in ('records', 'columnar'):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid format. Choose from: records, columnar'
+            }), 400
+        
+        # Validate dataset and model before they become metric labels
+        if dataset not in MODELS:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid dataset. Choose from: {list(MODELS.keys())}'
+            }), 400
+        
+        if model_type not in MODELS[dataset] and model_type != 'ensemble':
+            return jsonify({
+                'success': False,
+                'error': f'Invalid model for {dataset}. Choose from: {list(MODELS[dataset].keys()) + ["ensemble"]}'
+            }), 400
+        
+        g.timer.dataset, g.timer.model = dataset, model_type
+        
+        ensemble_info = {}
+        if model_type == 'ensemble':
+            results, errors, ensemble_info = score_ensemble(dataset, samples)
+            valid_idx = [idx for idx in range(len(samples)) if idx not in errors]
+            if output_format == 'columnar':
+                class_names = list(results[0]['confidence_scores']) if results else []
+                columns = columnar_predictions(
+                    len(samples), valid_idx, [result['prediction'] for result in results], class_names,
+                    [[result['confidence_scores'][name] for name in class_names] for result in results], errors
+                )
+                return columnar_response(columns, errors, ensemble_info)
         else:
-            model_path = MODELS[dataset][model_type]
-            model_data = load_sklearn_model(model_path)
-        
-        # Make predictions
-        predictions = []
-        for idx, features in enumerate(samples):
-            if model_type == 'cnn':
-                result = predict_cnn(model, preprocessing_data, features)
-            else:
-                result = predict_sklearn(model_data, features)
+            # Get resident model
+            with stage('model_load'):
+                entry = model_registry.get(dataset, model_type)
             
-            predictions.append({
+            # Build one matrix for the whole batch; bad rows are reported, not fatal
+            with stage('features'):
+                matrix, errors = build_feature_matrix(entry['model_data']['feature_names'], samples)
+            valid_idx = [idx for idx in range(len(samples)) if idx not in errors]
+            observe_inputs(dataset, model_type, entry, matrix[valid_idx])
+            if output_format == 'columnar':
+                # Probabilities go out as rows of a matrix, never as a dict per sample
+                labels, class_names, scores = [], [], []
+                if valid_idx:
+                    probabilities = predict_proba_parallel(dataset, model_type, entry, matrix[valid_idx])
+                    labels, class_names = decode_predictions(entry, model_type, probabilities)
+                    scores = (probabilities * 100).tolist()
+                columns = columnar_predictions(len(samples), valid_idx, labels, class_names, scores, errors)
+                return columnar_response(columns, errors)
+            results = score_matrix(dataset, model_type, entry, matrix[valid_idx]) if valid_idx else []
+        
+        predictions = [None] * len(samples)
+        for idx, result in zip(valid_idx, results):
+            predictions[idx] = dict(sample=idx, **result)
+        
+        for idx, error in errors.items():
+            predictions[idx] = {
                 'sample': idx,
-                'prediction': result.get('prediction'),
-                'confidence_scores': result.get('confidence_scores')
-            })
+                'prediction': None,
+                'confidence_scores': None,
+                'error': error
+            }
         
-        return jsonify({
+        return negotiated_response({
             'success': True,
             'total_predictions': len(predictions),
-            'predictions': predictions
+            'failed_predictions': len(errors),
+            'predictions': predictions,
+            **ensemble_info
         })
     
     except Exception as e:
@@ -451,6 +1285,423 @@ def batch_predict():
             'error': str(e)
         }), 500
 
+def columnar_predictions(n_samples, valid_idx, labels, class_names, scores, errors):
+    """
+    Columns of a columnar /batch_predict response: one label and one row of
+    confidence scores (in class_names order) per sample, None where the
+    sample failed, plus the failures' messages
+    """
+    predictions = [None] * n_samples
+    confidence_scores = [None] * n_samples
+    for idx, label, row in zip(valid_idx, labels, scores):
+        predictions[idx] = str(label)
+        confidence_scores[idx] = row
+    return {
+        'classes': [str(name) for name in class_names],
+        'predictions': predictions,
+        'confidence_scores': confidence_scores,
+        'errors': [errors.get(idx) for idx in range(n_samples)]
+    }
+
+def columnar_response(columns, errors, extra=None):
+    """Columnar /batch_predict response; as Arrow, one row per sample and one score column per class"""
+    table = {
+        'sample': list(range(len(columns['predictions']))),
+        'prediction': columns['predictions'],
+        'error': columns['errors']
+    }
+    for col, name in enumerate(columns['classes']):
+        table[name] = [row[col] if row is not None else None for row in columns['confidence_scores']]
+    
+    return negotiated_response({
+        'success': True,
+        'format': 'columnar',
+        'total_predictions': len(columns['predictions']),
+        'failed_predictions': len(errors),
+        **columns,
+        **(extra or {})
+    }, table, table_keys=('predictions', 'confidence_scores', 'errors'))
+
+EXPLAIN_METHODS = {
+    'rf': 'path_contributions',
+    'knn': 'neighbor_distance',
+    'cnn': 'gradient_x_input',
+}
+
+def explain_forest(entry):
+    """The entry's FlatForest, built on first use when RF_ENGINE=sklearn left it without one"""
+    engine = entry.get('engine')
+    if isinstance(engine, FlatForest):
+        return engine
+    if 'explain_forest' not in entry:
+        entry['explain_forest'] = FlatForest(entry['model'])
+    return entry['explain_forest']
+
+def explain_matrix(dataset, model_type, entry, matrix, top_k=None):
+    """
+    Score a validated feature matrix and attribute each prediction to its
+    features; one dict per row, with contributions keyed by display name and
+    `ranking` listing those names largest contribution first
+    """
+    feature_names = entry['model_data']['feature_names']
+    feature_mapping = load_feature_mapping(dataset) or {}
+    display_names = [
+        feature_mapping[name]['display_name'] if name in feature_mapping else name
+        for name in feature_names
+    ]
+    
+    input_scaled = scale_matrix(entry, matrix)
+    probabilities = predict_proba_scaled(entry, model_type, input_scaled)
+    labels, class_names = decode_predictions(entry, model_type, probabilities)
+    columns = np.argmax(probabilities, axis=1)
+    rows = np.arange(len(columns))
+    
+    extras = [{} for _ in rows]
+    with stage('explain'):
+        if model_type == 'rf':
+            # Percentage points of the predicted class, like confidence_scores
+            base, contributions = path_contributions(explain_forest(entry), input_scaled)
+            scores = contributions[rows, :, columns] * 100
+            for extra, value in zip(extras, (base[columns] * 100).tolist()):
+                extra['base_value'] = value
+        elif model_type == 'knn':
+            model = entry['model']
+            distances, ids, scores = nearest_neighbors(model, input_scaled, entry.get('engine'))
+            neighbor_labels = entry['model_data']['label_encoder'].inverse_transform(
+                model.classes_[model._y[ids.ravel()]]
+            ).reshape(ids.shape)
+            for extra, row_ids, row_distances, row_labels in zip(
+                    extras, ids.tolist(), distances.tolist(), neighbor_labels.tolist()):
+                extra['neighbors'] = [
+                    {'id': neighbor, 'distance': distance, 'label': str(label)}
+                    for neighbor, distance, label in zip(row_ids, row_distances, row_labels)
+                ]
+        else:
+            scores = gradient_times_input(entry['model'], input_scaled, columns)
+    
+    results = []
+    for label, confidence, row_scores, extra in zip(labels, (probabilities * 100).tolist(), scores, extras):
+        order = np.argsort(-np.abs(row_scores), kind='stable')[:top_k]
+        results.append({
+            'prediction': str(label),
+            'confidence_scores': dict(zip(class_names, confidence)),
+            'contributions': {display_names[col]: float(row_scores[col]) for col in order},
+            'ranking': [display_names[col] for col in order],
+            **extra
+        })
+    return results
+
+@app.route('/explain', methods=['POST'])
+def explain():
+    """
+    Per-feature attributions for predictions
+    
+    Expected JSON format: as /predict ("features") for one sample or as
+    /batch_predict ("samples") for several, with "model" one of "knn", "rf"
+    or "cnn" and an optional "top_k" to return only the largest contributions
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'No JSON data provided'
+            }), 400
+        
+        dataset = data.get('dataset', 'k2pandc')
+        model_type = data.get('model', 'knn')
+        top_k = data.get('top_k')
+        
+        if dataset not in MODELS:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid dataset. Choose from: {list(MODELS.keys())}'
+            }), 400
+        
+        if model_type not in MODELS[dataset] or model_type not in EXPLAIN_METHODS:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid model for {dataset}. Choose from: {[m for m in MODELS[dataset] if m in EXPLAIN_METHODS]}'
+            }), 400
+        
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+            return jsonify({
+                'success': False,
+                'error': 'top_k must be a positive integer'
+            }), 400
+        
+        g.timer.dataset, g.timer.model = dataset, model_type
+        
+        with stage('model_load'):
+            entry = model_registry.get(dataset, model_type)
+        feature_names = entry['model_data']['feature_names']
+        
+        if 'samples' in data:
+            samples = data['samples']
+            if not samples or not isinstance(samples, list):
+                return jsonify({
+                    'success': False,
+                    'error': 'No samples provided'
+                }), 400
+            if len(samples) > app.config['EXPLAIN_MAX_SAMPLES']:
+                return jsonify({
+                    'success': False,
+                    'error': f"At most {app.config['EXPLAIN_MAX_SAMPLES']} samples per request"
+                }), 400
+            
+            with stage('features'):
+                matrix, errors = build_feature_matrix(feature_names, samples)
+            valid_idx = [idx for idx in range(len(samples)) if idx not in errors]
+            results = explain_matrix(dataset, model_type, entry, matrix[valid_idx], top_k) if valid_idx else []
+            
+            explanations = [None] * len(samples)
+            for idx, result in zip(valid_idx, results):
+                explanations[idx] = dict(sample=idx, **result)
+            for idx, error in errors.items():
+                explanations[idx] = {
+                    'sample': idx,
+                    'prediction': None,
+                    'contributions': None,
+                    'error': error
+                }
+            
+            return jsonify({
+                'success': True,
+                'dataset': dataset,
+                'model': model_type,
+                'method': EXPLAIN_METHODS[model_type],
+                'total_explanations': len(explanations),
+                'failed_explanations': len(errors),
+                'explanations': explanations
+            })
+        
+        features = data.get('features', {})
+        if not features:
+            return jsonify({
+                'success': False,
+                'error': 'No features provided'
+            }), 400
+        
+        if not isinstance(features, dict):
+            return jsonify({
+                'success': False,
+                'error': 'features must be an object of feature values'
+            }), 400
+        
+        # Same input handling as /predict, including mean imputation
+        with stage('features'):
+            try:
+                input_row, imputed = entry['vectorizer'].vector(features, out=np.empty((1, len(feature_names))))
+            except ValueError as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        result = explain_matrix(dataset, model_type, entry, input_row, top_k)[0]
+        
+        return jsonify(with_imputed({
+            'success': True,
+            'dataset': dataset,
+            'model': model_type,
+            'method': EXPLAIN_METHODS[model_type],
+            **result
+        }, imputed))
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def chunk_feature_matrix(chunk, feature_names):
+    """Feature matrix for a CSV chunk; unparseable cells become NaN"""
+    return chunk[feature_names].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+def score_csv_chunks(reader, first_chunk, dataset, model_type, entry, id_column):
+    """
+    Yield (row_number, row_id, label, probabilities, error) for every row of a
+    chunked CSV reader. Only one chunk is held in memory at a time.
+    """
+    feature_names = entry['model_data']['feature_names']
+    
+    def chunks():
+        chunk = first_chunk
+        while chunk is not None:
+            with stage('features'):
+                matrix = chunk_feature_matrix(chunk, feature_names)
+            ids = chunk[id_column].astype(object).where(chunk[id_column].notna(), None).tolist() \
+                if id_column else [None] * len(chunk)
+            yield matrix, ids
+            chunk = next(reader, None)
+    return score_feature_chunks(chunks(), dataset, model_type, entry)
+
+def score_columnar_chunks(columns, chunk_rows, dataset, model_type, entry, id_column):
+    """score_csv_chunks over a dataset's columnar copy: chunks are sliced from the mapped columns, not parsed"""
+    feature_names = entry['model_data']['feature_names']
+    
+    def chunks():
+        for start in range(0, columns.rows, chunk_rows):
+            stop = min(start + chunk_rows, columns.rows)
+            with stage('features'):
+                matrix = columns.matrix(feature_names, start, stop)
+            yield matrix, columns.column_values(id_column, start, stop) if id_column else [None] * (stop - start)
+    return score_feature_chunks(chunks(), dataset, model_type, entry)
+
+def score_feature_chunks(chunks, dataset, model_type, entry):
+    """
+    Yield (row_number, row_id, label, probabilities, error) for every row of
+    an iterable of (feature matrix, row ids) chunks
+    """
+    feature_names = entry['model_data']['feature_names']
+    row_offset = 0
+    for matrix, ids in chunks:
+        # inf parses as a number but cannot be scaled
+        invalid = ~np.isfinite(matrix).all(axis=1)
+        valid_idx = np.flatnonzero(~invalid)
+        
+        labels = probabilities = None
+        if len(valid_idx):
+            probabilities = predict_proba_parallel(dataset, model_type, entry, matrix[valid_idx]) * 100
+            labels, _ = decode_predictions(entry, model_type, probabilities)
+        
+        scored = iter(zip(labels, probabilities.tolist())) if labels is not None else iter(())
+        for idx in range(len(matrix)):
+            if invalid[idx]:
+                missing = [feature_names[col] for col in np.flatnonzero(~np.isfinite(matrix[idx]))]
+                yield row_offset + idx, ids[idx], None, None, f'Missing or non-numeric values for features: {missing}'
+            else:
+                label, row = next(scored)
+                yield row_offset + idx, ids[idx], str(label), row, None
+        
+        row_offset += len(matrix)
+
+def prediction_record(row, id_column, class_names):
+    """NDJSON line for one (row_number, row_id, label, probabilities, error) from score_csv_chunks"""
+    row_number, row_id, label, probabilities, error = row
+    record = {'row': row_number}
+    if id_column:
+        record[id_column] = row_id
+    if error:
+        record['error'] = error
+    else:
+        record['prediction'] = label
+        record['confidence_scores'] = dict(zip(class_names, probabilities))
+    return json.dumps(record, default=str) + '\n'
+
+@app.route('/upload_predict', methods=['POST'])
+def upload_predict():
+    """
+    Score a candidate CSV of any size, streaming predictions back as they are made
+    
+    Input (either):
+    - multipart/form-data with `file`: CSV file
+    - a raw text/csv request body
+    
+    Form or query params:
+    - dataset: "k2pandc" or "cumi"
+    - model: "knn", "rf", or "cnn"
+    - format: "ndjson" (default) or "csv"
+    - id_column: optional column echoed back with each prediction
+    
+    The CSV is read and scored in chunks of UPLOAD_PREDICT_CHUNK_ROWS rows,
+    so memory use does not depend on the size of the upload.
+    """
+    try:
+        dataset = request.values.get('dataset', 'k2pandc')
+        model_type = request.values.get('model', 'knn')
+        output_format = request.values.get('format', 'ndjson')
+        id_column = request.values.get('id_column')
+        
+        if dataset not in MODELS or model_type not in MODELS[dataset]:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid dataset/model. Choose from: { {k: list(v.keys()) for k, v in MODELS.items()} }'
+            }), 400
+        
+        if output_format not in ('ndjson', 'csv'):
+            return jsonify({
+                'success': False,
+                'error': 'format must be "ndjson" or "csv"'
+            }), 400
+        
+        g.timer.dataset, g.timer.model = dataset, model_type
+        
+        if 'file' in request.files:
+            # Take ownership of the spooled upload: request teardown closes the
+            # request's files before a streamed response has been generated
+            upload = request.files['file']
+            stream, upload.stream = upload.stream, io.BytesIO()
+        elif request.mimetype == 'text/csv':
+            stream = request.stream
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'No file provided'
+            }), 400
+        
+        entry = model_registry.get(dataset, model_type)
+        feature_names = entry['model_data']['feature_names']
+        
+        reader = pd.read_csv(stream, chunksize=app.config['UPLOAD_PREDICT_CHUNK_ROWS'])
+        first_chunk = next(reader, None)
+        if first_chunk is None:
+            return jsonify({
+                'success': False,
+                'error': 'CSV file is empty'
+            }), 400
+        
+        missing_features = [f for f in feature_names if f not in first_chunk.columns]
+        if missing_features:
+            return jsonify({
+                'success': False,
+                'error': f'Feature columns not found: {missing_features}'
+            }), 400
+        
+        if id_column and id_column not in first_chunk.columns:
+            return jsonify({
+                'success': False,
+                'error': f'ID column "{id_column}" not found in CSV'
+            }), 400
+        
+        class_names = [str(c) for c in entry['model_data']['label_encoder'].classes_]
+        
+        def scored_rows():
+            try:
+                yield from score_csv_chunks(reader, first_chunk, dataset, model_type, entry, id_column)
+            finally:
+                stream.close()
+        rows = scored_rows()
+        
+        def generate_ndjson():
+            total = failed = 0
+            for row in rows:
+                failed += row[4] is not None
+                total += 1
+                yield prediction_record(row, id_column, class_names)
+            yield json.dumps({'done': True, 'total_rows': total, 'failed_rows': failed}) + '\n'
+        
+        def generate_csv():
+            header = ['row'] + ([id_column] if id_column else []) + ['prediction'] + class_names + ['error']
+            yield ','.join(header) + '\n'
+            for row_number, row_id, label, probabilities, error in rows:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(
+                    [row_number] + ([row_id] if id_column else []) +
+                    [label or ''] + (probabilities or [''] * len(class_names)) + [error or '']
+                )
+                yield buffer.getvalue()
+        
+        if output_format == 'csv':
+            return Response(stream_with_context(generate_csv()), mimetype='text/csv')
+        return Response(stream_with_context(generate_ndjson()), mimetype='application/x-ndjson')
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/upload_dataset', methods=['POST'])
 def upload_dataset():
     """
@@ -461,6 +1712,8 @@ def upload_dataset():
     - dataset_name: Custom name for the dataset
     - target_column: Name of the target column
     - feature_columns: Comma-separated list of feature columns (optional, uses all if not specified)
+    - async: "1" to return 202 with a profile_dataset job id instead of profiling
+      the file inside the request (poll /jobs/<job_id>)
     """
     try:
         if 'file' not in request.files:
@@ -504,11 +1757,11 @@ def upload_dataset():
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
-        # Read and validate CSV
-        df = pd.read_csv(filepath)
+        # Validate CSV header
+        columns = list(pd.read_csv(filepath, nrows=0).columns)
         
         # Check if target column exists
-        if target_column not in df.columns:
+        if target_column not in columns:
             os.remove(filepath)
             return jsonify({
                 'success': False,
@@ -518,7 +1771,7 @@ def upload_dataset():
         # Parse feature columns
         if feature_columns:
             features = [f.strip() for f in feature_columns.split(',')]
-            missing_features = [f for f in features if f not in df.columns]
+            missing_features = [f for f in features if f not in columns]
             if missing_features:
                 os.remove(filepath)
                 return jsonify({
@@ -527,49 +1780,22 @@ def upload_dataset():
                 }), 400
         else:
             # Use all columns except target as features
-            features = [col for col in df.columns if col != target_column]
-        
-        # Get dataset statistics
-        total_rows = len(df)
-        total_columns = len(df.columns)
-        missing_values = df.isnull().sum().to_dict()
-        target_distribution = df[target_column].value_counts().to_dict()
-        
-        # Get feature statistics
-        feature_stats = {}
-        for feature in features:
-            if df[feature].dtype in ['int64', 'float64']:
-                feature_stats[feature] = {
-                    'type': 'numeric',
-                    'mean': float(df[feature].mean()),
-                    'std': float(df[feature].std()),
-                    'min': float(df[feature].min()),
-                    'max': float(df[feature].max()),
-                    'missing': int(df[feature].isnull().sum())
-                }
-            else:
-                feature_stats[feature] = {
-                    'type': 'categorical',
-                    'unique_values': int(df[feature].nunique()),
-                    'missing': int(df[feature].isnull().sum())
-                }
+            features = [col for col in columns if col != target_column]
         
-        # Save metadata
-        metadata = {
-            'dataset_name': dataset_name,
-            'filename': filename,
-            'filepath': filepath,
-            'target_column': target_column,
-            'feature_columns': features,
-            'total_rows': total_rows,
-            'total_columns': total_columns,
-            'target_distribution': {str(k): int(v) for k, v in target_distribution.items()},
-            'feature_stats': feature_stats
-        }
+        if request.values.get('async') == '1':
+            job_id = job_queue.submit('profile_dataset', {
+                'dataset_name': dataset_name,
+                'target_column': target_column,
+                'feature_columns': features
+            })
+            return jsonify({
+                'success': True,
+                'message': f'Dataset "{dataset_name}" uploaded; profiling in the background',
+                'job_id': job_id,
+                'status_url': f'/jobs/{job_id}'
+            }), 202
         
-        metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{dataset_name}_metadata.json")
-        with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        metadata = profile_dataset(dataset_name, target_column, features)
         
         return jsonify({
             'success': True,
@@ -583,30 +1809,129 @@ def upload_dataset():
             'error': str(e)
         }), 500
 
+def profile_dataset(dataset_name, target_column, features, progress=None):
+    """
+    Profile an uploaded CSV and write its columnar copy in one chunked pass,
+    then save its metadata and list it in the catalog. `progress(rows)` is
+    called after each chunk.
+    """
+    filename = secure_filename(f"{dataset_name}.csv")
+    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    columns = list(pd.read_csv(filepath, nrows=0).columns)
+    
+    # Get dataset and feature statistics and write the columnar copy in one chunked pass
+    profiler = DatasetProfiler(features, target_column)
+    writer = ColumnarWriter(columnar_path(dataset_name), columns)
+    try:
+        for chunk in pd.read_csv(filepath, chunksize=app.config['DATASET_CHUNK_ROWS']):
+            profiler.update(chunk)
+            writer.append(chunk)
+            if progress is not None:
+                progress(profiler.total_rows)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+    
+    # Save metadata
+    metadata = {
+        'dataset_name': dataset_name,
+        'filename': filename,
+        'filepath': filepath,
+        'columnar_path': columnar_path(dataset_name),
+        'target_column': target_column,
+        'feature_columns': features,
+        'total_rows': profiler.total_rows,
+        'total_columns': len(columns),
+        'target_distribution': profiler.target_distribution(),
+        'feature_stats': profiler.feature_stats()
+    }
+    
+    metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{dataset_name}_metadata.json")
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    dataset_catalog.put(metadata)
+    return metadata
+
+def columnar_path(dataset_name):
+    """Directory holding the memory-mappable columnar copy of an uploaded dataset"""
+    # Sanitized like the CSV's name: the directory gets replaced and deleted with rmtree
+    return os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(f"{dataset_name}_columns"))
+
+def open_columnar_dataset(dataset_name):
+    """Columnar copy of an uploaded dataset, or None for uploads that predate it"""
+    path = columnar_path(dataset_name)
+    if not ColumnarDataset.exists(path):
+        return None
+    return ColumnarDataset(path)
+
+dataset_catalog = DatasetCatalog(app.config['DATASET_CATALOG_PATH'])
+if dataset_catalog.count() == 0:
+    # First start with a catalog: index the uploads that predate it
+    dataset_catalog.rebuild(app.config['UPLOAD_FOLDER'])
+
 @app.route('/list_datasets', methods=['GET'])
 def list_datasets():
-    """List all uploaded custom datasets"""
+    """
+    List uploaded custom datasets, one page at a time
+    
+    Query params:
+    - limit: datasets per page (default 100, max LIST_DATASETS_MAX_LIMIT)
+    - offset: datasets to skip (default 0); prefer `cursor` for deep pages
+    - sort: "name" (default), "rows", "columns" or "uploaded"
+    - order: "asc" (default) or "desc"
+    - name: substring of the dataset name
+    - target_column: exact target column
+    - min_rows / max_rows: row count bounds
+    - cursor: `next_cursor` from a previous page; overrides the params above
+    """
     try:
-        datasets = []
-        
-        # Get all metadata files
-        for filename in os.listdir(app.config['UPLOAD_FOLDER']):
-            if filename.endswith('_metadata.json'):
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                with open(filepath, 'r') as f:
-                    metadata = json.load(f)
-                    datasets.append({
-                        'dataset_name': metadata['dataset_name'],
-                        'total_rows': metadata['total_rows'],
-                        'total_columns': metadata['total_columns'],
-                        'target_column': metadata['target_column'],
-                        'feature_count': len(metadata['feature_columns'])
-                    })
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                state = decode_cursor(cursor)
+                query, after = state['query'], state['after']
+            except Exception:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }), 400
+        else:
+            after = None
+            query = {
+                'limit': request.args.get('limit', 100, type=int),
+                'offset': request.args.get('offset', 0, type=int),
+                'sort': request.args.get('sort', 'name'),
+                'descending': request.args.get('order', 'asc') == 'desc',
+                'name': request.args.get('name'),
+                'target_column': request.args.get('target_column'),
+                'min_rows': request.args.get('min_rows', type=int),
+                'max_rows': request.args.get('max_rows', type=int)
+            }
+        
+        if query['sort'] not in SORT_COLUMNS:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid sort. Choose from: {list(SORT_COLUMNS)}'
+            }), 400
+        query['limit'] = max(min(query['limit'], app.config['LIST_DATASETS_MAX_LIMIT']), 0)
+        query['offset'] = max(query['offset'], 0)
+        
+        datasets, total = dataset_catalog.page(after=after, **query)
+        
+        next_cursor = None
+        if datasets and len(datasets) == query['limit']:
+            last = datasets[-1]
+            next_cursor = encode_cursor({
+                'query': query,
+                'after': [last[SORT_COLUMNS[query['sort']]], last['dataset_name']]
+            })
         
         return jsonify({
             'success': True,
-            'total_datasets': len(datasets),
-            'datasets': datasets
+            'total_datasets': total,
+            'datasets': datasets,
+            'next_cursor': next_cursor
         })
     
     except Exception as e:
@@ -659,6 +1984,13 @@ def delete_dataset(dataset_name):
             os.remove(metadata_path)
             deleted_files.append('metadata file')
         
+        if os.path.exists(columnar_path(dataset_name)):
+            shutil.rmtree(columnar_path(dataset_name))
+            deleted_files.append('columnar copy')
+        
+        if dataset_catalog.remove(dataset_name):
+            deleted_files.append('catalog entry')
+        
         if not deleted_files:
             return jsonify({
                 'success': False,
@@ -699,9 +2031,37 @@ def download_dataset(dataset_name):
             'error': str(e)
         }), 500
 
+def encode_cursor(state):
+    """Opaque pagination token for /preview_dataset and /list_datasets"""
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    padded = token + '=' * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+def dataset_version(dataset_name):
+    """Changes whenever a dataset is re-uploaded, so stale cursors can be rejected"""
+    path = columnar_path(dataset_name)
+    if ColumnarDataset.exists(path):
+        return os.stat(os.path.join(path, 'manifest.json')).st_mtime_ns
+    return os.stat(os.path.join(app.config['UPLOAD_FOLDER'], f"{dataset_name}.csv")).st_mtime_ns
+
 @app.route('/preview_dataset/<dataset_name>', methods=['GET'])
 def preview_dataset(dataset_name):
-    """Preview first few rows of a dataset"""
+    """
+    Browse a dataset one page at a time
+    
+    Query params:
+    - offset: first row to return (default 0)
+    - limit: rows per page (default 10, max PREVIEW_MAX_LIMIT); `rows` is accepted as an alias
+    - columns: comma-separated columns to return (default all)
+    - cursor: `next_cursor` from a previous page; overrides the params above
+    - format: "records" (default, a dict per row) or "columnar" (a list per column)
+    
+    Pages are read straight from the columnar copy, whose fixed-width numeric
+    files and text offset files act as a row index, so a page at the end of
+    the file costs the same as one at the start.
+    """
     try:
         csv_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{dataset_name}.csv")
         
@@ -711,23 +2071,367 @@ def preview_dataset(dataset_name):
                 'error': f'Dataset "{dataset_name}" not found'
             }), 404
         
-        # Read dataset
-        df = pd.read_csv(csv_path)
+        version = dataset_version(dataset_name)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                state = decode_cursor(cursor)
+                offset, limit, columns = state['offset'], state['limit'], state['columns']
+            except Exception:
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }), 400
+            if state.get('version') != version:
+                return jsonify({
+                    'success': False,
+                    'error': 'Cursor is stale: the dataset has changed since it was issued'
+                }), 409
+        else:
+            offset = request.args.get('offset', 0, type=int)
+            limit = request.args.get('limit', request.args.get('rows', 10, type=int), type=int)
+            columns = request.args.get('columns')
+            columns = [c.strip() for c in columns.split(',') if c.strip()] if columns else None
+        
+        offset = max(offset, 0)
+        limit = max(min(limit, app.config['PREVIEW_MAX_LIMIT']), 0)
+        columnar = request.args.get('format', 'records') == 'columnar'
+        
+        dataset = open_columnar_dataset(dataset_name)
+        all_columns = dataset.columns if dataset is not None else list(pd.read_csv(csv_path, nrows=0).columns)
+        if columns:
+            unknown = [c for c in columns if c not in all_columns]
+            if unknown:
+                return jsonify({
+                    'success': False,
+                    'error': f'Columns not found: {unknown}'
+                }), 400
+        selected = columns or all_columns
+        
+        if dataset is not None:
+            # Only the requested rows and columns are read from the memory-mapped files
+            if columnar:
+                preview_data = {name: dataset.column_values(name, offset, offset + limit) for name in selected}
+            else:
+                preview_data = dataset.records(offset, offset + limit, selected)
+            total_rows = dataset.rows
+        else:
+            # Uploads without a columnar copy: parse just the requested range of the CSV
+            df = pd.read_csv(csv_path, skiprows=range(1, offset + 1), nrows=limit, usecols=selected)
+            # Missing cells as None, like the columnar copy gives them
+            df = df.astype(object).where(df.notna(), None)
+            preview_data = df[selected].to_dict(orient='list' if columnar else 'records')
+            metadata_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{dataset_name}_metadata.json")
+            with open(metadata_path, 'r') as f:
+                total_rows = json.load(f)['total_rows']
+        
+        preview_rows = len(next(iter(preview_data.values()), [])) if columnar else len(preview_data)
+        next_offset = offset + preview_rows
+        next_cursor = None
+        if limit and next_offset < total_rows:
+            next_cursor = encode_cursor({
+                'offset': next_offset,
+                'limit': limit,
+                'columns': columns,
+                'version': version
+            })
+        
+        payload = {
+            'success': True,
+            'dataset_name': dataset_name,
+            'total_rows': total_rows,
+            'offset': offset,
+            'limit': limit,
+            'preview_rows': preview_rows,
+            'columns': selected,
+            'data': preview_data,
+            'next_cursor': next_cursor
+        }
+        if columnar:
+            payload['format'] = 'columnar'
+            return negotiated_response(payload, preview_data, table_keys=('data',))
+        return negotiated_response(payload)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+job_queue = JobQueue(
+    app.config['JOB_DB_PATH'],
+    app.config['JOB_RESULTS_FOLDER'],
+    stale_after=app.config['JOB_STALE_SECONDS']
+)
+
+def uploaded_csv_path(dataset_name):
+    return os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(f"{dataset_name}.csv"))
+
+def run_profile_job(queue, job):
+    """profile_dataset job: what /upload_dataset does synchronously"""
+    params = job['params']
+    # Newlines approximate the row count, enough for a progress bar
+    with open(uploaded_csv_path(params['dataset_name']), 'rb') as f:
+        rows_total = max(sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b'')) - 1, 0)
+    queue.progress(job['job_id'], rows_done=0, rows_total=rows_total)
+    metadata = profile_dataset(
+        params['dataset_name'], params['target_column'], params['feature_columns'],
+        progress=lambda rows: queue.progress(job['job_id'], rows_done=rows)
+    )
+    queue.progress(job['job_id'], rows_done=metadata['total_rows'], rows_total=metadata['total_rows'])
+    return {
+        'dataset_name': metadata['dataset_name'],
+        'total_rows': metadata['total_rows'],
+        'total_columns': metadata['total_columns']
+    }
+
+def current_columnar_dataset(dataset_name):
+    """
+    Columnar copy of an uploaded dataset, or None when there is none or it
+    predates the CSV (a re-upload still being profiled in the background)
+    """
+    columns = open_columnar_dataset(dataset_name)
+    if columns is None:
+        return None
+    manifest = os.path.join(columnar_path(dataset_name), 'manifest.json')
+    if os.stat(manifest).st_mtime_ns < os.stat(uploaded_csv_path(dataset_name)).st_mtime_ns:
+        return None
+    return columns
+
+def run_score_job(queue, job):
+    """score_dataset job: score every row of an uploaded dataset into NDJSON result chunks"""
+    params = job['params']
+    dataset, model_type, id_column = params['dataset'], params['model'], params.get('id_column')
+    entry = model_registry.get(dataset, model_type)
+    class_names = [str(c) for c in entry['model_data']['label_encoder'].classes_]
+    chunk_rows = app.config['JOB_CHUNK_ROWS']
+    feature_names = entry['model_data']['feature_names']
+    
+    columns = current_columnar_dataset(params['dataset_name'])
+    if columns is not None:
+        missing_features = [f for f in feature_names if f not in columns.columns]
+        if missing_features:
+            raise ValueError(f'Feature columns not found: {missing_features}')
+        if id_column and id_column not in columns.columns:
+            raise ValueError(f'ID column "{id_column}" not found in CSV')
+        rows = score_columnar_chunks(columns, chunk_rows, dataset, model_type, entry, id_column)
+    else:
+        # Uploads from before the columnar copy are parsed again
+        reader = pd.read_csv(uploaded_csv_path(params['dataset_name']), chunksize=chunk_rows)
+        first_chunk = next(reader, None)
+        if first_chunk is None:
+            raise ValueError('CSV file is empty')
+        missing_features = [f for f in feature_names if f not in first_chunk.columns]
+        if missing_features:
+            raise ValueError(f'Feature columns not found: {missing_features}')
+        if id_column and id_column not in first_chunk.columns:
+            raise ValueError(f'ID column "{id_column}" not found in CSV')
+        rows = score_csv_chunks(reader, first_chunk, dataset, model_type, entry, id_column)
+    
+    # A requeued job starts over and overwrites its chunks
+    queue.progress(job['job_id'], rows_done=0, chunks=0)
+    lines, chunks, total, failed = [], 0, 0, 0
+    for row in rows:
+        lines.append(prediction_record(row, id_column, class_names))
+        failed += row[4] is not None
+        total += 1
+        if len(lines) == chunk_rows:
+            queue.write_chunk(job['job_id'], chunks, lines)
+            chunks += 1
+            lines = []
+            queue.progress(job['job_id'], rows_done=total, chunks=chunks)
+    if lines:
+        queue.write_chunk(job['job_id'], chunks, lines)
+        chunks += 1
+    queue.progress(job['job_id'], rows_done=total, rows_total=total, chunks=chunks)
+    return {'total_rows': total, 'failed_rows': failed, 'chunks': chunks, 'class_names': class_names}
+
+JOB_HANDLERS = {
+    'profile_dataset': run_profile_job,
+    'score_dataset': run_score_job,
+}
+
+def job_summary(job):
+    return {
+        'job_id': job['job_id'],
+        'type': job['job_type'],
+        'params': job['params'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'rows_done': job['rows_done'],
+        'rows_total': job['rows_total'],
+        'chunks': job['chunks'],
+        'result': job['result'],
+        'error': job['error'],
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Queue a background job
+    
+    Expected JSON format:
+    {"type": "profile_dataset", "dataset_name": "my_data", "target_column": "label"}
+    {"type": "score_dataset", "dataset_name": "my_data", "dataset": "k2pandc", "model": "rf", "id_column": "id"}
+    
+    target_column defaults to the uploaded dataset's; results of score_dataset
+    are fetched chunk by chunk from /jobs/<job_id>/results.
+    """
+    try:
+        data = request.get_json() or {}
+        job_type = data.get('type')
+        dataset_name = data.get('dataset_name')
+        
+        if job_type not in JOB_HANDLERS:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid job type. Choose from: {list(JOB_HANDLERS)}'
+            }), 400
+        
+        if not dataset_name or not os.path.exists(uploaded_csv_path(dataset_name)):
+            return jsonify({
+                'success': False,
+                'error': f'Dataset "{dataset_name}" not found'
+            }), 404
+        
+        listed = dataset_catalog.get(dataset_name)
+        if job_type == 'profile_dataset':
+            target_column = data.get('target_column') or (listed or {}).get('target_column')
+            if not target_column:
+                return jsonify({
+                    'success': False,
+                    'error': 'target_column is required'
+                }), 400
+            columns = list(pd.read_csv(uploaded_csv_path(dataset_name), nrows=0).columns)
+            if target_column not in columns:
+                return jsonify({
+                    'success': False,
+                    'error': f'Target column "{target_column}" not found in CSV'
+                }), 400
+            params = {
+                'dataset_name': dataset_name,
+                'target_column': target_column,
+                'feature_columns': [col for col in columns if col != target_column]
+            }
+            rows_total = None
+        else:
+            dataset = data.get('dataset', 'k2pandc')
+            model_type = data.get('model', 'knn')
+            if dataset not in MODELS or model_type not in MODELS[dataset]:
+                return jsonify({
+                    'success': False,
+                    'error': f'Invalid dataset/model. Choose from: { {k: list(v.keys()) for k, v in MODELS.items()} }'
+                }), 400
+            params = {
+                'dataset_name': dataset_name,
+                'dataset': dataset,
+                'model': model_type,
+                'id_column': data.get('id_column')
+            }
+            rows_total = listed['total_rows'] if listed else None
         
-        # Get number of rows to preview (default 10)
-        rows = request.args.get('rows', 10, type=int)
-        rows = min(rows, 100)  # Maximum 100 rows
+        job_id = job_queue.submit(job_type, params, rows_total=rows_total)
+        return jsonify({
+            'success': True,
+            'job': job_summary(job_queue.get(job_id))
+        }), 202
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Most recent jobs first; ?status=queued|running|done|failed|cancelled filters"""
+    try:
+        limit = max(min(request.args.get('limit', 100, type=int), 1000), 0)
+        jobs = job_queue.list(request.args.get('status'), limit)
+        return jsonify({
+            'success': True,
+            'jobs': [job_summary(job) for job in jobs]
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status and progress of one job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job "{job_id}" not found'
+        }), 404
+    return jsonify({
+        'success': True,
+        'job': job_summary(job)
+    })
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def job_results(job_id):
+    """
+    One NDJSON result chunk of a score_dataset job
+    
+    Query params:
+    - chunk: chunk index (default 0); chunks can be fetched while the job runs
+    
+    X-Chunk-Count carries the number of chunks written so far and
+    X-Job-Status the job's status.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job "{job_id}" not found'
+        }), 404
+    
+    index = request.args.get('chunk', 0, type=int)
+    path = job_queue.chunk_path(job_id, index)
+    if index < 0 or index >= job['chunks'] or not os.path.exists(path):
+        finished = job['status'] in ('done', 'failed', 'cancelled')
+        return jsonify({
+            'success': False,
+            'error': f'Chunk {index} does not exist' if finished else f'Chunk {index} is not ready yet',
+            'status': job['status'],
+            'chunks': job['chunks']
+        }), 404 if finished else 409
+    
+    response = send_file(os.path.abspath(path), mimetype='application/x-ndjson')
+    response.headers['X-Chunk-Count'] = str(job['chunks'])
+    response.headers['X-Job-Status'] = job['status']
+    return response
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Cancel a queued or running job, or delete a finished one and its results"""
+    try:
+        job = job_queue.get(job_id)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': f'Job "{job_id}" not found'
+            }), 404
         
-        # Convert to dictionary
-        preview_data = df.head(rows).to_dict(orient='records')
+        if job['status'] in ('queued', 'running'):
+            status = job_queue.cancel(job_id)
+            return jsonify({
+                'success': True,
+                'message': 'Job cancelled' if status == 'cancelled' else 'Cancellation requested',
+                'status': status
+            })
         
+        job_queue.delete(job_id)
         return jsonify({
             'success': True,
-            'dataset_name': dataset_name,
-            'total_rows': len(df),
-            'preview_rows': len(preview_data),
-            'columns': list(df.columns),
-            'data': preview_data
+            'message': f'Job "{job_id}" deleted'
         })
     
     except Exception as e:
@@ -736,5 +2440,64 @@ def preview_dataset(dataset_name):
             'error': str(e)
         }), 500
 
+startup_report = {'import_ms': None, 'warmup': {}}
+
+def parse_warmup(value):
+    """'all' or comma-separated dataset:model pairs, as (dataset, model_type) tuples"""
+    if value.strip() == 'all':
+        return model_registry.keys()
+    pairs = []
+    for item in value.split(','):
+        dataset, _, model_type = item.strip().partition(':')
+        if model_type not in MODELS.get(dataset, {}):
+            raise ValueError(f"Unknown model for warmup: {item.strip()}")
+        pairs.append((dataset, model_type))
+    return pairs
+
+def warmup(pairs):
+    """Load each model and score one row of its training means, recording how long each step took"""
+    for dataset, model_type in pairs:
+        key = f"{dataset}/{model_type}"
+        try:
+            started = time.perf_counter()
+            entry = model_registry.get(dataset, model_type)
+            loaded = time.perf_counter()
+            model_data = entry['model_data']
+            means = model_data['feature_means'][model_data['feature_names']]
+            matrix = means.to_numpy(dtype=np.float64)[np.newaxis, :]
+            decode_predictions(entry, model_type, predict_proba_batch(entry, model_type, matrix))
+            finished = time.perf_counter()
+            startup_report['warmup'][key] = {
+                'load_ms': round((loaded - started) * 1000, 1),
+                'first_inference_ms': round((finished - loaded) * 1000, 1)
+            }
+        except Exception as e:
+            print(f"Error warming up {key}: {e}")
+            startup_report['warmup'][key] = {'error': str(e)}
+
+def print_startup_report():
+    print(f"Startup: imported in {startup_report['import_ms']:.0f} ms")
+    for key, timings in startup_report['warmup'].items():
+        if 'error' in timings:
+            print(f"  {key}: failed ({timings['error']})")
+        else:
+            print(f"  {key}: loaded in {timings['load_ms']:.0f} ms, "
+                  f"first inference {timings['first_inference_ms']:.1f} ms")
+
+startup_report['import_ms'] = round((time.perf_counter() - STARTED) * 1000, 1)
+if app.config['WARMUP']:
+    warmup(parse_warmup(app.config['WARMUP']))
+
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Exoplanet classification API')
+    parser.add_argument('--warmup', metavar='PAIRS',
+                        help="load and run each model once before serving: 'cumi:knn,k2pandc:rf' or 'all'")
+    args = parser.parse_args()
+    if args.warmup:
+        warmup(parse_warmup(args.warmup))
+    print_startup_report()
+    # With the debug reloader, only the process that serves starts workers
+    if app.config['JOB_WORKERS'] > 0 and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_workers(app.config['JOB_WORKERS'])
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
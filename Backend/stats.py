@@ -0,0 +1,184 @@
+import numpy as np
+
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+
+class RunningStats:
+    """Count, mean, variance (Welford/Chan merge), min and max of a numeric stream"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Merge a chunk of non-null float values in one vectorized step"""
+        n = len(values)
+        if n == 0:
+            return
+        chunk_mean = float(values.mean())
+        chunk_m2 = float(((values - chunk_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas)"""
+        if self.count < 2:
+            return float('nan')
+        return (self.m2 / (self.count - 1)) ** 0.5
+
+    def as_dict(self):
+        empty = self.count == 0
+        return {
+            'mean': float('nan') if empty else self.mean,
+            'std': self.std,
+            'min': float('nan') if empty else self.min,
+            'max': float('nan') if empty else self.max,
+        }
+
+
+class DistinctCounter:
+    """
+    Distinct count in constant memory
+
+    Exact (a set of 64-bit hashes) while the column has few distinct values,
+    then a HyperLogLog sketch with 2**precision one-byte registers, read with
+    Ertl's improved estimator so there is no bias dip between the small- and
+    large-range regimes. Values are hashed as parsed, so a column whose chunks
+    parse to different types (5 in one chunk, '5' in another) can overcount.
+    """
+
+    def __init__(self, precision=14, exact_limit=10000):
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.exact = set()
+        self.registers = None
+
+    def update(self, series):
+        """Add a chunk of non-null values"""
+        if len(series) == 0:
+            return
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+        if self.exact is not None:
+            self.exact.update(np.unique(hashes).tolist())
+            if len(self.exact) <= self.exact_limit:
+                return
+            hashes = np.fromiter(self.exact, dtype=np.uint64, count=len(self.exact))
+            self.exact = None
+            self.registers = np.zeros(1 << self.precision, dtype=np.uint8)
+
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # bit_length of the remaining 64-p (< 53) bits is exact through float64 frexp
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        rank = (64 - p - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    @staticmethod
+    def _sigma(x):
+        if x == 1.0:
+            return np.inf
+        y, z = 1.0, x
+        while True:
+            x *= x
+            previous = z
+            z += x * y
+            y += y
+            if z == previous:
+                return z
+
+    @staticmethod
+    def _tau(x):
+        if x == 0.0 or x == 1.0:
+            return 0.0
+        y, z = 1.0, 1.0 - x
+        while True:
+            x = x ** 0.5
+            previous = z
+            y *= 0.5
+            z -= (1.0 - x) ** 2 * y
+            if z == previous:
+                return z / 3
+
+    def count(self):
+        if self.exact is not None:
+            return len(self.exact)
+        m = len(self.registers)
+        q = 64 - self.precision
+        histogram = np.bincount(self.registers, minlength=q + 2).astype(np.float64)
+
+        z = m * self._tau(1.0 - histogram[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + histogram[k])
+        z += m * self._sigma(histogram[0] / m)
+        return int(round(m * m / (2 * np.log(2)) / z))
+
+
+class ColumnProfile:
+    """Per-feature statistics accumulated chunk by chunk"""
+
+    def __init__(self):
+        self.missing = 0
+        self.numeric = True
+        self.stats = RunningStats()
+        self.distinct = DistinctCounter()
+
+    def update(self, series):
+        non_null = series.dropna()
+        self.missing += len(series) - len(non_null)
+        self.distinct.update(non_null)
+        # Same rule as a whole-file read: a column is numeric only if every chunk parsed as int/float
+        if series.dtype.kind not in 'iuf':
+            self.numeric = False
+        if self.numeric:
+            self.stats.update(non_null.to_numpy(dtype=np.float64))
+
+    def as_dict(self):
+        if self.numeric:
+            return dict(type='numeric', **self.stats.as_dict(), missing=self.missing)
+        return {
+            'type': 'categorical',
+            'unique_values': self.distinct.count(),
+            'missing': self.missing
+        }
+
+
+class DatasetProfiler:
+    """
+    Single-pass profile of a dataset read in chunks: row count, target
+    distribution and per-feature statistics. Memory depends on the number of
+    columns, not on the number of rows.
+    """
+
+    def __init__(self, feature_columns, target_column):
+        self.target_column = target_column
+        self.total_rows = 0
+        self.target_counts = {}
+        self.columns = {feature: ColumnProfile() for feature in feature_columns}
+
+    def update(self, chunk):
+        self.total_rows += len(chunk)
+        for value, count in chunk[self.target_column].value_counts().items():
+            key = str(value)
+            self.target_counts[key] = self.target_counts.get(key, 0) + int(count)
+        for feature, profile in self.columns.items():
+            profile.update(chunk[feature])
+
+    def target_distribution(self):
+        return dict(sorted(self.target_counts.items(), key=lambda item: -item[1]))
+
+    def feature_stats(self):
+        return {feature: profile.as_dict() for feature, profile in self.columns.items()}
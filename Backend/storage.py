@@ -0,0 +1,224 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from lazy import LazyModule
+
+pd = LazyModule('pandas')
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+class ColumnarWriter:
+    """
+    Write a dataset, chunk by chunk, as one memory-mappable file set per column
+
+    Numeric columns are a flat little-endian float64 file (NaN = missing).
+    Text columns are Arrow-style: int64 offsets (rows + 1), a UTF-8 data blob
+    and a uint8 validity mask. Files are written to a temporary directory and
+    moved into place by close(), with the manifest written last, so readers
+    never see a half-written dataset.
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.rows = 0
+        self.columns = [
+            {'name': name, 'kind': None, 'integer': True, 'file': str(idx)}
+            for idx, name in enumerate(columns)
+        ]
+        self._text_sizes = {}
+
+    def _file(self, column, suffix):
+        return os.path.join(self.tmp_path, column['file'] + suffix)
+
+    def _append_numeric(self, column, values):
+        with open(self._file(column, '.f8'), 'ab') as f:
+            f.write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+
+    def _start_text(self, column):
+        column['kind'] = 'text'
+        column['integer'] = False
+        self._text_sizes[column['file']] = 0
+        np.zeros(1, dtype='<i8').tofile(self._file(column, '.offsets'))
+        for suffix in ('.data', '.valid'):
+            open(self._file(column, suffix), 'wb').close()
+
+    def _append_text(self, column, series):
+        valid = series.notna().to_numpy()
+        encoded = [str(v).encode('utf-8') if ok else b'' for v, ok in zip(series.tolist(), valid)]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        offsets = self._text_sizes[column['file']] + np.cumsum(lengths)
+        if len(offsets):
+            self._text_sizes[column['file']] = int(offsets[-1])
+
+        with open(self._file(column, '.offsets'), 'ab') as f:
+            f.write(offsets.astype('<i8').tobytes())
+        with open(self._file(column, '.data'), 'ab') as f:
+            f.write(b''.join(encoded))
+        with open(self._file(column, '.valid'), 'ab') as f:
+            f.write(valid.astype(np.uint8).tobytes())
+
+    def _promote_to_text(self, column):
+        """A column inferred as numeric turned out to hold text: rewrite what is stored so far"""
+        path = self._file(column, '.f8')
+        stored = np.fromfile(path, dtype='<f8')
+        os.remove(path)
+        if column['integer']:
+            stored = pd.array(stored).astype('Int64')
+        self._start_text(column)
+        self._append_text(column, pd.Series(stored))
+
+    def append(self, chunk):
+        for column in self.columns:
+            series = chunk[column['name']]
+            numeric = series.dtype.kind in 'iuf'
+            if column['kind'] is None:
+                if numeric:
+                    column['kind'] = 'numeric'
+                    open(self._file(column, '.f8'), 'wb').close()
+                else:
+                    self._start_text(column)
+            elif column['kind'] == 'numeric' and not numeric:
+                self._promote_to_text(column)
+
+            if column['kind'] == 'numeric':
+                column['integer'] = column['integer'] and series.dtype.kind in 'iu'
+                self._append_numeric(column, series.to_numpy(dtype=np.float64))
+            else:
+                self._append_text(column, series)
+        self.rows += len(chunk)
+
+    def close(self):
+        """Publish the dataset and return its manifest"""
+        for column in self.columns:
+            if column['kind'] is None:
+                # No rows at all, like an all-object header-only CSV read
+                self._start_text(column)
+
+        manifest = {'format_version': FORMAT_VERSION, 'rows': self.rows, 'columns': self.columns}
+        with open(os.path.join(self.tmp_path, MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.tmp_path, self.path)
+        return manifest
+
+    def abort(self):
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+def _mmap(path, dtype, count):
+    """Read-only memory map; empty files cannot be mapped, so return an empty array"""
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', shape=(count,))
+
+
+class TextColumn:
+    """Zero-copy view of a text column; only the rows asked for are decoded"""
+
+    def __init__(self, offsets, data, valid):
+        self.offsets = offsets
+        self.data = data
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.valid)
+
+    def values(self, start, stop):
+        start_byte = int(self.offsets[start])
+        blob = bytes(self.data[start_byte:int(self.offsets[stop])])
+        ends = self.offsets[start + 1:stop + 1] - start_byte
+        begins = self.offsets[start:stop] - start_byte
+        return [
+            blob[b:e].decode('utf-8') if ok else None
+            for b, e, ok in zip(begins.tolist(), ends.tolist(), self.valid[start:stop].tolist())
+        ]
+
+
+class ColumnarDataset:
+    """Read side of ColumnarWriter: columns are memory-mapped, never parsed"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.rows = self.manifest['rows']
+        self.columns = [column['name'] for column in self.manifest['columns']]
+        self._specs = {column['name']: column for column in self.manifest['columns']}
+        self._cache = {}
+
+    @staticmethod
+    def exists(path):
+        return os.path.exists(os.path.join(path, MANIFEST))
+
+    def column(self, name):
+        """float64 memmap for numeric columns, TextColumn for text columns"""
+        column = self._cache.get(name)
+        if column is None:
+            spec = self._specs[name]
+            base = os.path.join(self.path, spec['file'])
+            if spec['kind'] == 'numeric':
+                column = _mmap(base + '.f8', '<f8', self.rows)
+            else:
+                data_size = os.path.getsize(base + '.data')
+                column = TextColumn(
+                    _mmap(base + '.offsets', '<i8', self.rows + 1),
+                    _mmap(base + '.data', np.uint8, data_size),
+                    _mmap(base + '.valid', np.uint8, self.rows).view(bool)
+                )
+            self._cache[name] = column
+        return column
+
+    def column_values(self, name, start, stop):
+        """
+        Python values for rows [start, stop) of one column, as a CSV read would
+        give them except that missing cells are None rather than NaN, so a text
+        column stays text (as JSON null, msgpack nil or an Arrow null)
+        """
+        # A last page may run past the end; text columns index offsets[stop] directly
+        stop = min(stop, self.rows)
+        start = min(start, stop)
+        column = self.column(name)
+        if isinstance(column, TextColumn):
+            return column.values(start, stop)
+        values = column[start:stop]
+        if self._specs[name]['integer']:
+            return values.astype(np.int64).tolist()
+        result = values.tolist()
+        for idx in np.flatnonzero(np.isnan(values)).tolist():
+            result[idx] = None
+        return result
+
+    def records(self, start=0, stop=None, columns=None):
+        """Rows [start, stop) as a list of dicts, reading only the requested columns"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        start = min(start, stop)
+        columns = columns or self.columns
+        values = [self.column_values(name, start, stop) for name in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def matrix(self, columns, start=0, stop=None):
+        """
+        float64 matrix of columns for rows [start, stop), e.g. for scoring. Text
+        columns are parsed like pd.to_numeric(errors='coerce'): cells that are
+        not numbers become NaN.
+        """
+        stop = self.rows if stop is None else min(stop, self.rows)
+        start = min(start, stop)
+        matrix = np.empty((stop - start, len(columns)))
+        for col, name in enumerate(columns):
+            column = self.column(name)
+            if isinstance(column, TextColumn):
+                values = pd.Series(column.values(start, stop), dtype=object)
+                matrix[:, col] = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                matrix[:, col] = column[start:stop]
+        return matrix
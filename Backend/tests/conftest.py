@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The backend modules import each other as top-level modules (python server.py is run from Backend/)
+sys.path.insert(0, BACKEND)
+
+
+@pytest.fixture(scope='session')
+def server(tmp_path_factory):
+    """server.py with its uploads, dataset catalog and job queue in a temporary folder"""
+    workdir = tmp_path_factory.mktemp('server')
+    overrides = {
+        'DATASET_CATALOG_PATH': str(workdir / 'catalog.sqlite3'),
+        'JOB_DB_PATH': str(workdir / 'jobs.sqlite3'),
+        'JOB_RESULTS_FOLDER': str(workdir / 'jobs'),
+    }
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    cwd = os.getcwd()
+    # server.py creates ./uploads when imported
+    os.chdir(workdir)
+    try:
+        import server
+    finally:
+        os.chdir(cwd)
+    server.app.config['UPLOAD_FOLDER'] = str(workdir / 'uploads')
+    # The shipped models, in place of the deployment paths in MODELS
+    server.MODELS['k2pandc']['rf'] = os.path.join(BACKEND, 'rf_model_k2_dispo.pkl')
+    server.MODELS['k2pandc']['knn'] = os.path.join(BACKEND, 'knn_model_k2_dispo.pkl')
+    yield server
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
+
+@pytest.fixture(scope='session')
+def client(server):
+    return server.app.test_client()
+
+
+@pytest.fixture(scope='session')
+def upload(client):
+    """upload(name, text, target_column) posts CSV text to /upload_dataset"""
+    def post(name, text, target_column='label'):
+        response = client.post('/upload_dataset', data={
+            'dataset_name': name,
+            'target_column': target_column,
+            'file': (io.BytesIO(text.encode()), f'{name}.csv'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+    return post
@@ -0,0 +1,98 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from artifact import ArtifactError, artifact_path, artifact_version, export_artifact, load_artifact, load_model_file
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 5))
+    y = np.where(X[:, 0] > 0, 'CONFIRMED', 'FALSE POSITIVE')
+    label_encoder = LabelEncoder().fit(y)
+    scaler = StandardScaler().fit(X)
+    model_data = {
+        'model': KNeighborsClassifier(n_neighbors=5).fit(scaler.transform(X), label_encoder.transform(y)),
+        'scaler': scaler,
+        'label_encoder': label_encoder,
+        'feature_names': [f'f{i}' for i in range(5)],
+    }
+    path = str(tmp_path / 'model.pkl')
+    with open(path, 'wb') as f:
+        pickle.dump(model_data, f)
+    return path
+
+
+def test_round_trip_predicts_the_same(model_path):
+    export_artifact(model_path)
+    loaded, content_hash = load_model_file(model_path)
+    with open(model_path, 'rb') as f:
+        original = pickle.load(f)
+    assert content_hash is not None
+    assert loaded['feature_names'] == original['feature_names']
+    X = np.random.default_rng(1).normal(size=(30, 5))
+    np.testing.assert_array_equal(loaded['model'].predict_proba(loaded['scaler'].transform(X)),
+                                  original['model'].predict_proba(original['scaler'].transform(X)))
+    # The training rows are served straight from the mapping
+    assert not loaded['model']._fit_X.flags.writeable
+
+
+def test_without_artifact_loads_the_pickle(model_path):
+    model_data, content_hash = load_model_file(model_path)
+    assert content_hash is None
+    assert 'model' in model_data
+    assert artifact_version(model_path) is None
+
+
+def test_corrupt_artifact_is_rejected(model_path):
+    path = export_artifact(model_path)
+    with open(path, 'r+b') as f:
+        f.seek(-1, os.SEEK_END)
+        last = f.read(1)
+        f.seek(-1, os.SEEK_END)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
+    # load_model_file falls back to the pickle
+    _, content_hash = load_model_file(model_path)
+    assert content_hash is None
+
+
+def test_artifact_from_an_older_pickle_is_ignored(model_path):
+    export_artifact(model_path)
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    model_data['feature_names'] = ['a', 'b', 'c', 'd', 'e']
+    with open(model_path, 'wb') as f:
+        pickle.dump(model_data, f)
+    loaded, content_hash = load_model_file(model_path)
+    assert content_hash is None
+    assert loaded['feature_names'] == ['a', 'b', 'c', 'd', 'e']
+
+
+def test_version_changes_on_reexport(model_path):
+    export_artifact(model_path)
+    first = artifact_version(model_path)
+    assert first is not None and first[1] == load_model_file(model_path)[1]
+
+    with open(model_path, 'rb') as f:
+        model_data = pickle.load(f)
+    model_data['feature_names'] = ['a', 'b', 'c', 'd', 'e']
+    with open(model_path, 'wb') as f:
+        pickle.dump(model_data, f)
+    export_artifact(model_path)
+    assert artifact_version(model_path)[1] != first[1]
+
+
+def test_not_an_artifact(tmp_path):
+    path = str(tmp_path / 'model.artifact')
+    with open(path, 'wb') as f:
+        f.write(b'not an artifact at all')
+    with pytest.raises(ArtifactError):
+        load_artifact(path)
+    assert artifact_path(str(tmp_path / 'model.pkl')) == path
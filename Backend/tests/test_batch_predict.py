@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture(scope='module')
+def features(client):
+    return client.get('/get_features?dataset=k2pandc&model=rf').get_json()['feature_defaults']
+
+
+@pytest.mark.parametrize('model', ['rf', 'ensemble'])
+@pytest.mark.parametrize('value', ['inf', '-Infinity', 1e999])
+def test_infinite_values_fail_per_row(client, features, model, value):
+    name = next(iter(features))
+    samples = [features, dict(features, **{name: value}), features]
+    response = client.post('/batch_predict', json={'dataset': 'k2pandc', 'model': model, 'samples': samples})
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['failed_predictions'] == 1
+    failed = body['predictions'][1]
+    assert failed['prediction'] is None and name in failed['error']
+    assert body['predictions'][0]['prediction'] == body['predictions'][2]['prediction'] is not None
+
+
+def test_infinite_values_fail_per_row_columnar(client, features):
+    name = next(iter(features))
+    samples = [dict(features, **{name: 'inf'}), features]
+    body = client.post('/batch_predict', json={'dataset': 'k2pandc', 'model': 'rf', 'samples': samples,
+                                               'format': 'columnar'}).get_json()
+    assert body['success']
+    assert body['predictions'][0] is None and name in body['errors'][0]
+    assert body['predictions'][1] is not None and body['errors'][1] is None
+
+
+@pytest.mark.parametrize('dataset, model', [('zzz', 'rf'), ('k2pandc', 'zzz')])
+def test_unknown_dataset_or_model_is_rejected(client, features, dataset, model):
+    response = client.post('/batch_predict', json={'dataset': dataset, 'model': model, 'samples': [features]})
+    assert response.status_code == 400
+    assert 'Invalid' in response.get_json()['error']
+    # Client input never becomes a metric label
+    assert 'zzz' not in client.get('/metrics').get_data(as_text=True)
@@ -0,0 +1,54 @@
+import time
+
+import numpy as np
+
+from cache import PredictionCache, feature_digest
+
+
+def test_digest_canonicalizes_values():
+    assert feature_digest([1, 0.0, 2.5]) == feature_digest(np.array([1.0, -0.0, 2.5]))
+    noisy = np.nextafter(np.array([1.0, 2.0, 3.0]), np.inf)
+    assert feature_digest(noisy) == feature_digest([1.0, 2.0, 3.0])
+    assert feature_digest([1.0, 2.0, 3.0]) != feature_digest([1.0, 2.0, 3.001])
+    assert feature_digest([1.0, 2.0]) != feature_digest([2.0, 1.0])
+
+
+def test_lru_eviction_respects_the_byte_bound():
+    value = {'prediction': 'CONFIRMED', 'confidence': 0.9}
+    cache = PredictionCache(max_bytes=3 * (len('{"prediction": "CONFIRMED", "confidence": 0.9}')
+                                           + PredictionCache.ENTRY_OVERHEAD))
+    for key in 'abc':
+        cache.put(key, value)
+    assert cache.get('a') == value
+    cache.put('d', value)
+    # 'b' was the least recently used
+    assert cache.get('b') is None
+    assert cache.get('a') == value
+    assert cache.evictions == 1
+    assert cache.size_bytes <= cache.max_bytes
+
+
+def test_entries_expire():
+    cache = PredictionCache(ttl=0.01)
+    cache.put('a', {'x': 1})
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.expirations == 1
+
+
+def test_oversized_values_are_not_stored():
+    cache = PredictionCache(max_bytes=100)
+    cache.put('a', {'x': 'y' * 1000})
+    assert cache.get('a') is None
+    assert cache.size_bytes == 0
+
+
+def test_invalidate_by_dataset_and_model():
+    cache = PredictionCache()
+    for key in [('k2', 'rf', 1, 'x'), ('k2', 'knn', 1, 'x'), ('toi', 'rf', 1, 'x')]:
+        cache.put(key, {'x': 1})
+    assert cache.invalidate('k2', 'rf') == 1
+    assert cache.get(('k2', 'knn', 1, 'x')) == {'x': 1}
+    assert cache.invalidate('k2') == 1
+    assert cache.invalidate() == 1
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pytest
+
+from cnn_runtime import load_cnn_runtime, _softmax
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Keras predictions for fixed inputs, saved when the shipped exports were made
+REFERENCE = os.path.join(BACKEND, 'tests', 'data', 'cnn_keras_reference.npz')
+MODELS = ['best_model_k2', 'best_model_cummi']
+
+
+@pytest.fixture(scope='module')
+def reference():
+    with np.load(REFERENCE) as f:
+        return dict(f)
+
+
+def runtime(name):
+    model = load_cnn_runtime(os.path.join(BACKEND, f'{name}.keras'))
+    assert model is not None, f'{name}.cnn.npz is missing or was exported from another {name}.keras'
+    return model
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_matches_keras_reference(reference, name):
+    probabilities = runtime(name).predict(reference[f'{name}_inputs'])
+    expected = reference[f'{name}_probabilities']
+    np.testing.assert_allclose(probabilities, expected, atol=1e-5)
+    np.testing.assert_array_equal(probabilities.argmax(axis=1), expected.argmax(axis=1))
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_batch_size_does_not_change_results(reference, name):
+    model = runtime(name)
+    x = reference[f'{name}_inputs']
+    single = np.vstack([model.predict(x[i:i + 1]) for i in range(len(x))])
+    np.testing.assert_allclose(model.predict(x), single, atol=1e-6)
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_logits_are_pre_activation(reference, name):
+    model = runtime(name)
+    x = reference[f'{name}_inputs']
+    if model.layers[-1].get('activation') != 'softmax':
+        pytest.skip('output layer is not a softmax')
+    np.testing.assert_allclose(_softmax(model.predict(x, logits=True)), model.predict(x), atol=1e-6)
+
+
+@pytest.mark.parametrize('name', MODELS)
+def test_matches_live_keras(name):
+    load_model = pytest.importorskip('tensorflow.keras.models').load_model
+    keras_model = load_model(os.path.join(BACKEND, f'{name}.keras'))
+    x = np.random.default_rng(1).normal(0, 1.5, (256, keras_model.input_shape[1], 1)).astype(np.float32)
+    np.testing.assert_allclose(runtime(name).predict(x), keras_model.predict(x, verbose=0), atol=1e-5)
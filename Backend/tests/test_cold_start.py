@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+import server
+client = server.app.test_client()
+for path in ('/models', '/list_datasets', '/startup_stats'):
+    assert client.get(path).status_code == 200, path
+print('loaded:', *[name for name in ('sklearn', 'pandas', 'scipy', 'tensorflow') if name in sys.modules])
+"""
+
+
+def test_import_and_light_routes_skip_heavy_modules(tmp_path):
+    env = dict(os.environ,
+               DATASET_CATALOG_PATH=str(tmp_path / 'catalog.sqlite3'),
+               JOB_DB_PATH=str(tmp_path / 'jobs.sqlite3'),
+               JOB_RESULTS_FOLDER=str(tmp_path / 'jobs'))
+    # A fresh interpreter: the test session itself has imported sklearn already
+    result = subprocess.run([sys.executable, '-c', SCRIPT, BACKEND], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == 'loaded:', result.stdout
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from drift import FeatureSketch
+
+
+@pytest.fixture(scope='module')
+def training():
+    return np.random.default_rng(0).normal([10.0, -3.0], [2.0, 0.5], size=(5000, 2))
+
+
+def sketch(training, reference=True):
+    scaler = StandardScaler().fit(training)
+    means = {'a': float(training[:, 0].mean()), 'b': float(training[:, 1].mean())}
+    return FeatureSketch(['a', 'b'], scaler.mean_, scaler.scale_, means,
+                         scaler.transform(training) if reference else None)
+
+
+def test_moments_skip_missing_values(training):
+    live = training[:1000].copy()
+    live[::7, 1] = np.nan
+    s = sketch(training)
+    s.update(live[:400])
+    s.update(live[400:])
+    report = s.report()
+    assert report['rows'] == 1000
+    b = report['features']['b']
+    observed = live[:, 1][~np.isnan(live[:, 1])]
+    assert b['count'] == len(observed)
+    assert b['mean'] == pytest.approx(observed.mean(), rel=1e-12)
+    assert b['std'] == pytest.approx(observed.std(), rel=1e-9)
+
+
+def test_training_data_does_not_drift(training):
+    s = sketch(training)
+    s.update(training)
+    report = s.report(min_samples=100)
+    assert report['reference'] == 'training_sample'
+    assert report['max_psi'] == pytest.approx(0, abs=1e-9)
+    assert report['drifted_features'] == []
+
+
+@pytest.mark.parametrize('reference', [True, False])
+def test_shift_is_flagged(training, reference):
+    s = sketch(training, reference)
+    s.update(training[:2000] + [2.0, 0.0])
+    report = s.report(min_samples=100, psi_threshold=0.25)
+    assert report['drifted_features'] == ['a']
+    assert report['features']['a']['mean_shift'] == pytest.approx(1.0, abs=0.1)
+
+
+def test_too_few_samples_are_not_scored(training):
+    s = sketch(training)
+    s.update(training[:10])
+    stats = s.report(min_samples=100)['features']['a']
+    assert stats['psi'] is None and stats['drifted'] is None
+
+
+def test_predict_does_not_count_imputed_features(server, client):
+    server.drift_monitor.reset()
+    features = client.get('/get_features?dataset=k2pandc&model=rf').get_json()['feature_defaults']
+    missing = next(iter(features))
+    partial = dict(features, **{missing: None})
+    for sample in (features, partial):
+        assert client.post('/predict', json={'dataset': 'k2pandc', 'model': 'rf', 'features': sample}).get_json()['success']
+    counts = client.get('/drift?dataset=k2pandc&model=rf').get_json()['models']['k2pandc/rf']['features']
+    assert counts[missing]['count'] == 1
+    assert all(stats['count'] == 2 for name, stats in counts.items() if name != missing)
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from explain import path_contributions
+from flat_forest import FlatForest
+
+
+def test_path_contributions_sum_to_predict_proba():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = np.where(X[:, 0] + X[:, 2] > 0, 'CONFIRMED', 'FALSE POSITIVE')
+    y[rng.random(400) < 0.2] = 'CANDIDATE'
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(X, y)
+    samples = rng.normal(size=(50, 6))
+    base, contributions = path_contributions(FlatForest(model), samples)
+    assert contributions.shape == (50, 6, 3)
+    np.testing.assert_allclose(base + contributions.sum(axis=1), model.predict_proba(samples), rtol=0, atol=1e-12)
+
+
+@pytest.fixture(scope='module')
+def features(client):
+    return client.get('/get_features?dataset=k2pandc&model=rf').get_json()['feature_defaults']
+
+
+def explain(client, **body):
+    return client.post('/explain', json=dict({'dataset': 'k2pandc', 'model': 'rf'}, **body))
+
+
+def test_rf_attributions_add_up_to_the_prediction(client, features):
+    response = explain(client, features=features)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['success'] and body['model'] == 'rf' and body['method']
+    assert set(body['contributions']) == set(body['ranking'])
+    assert len(body['ranking']) == len(features)
+    confidence = body['confidence_scores'][body['prediction']]
+    assert body['base_value'] + sum(body['contributions'].values()) == pytest.approx(confidence, abs=1e-9)
+    assert confidence == max(body['confidence_scores'].values())
+
+
+def test_top_k_keeps_the_largest(client, features):
+    full = explain(client, features=features).get_json()
+    body = explain(client, features=features, top_k=3).get_json()
+    assert body['ranking'] == full['ranking'][:3]
+    # JSON objects come back with sorted keys; `ranking` carries the order
+    assert set(body['contributions']) == set(body['ranking'])
+    sizes = [abs(body['contributions'][name]) for name in body['ranking']]
+    assert sizes == sorted(sizes, reverse=True)
+
+
+def test_batch_reports_bad_samples_per_row(client, features):
+    name = next(iter(features))
+    body = explain(client, samples=[features, dict(features, **{name: 'oops'})]).get_json()
+    assert body['total_explanations'] == 2 and body['failed_explanations'] == 1
+    good, bad = body['explanations']
+    assert good['sample'] == 0 and good['prediction'] is not None
+    assert good['base_value'] + sum(good['contributions'].values()) == pytest.approx(
+        good['confidence_scores'][good['prediction']], abs=1e-9)
+    assert bad['sample'] == 1 and bad['contributions'] is None and name in bad['error']
+
+
+def test_knn_lists_its_neighbors(client, features):
+    body = explain(client, model='knn', features=features).get_json()
+    assert body['success'], body
+    distances = [neighbor['distance'] for neighbor in body['neighbors']]
+    assert len(distances) == 5 and distances == sorted(distances)
+    assert all(neighbor['label'] in body['confidence_scores'] for neighbor in body['neighbors'])
+
+
+@pytest.mark.parametrize('body', [
+    {'features': {}},
+    {'features': 'not-a-dict'},
+    {'samples': []},
+    {'model': 'zzz'},
+    {'top_k': 0},
+])
+def test_bad_requests(client, features, body):
+    if 'features' not in body and 'samples' not in body:
+        body = dict(body, features=features)
+    response = explain(client, **body)
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+
+
+def test_bad_sample_is_rejected(client, features):
+    name = next(iter(features))
+    response = explain(client, features=dict(features, **{name: 'oops'}))
+    assert response.status_code == 400
+    assert name in response.get_json()['error']
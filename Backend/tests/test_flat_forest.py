@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from flat_forest import FlatForest
+
+
+@pytest.fixture(scope='module')
+def model():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 8))
+    y = np.where(X[:, 0] + X[:, 1] ** 2 + rng.normal(scale=0.5, size=600) > 1, 'CONFIRMED', 'FALSE POSITIVE')
+    y[rng.random(600) < 0.2] = 'CANDIDATE'
+    return RandomForestClassifier(n_estimators=25, max_depth=12, random_state=0).fit(X, y)
+
+
+@pytest.mark.parametrize('n_rows', [1, 7, 300])
+def test_predict_proba_is_bit_identical(model, n_rows):
+    X = np.random.default_rng(n_rows).normal(size=(n_rows, 8))
+    forest = FlatForest(model)
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_inputs_on_thresholds(model):
+    # Values exactly on (and one float32 step around) a split go the way sklearn sends them
+    forest = FlatForest(model)
+    tree = model.estimators_[0].tree_
+    split = np.flatnonzero(tree.children_left != -1)[:20]
+    X = np.zeros((len(split) * 3, 8))
+    for i, node in enumerate(split):
+        threshold = np.float32(tree.threshold[node])
+        for j, value in enumerate((threshold, np.nextafter(threshold, np.float32(-np.inf)),
+                                   np.nextafter(threshold, np.float32(np.inf)))):
+            X[3 * i + j, tree.feature[node]] = value
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_predict_matches_labels(model):
+    X = np.random.default_rng(1).normal(size=(50, 8))
+    labels, proba = FlatForest(model).predict(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_array_equal(proba, model.predict_proba(X))
+
+
+def test_large_batches_go_to_sklearn(model):
+    X = np.random.default_rng(2).normal(size=(40, 8))
+    forest = FlatForest(model, max_rows=10)
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_leaves_match_apply(model):
+    X = np.random.default_rng(3).normal(size=(30, 8))
+    forest = FlatForest(model)
+    expected = model.apply(X.astype(np.float32)) + forest.roots
+    np.testing.assert_array_equal(forest.leaves(X), expected)
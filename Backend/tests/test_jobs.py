@@ -0,0 +1,137 @@
+import contextlib
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from jobs import run_worker
+
+ROWS = 25
+CHUNK_ROWS = 10
+
+
+@contextlib.contextmanager
+def worker(server):
+    """An in-process job worker for the server's queue, stopped on exit"""
+    stop = threading.Event()
+    thread = threading.Thread(target=run_worker, args=(server.job_queue, server.JOB_HANDLERS, 0.05, stop), daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join(timeout=10)
+
+
+def wait_for(client, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f'/jobs/{job_id}').get_json()['job']
+        if job['status'] in ('done', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def score(server, client, dataset_name):
+    """Run a score_dataset job over an upload, in CHUNK_ROWS-row chunks, to completion"""
+    chunk_rows = server.app.config['JOB_CHUNK_ROWS']
+    server.app.config['JOB_CHUNK_ROWS'] = CHUNK_ROWS
+    try:
+        response = client.post('/jobs', json={
+            'type': 'score_dataset', 'dataset_name': dataset_name,
+            'dataset': 'k2pandc', 'model': 'rf', 'id_column': 'id'
+        })
+        assert response.status_code == 202, response.get_json()
+        with worker(server):
+            return wait_for(client, response.get_json()['job']['job_id'])
+    finally:
+        server.app.config['JOB_CHUNK_ROWS'] = chunk_rows
+
+
+@pytest.fixture(scope='module')
+def scored(server, client, upload):
+    """A finished score_dataset job over a ROWS-row upload, in CHUNK_ROWS-row chunks"""
+    defaults = client.get('/get_features?dataset=k2pandc&model=rf').get_json()['feature_defaults']
+    names = list(defaults)
+    lines = [','.join(['id'] + names + ['label'])]
+    for i in range(ROWS):
+        values = [str(defaults[name] * (1 + i / 100)) for name in names]
+        if i == 7:
+            values[0] = 'oops'
+        if i == 12:
+            values[0] = 'inf'
+        lines.append(','.join([f'obj-{i}'] + values + ['CANDIDATE']))
+    upload('jobs_scoring', '\n'.join(lines) + '\n')
+
+    job = score(server, client, 'jobs_scoring')
+    yield job
+    client.delete(f"/jobs/{job['job_id']}")
+    client.delete('/delete_dataset/jobs_scoring')
+
+
+def chunk(client, job_id, index):
+    return client.get(f'/jobs/{job_id}/results?chunk={index}')
+
+
+def test_job_finishes_with_partial_last_chunk(scored):
+    assert scored['status'] == 'done', scored
+    assert scored['chunks'] == 3
+    assert scored['result']['total_rows'] == ROWS
+    assert scored['result']['failed_rows'] == 2
+
+
+def test_chunks_hold_every_row_once_in_order(client, scored):
+    records = []
+    for index in range(scored['chunks']):
+        response = chunk(client, scored['job_id'], index)
+        assert response.status_code == 200
+        assert response.headers['X-Chunk-Count'] == '3'
+        assert response.headers['X-Job-Status'] == 'done'
+        lines = response.get_data(as_text=True).splitlines()
+        assert len(lines) == (CHUNK_ROWS if index < 2 else ROWS - 2 * CHUNK_ROWS)
+        records += [json.loads(line) for line in lines]
+    assert [record['id'] for record in records] == [f'obj-{i}' for i in range(ROWS)]
+    for i in (7, 12):
+        assert 'error' in records[i] and 'prediction' not in records[i]
+    assert all('prediction' in record for i, record in enumerate(records) if i not in (7, 12))
+
+
+@pytest.mark.parametrize('index', [3, -1])
+def test_chunks_out_of_range(client, scored, index):
+    response = chunk(client, scored['job_id'], index)
+    assert response.status_code == 404
+    assert response.get_json()['chunks'] == 3
+
+
+def test_csv_fallback_scores_like_the_columnar_copy(server, client, scored):
+    assert server.current_columnar_dataset('jobs_scoring') is not None
+    # A CSV newer than its columnar copy (a re-upload still being profiled) is parsed instead
+    manifest = os.path.join(server.columnar_path('jobs_scoring'), 'manifest.json')
+    newer = os.stat(manifest).st_mtime_ns + 1
+    os.utime(server.uploaded_csv_path('jobs_scoring'), ns=(newer, newer))
+    assert server.current_columnar_dataset('jobs_scoring') is None
+
+    job = score(server, client, 'jobs_scoring')
+    assert job['status'] == 'done', job
+    assert job['result'] == scored['result']
+    for index in range(scored['chunks']):
+        assert chunk(client, job['job_id'], index).get_data() == chunk(client, scored['job_id'], index).get_data()
+    client.delete(f"/jobs/{job['job_id']}")
+
+
+def test_unknown_job(client):
+    assert chunk(client, 'no-such-job', 0).status_code == 404
+
+
+def test_chunk_of_a_queued_job_is_not_ready(server, client, upload):
+    upload('jobs_queued', 'x,label\n1,0\n')
+    # No worker runs outside `scored`, so the job stays queued
+    job_id = server.job_queue.submit('score_dataset', {'dataset_name': 'jobs_queued', 'dataset': 'k2pandc', 'model': 'rf'})
+    response = chunk(client, job_id, 0)
+    assert response.status_code == 409
+    assert response.get_json()['status'] == 'queued'
+    client.delete(f'/jobs/{job_id}')
+    client.delete('/delete_dataset/jobs_queued')
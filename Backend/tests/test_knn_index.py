@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+
+from knn_index import KnnIndex
+
+
+@pytest.fixture(scope='module')
+def model():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 6))
+    y = rng.integers(0, 3, size=400)
+    return KNeighborsClassifier(n_neighbors=7).fit(X, y)
+
+
+@pytest.fixture(scope='module')
+def queries():
+    return np.random.default_rng(1).normal(size=(50, 6))
+
+
+def test_exact_matches_sklearn(model, queries):
+    index = KnnIndex.from_model(model)
+    squared, ids = index.kneighbors(queries)
+    distances, expected_ids = model.kneighbors(queries)
+    np.testing.assert_allclose(np.sqrt(squared), distances, rtol=1e-9, atol=1e-9)
+    assert (np.sort(ids, axis=1) == np.sort(expected_ids, axis=1)).all()
+    np.testing.assert_array_equal(index.predict_proba(queries), model.predict_proba(queries))
+
+
+@pytest.mark.parametrize('n_queries', [1, 50])
+def test_ivf_probing_every_cell_is_exact(model, queries, n_queries):
+    index = KnnIndex.from_model(model, nlist=8, nprobe=8)
+    np.testing.assert_array_equal(index.predict_proba(queries[:n_queries]), model.predict_proba(queries[:n_queries]))
+
+
+@pytest.mark.parametrize('n_queries', [1, 50])
+def test_ivf_small_cells_return_real_neighbors(model, queries, n_queries):
+    # ~2 rows per cell: one probed cell never holds k = 7 rows
+    index = KnnIndex.from_model(model, nlist=200, nprobe=1)
+    squared, ids = index.kneighbors(queries[:n_queries])
+    assert np.isfinite(squared).all()
+    assert all(len(set(row)) == model.n_neighbors for row in ids.tolist())
+    # The vote is over the returned rows, with no placeholder votes for row 0
+    votes = index.labels[ids]
+    expected = np.stack([np.bincount(row, minlength=3) for row in votes]) / model.n_neighbors
+    np.testing.assert_array_equal(index.predict_proba(queries[:n_queries]), expected)
+
+
+def test_ivf_distances_are_true_distances(model, queries):
+    index = KnnIndex.from_model(model, nlist=20, nprobe=2)
+    squared, ids = index.kneighbors(queries)
+    direct = ((index.data[ids] - queries[:, np.newaxis, :]) ** 2).sum(axis=2)
+    np.testing.assert_allclose(squared, direct, rtol=1e-9, atol=1e-9)
+    assert (np.diff(squared, axis=1) >= 0).all()
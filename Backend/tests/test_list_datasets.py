@@ -0,0 +1,71 @@
+import pytest
+
+# name -> rows; two pairs tie on the row count, so paging by rows relies on the name tie-break
+DATASETS = {'ld_a': 5, 'ld_b': 3, 'ld_c': 5, 'ld_d': 1, 'ld_e': 3}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def datasets(client, upload):
+    for name, rows in DATASETS.items():
+        upload(name, 'x,label\n' + ''.join(f'{i},{i % 2}\n' for i in range(rows)))
+    yield
+    for name in DATASETS:
+        client.delete(f'/delete_dataset/{name}')
+
+
+def walk(client, query):
+    """Every page of /list_datasets?<query>, following next_cursor"""
+    pages = [client.get(f'/list_datasets?{query}').get_json()]
+    while pages[-1]['next_cursor']:
+        pages.append(client.get(f"/list_datasets?cursor={pages[-1]['next_cursor']}").get_json())
+    assert all(page['success'] for page in pages), pages
+    return pages
+
+
+def names(pages):
+    return [d['dataset_name'] for page in pages for d in page['datasets']]
+
+
+def test_cursor_walk_by_name(client):
+    pages = walk(client, 'name=ld_&limit=2')
+    assert names(pages) == sorted(DATASETS)
+    assert [len(page['datasets']) for page in pages] == [2, 2, 1]
+    assert all(page['total_datasets'] == len(DATASETS) for page in pages)
+
+
+def test_exact_multiple_ends_with_an_empty_page(client):
+    pages = walk(client, 'name=ld_&limit=5')
+    assert [len(page['datasets']) for page in pages] == [5, 0]
+    assert pages[-1]['next_cursor'] is None
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+def test_cursor_walk_by_rows_breaks_ties_by_name(client, order):
+    expected = sorted(DATASETS, key=lambda name: (DATASETS[name], name), reverse=order == 'desc')
+    for limit in (1, 2, 3):
+        assert names(walk(client, f'name=ld_&sort=rows&order={order}&limit={limit}')) == expected
+
+
+def test_cursor_matches_offset_paging(client):
+    by_offset = []
+    for offset in range(0, len(DATASETS), 2):
+        body = client.get(f'/list_datasets?name=ld_&sort=rows&limit=2&offset={offset}').get_json()
+        by_offset += [d['dataset_name'] for d in body['datasets']]
+    assert by_offset == names(walk(client, 'name=ld_&sort=rows&limit=2'))
+
+
+def test_filters(client):
+    body = client.get('/list_datasets?name=ld_&min_rows=3&max_rows=4').get_json()
+    assert [d['dataset_name'] for d in body['datasets']] == ['ld_b', 'ld_e']
+    assert body['total_datasets'] == 2
+
+
+def test_deleted_dataset_leaves_the_listing(client, upload):
+    upload('ld_gone', 'x,label\n1,0\n')
+    client.delete('/delete_dataset/ld_gone')
+    assert 'ld_gone' not in names(walk(client, 'name=ld_'))
+
+
+def test_bad_requests(client):
+    assert client.get('/list_datasets?cursor=not-a-cursor').status_code == 400
+    assert client.get('/list_datasets?sort=size').status_code == 400
@@ -0,0 +1,117 @@
+import shutil
+
+import pytest
+
+ROWS = 25
+
+
+def csv_text(rows=ROWS):
+    return 'id,name,score,label\n' + ''.join(
+        f'{i},name-{i},{i * 0.5},{"CONFIRMED" if i % 2 else "CANDIDATE"}\n' for i in range(rows)
+    )
+
+
+@pytest.fixture(scope='module')
+def dataset(client, upload):
+    upload('preview_paging', csv_text())
+    yield 'preview_paging'
+    client.delete('/delete_dataset/preview_paging')
+
+
+@pytest.mark.parametrize('output_format', ['records', 'columnar'])
+def test_partial_last_page(client, dataset, output_format):
+    body = client.get(
+        f'/preview_dataset/{dataset}?offset=20&limit=10&columns=id,name&format={output_format}'
+    ).get_json()
+    assert body['success'], body
+    assert body['preview_rows'] == 5
+    assert body['next_cursor'] is None
+    if output_format == 'columnar':
+        assert body['data'] == {'id': list(range(20, 25)), 'name': [f'name-{i}' for i in range(20, 25)]}
+    else:
+        assert body['data'] == [{'id': i, 'name': f'name-{i}'} for i in range(20, 25)]
+
+
+@pytest.mark.parametrize('output_format', ['records', 'columnar'])
+def test_offset_past_the_end(client, dataset, output_format):
+    body = client.get(f'/preview_dataset/{dataset}?offset=40&limit=10&format={output_format}').get_json()
+    assert body['success'], body
+    assert body['preview_rows'] == 0
+    assert body['next_cursor'] is None
+
+
+@pytest.mark.parametrize('output_format', ['records', 'columnar'])
+def test_cursor_walks_every_row_once(client, dataset, output_format):
+    ids, pages = [], 0
+    url = f'/preview_dataset/{dataset}?limit=10&columns=id,name&format={output_format}'
+    while url:
+        body = client.get(url).get_json()
+        assert body['success'], body
+        ids += body['data']['id'] if output_format == 'columnar' else [row['id'] for row in body['data']]
+        pages += 1
+        cursor = body['next_cursor']
+        url = f'/preview_dataset/{dataset}?cursor={cursor}&format={output_format}' if cursor else None
+    assert ids == list(range(ROWS))
+    assert pages == 3
+
+
+def test_cursor_goes_stale_on_reupload(client, upload):
+    upload('preview_stale', csv_text())
+    cursor = client.get('/preview_dataset/preview_stale?limit=10').get_json()['next_cursor']
+    upload('preview_stale', csv_text(rows=30))
+    assert client.get(f'/preview_dataset/preview_stale?cursor={cursor}').status_code == 409
+    client.delete('/delete_dataset/preview_stale')
+
+
+def test_unknown_column(client, dataset):
+    assert client.get(f'/preview_dataset/{dataset}?columns=id,nope').status_code == 400
+
+
+GAPPY = 'id,name,score,label\n0,a,0.5,CONFIRMED\n1,,,CANDIDATE\n2,c,1.5,CONFIRMED\n'
+GAPPY_COLUMNS = {'id': [0, 1, 2], 'name': ['a', None, 'c'], 'score': [0.5, None, 1.5]}
+
+
+@pytest.fixture(scope='module', params=['columnar copy', 'csv'])
+def gappy(request, server, client, upload):
+    """A dataset with missing text and numeric cells, served from its columnar copy or (legacy) the CSV"""
+    name = 'preview_gappy_' + request.param.split()[0]
+    upload(name, GAPPY)
+    if request.param == 'csv':
+        shutil.rmtree(server.columnar_path(name))
+    yield name
+    client.delete(f'/delete_dataset/{name}')
+
+
+def gappy_url(name, output_format):
+    return f'/preview_dataset/{name}?columns=id,name,score&format={output_format}'
+
+
+@pytest.mark.parametrize('output_format', ['records', 'columnar'])
+def test_missing_cells_are_null_in_json(client, gappy, output_format):
+    body = client.get(gappy_url(gappy, output_format)).get_json()
+    if output_format == 'columnar':
+        assert body['data'] == GAPPY_COLUMNS
+    else:
+        assert body['data'] == [dict(zip(GAPPY_COLUMNS, row)) for row in zip(*GAPPY_COLUMNS.values())]
+
+
+@pytest.mark.parametrize('output_format', ['records', 'columnar'])
+def test_missing_cells_are_nil_in_msgpack(client, gappy, output_format):
+    msgpack = pytest.importorskip('msgpack')
+    response = client.get(gappy_url(gappy, output_format), headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    data = msgpack.unpackb(response.get_data())['data']
+    if output_format == 'columnar':
+        assert data == GAPPY_COLUMNS
+    else:
+        assert [row['name'] for row in data] == GAPPY_COLUMNS['name']
+
+
+def test_missing_cells_are_null_in_arrow(client, gappy):
+    pa = pytest.importorskip('pyarrow')
+    response = client.get(gappy_url(gappy, 'columnar'), headers={'Accept': 'application/vnd.apache.arrow.stream'})
+    assert response.status_code == 200, response.get_data()
+    assert response.mimetype == 'application/vnd.apache.arrow.stream'
+    table = pa.ipc.open_stream(response.get_data()).read_all()
+    assert table.schema.field('name').type == pa.string()
+    assert table.to_pydict() == GAPPY_COLUMNS
@@ -0,0 +1,24 @@
+import os
+import shutil
+
+
+def test_dataset_name_cannot_escape_the_upload_folder(server, client, upload):
+    outside = os.path.dirname(os.path.abspath(server.app.config['UPLOAD_FOLDER']))
+    victim = os.path.join(outside, 'victim_columns')
+    os.makedirs(victim, exist_ok=True)
+    with open(os.path.join(victim, 'keep.txt'), 'w') as f:
+        f.write('keep')
+
+    upload('../victim', 'id,score,label\n1,0.5,CANDIDATE\n2,1.5,CONFIRMED\n')
+    assert os.listdir(victim) == ['keep.txt']
+    assert server.columnar_path('../victim').startswith(os.path.join(server.app.config['UPLOAD_FOLDER'], ''))
+    assert os.path.isdir(server.columnar_path('../victim'))
+
+    # /delete_dataset/<name> cannot route a name with a slash
+    shutil.rmtree(server.columnar_path('../victim'))
+    os.remove(os.path.join(server.app.config['UPLOAD_FOLDER'], 'victim.csv'))
+    server.dataset_catalog.remove('../victim')
+    shutil.rmtree(victim)
+    for leftover in (os.path.join(outside, 'victim_metadata.json'),):
+        if os.path.exists(leftover):
+            os.remove(leftover)
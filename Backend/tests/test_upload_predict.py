@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+
+@pytest.fixture(scope='module')
+def csv_text(client):
+    defaults = client.get('/get_features?dataset=k2pandc&model=rf').get_json()['feature_defaults']
+    names = list(defaults)
+    lines = [','.join(['id'] + names)]
+    for i, first in enumerate([defaults[names[0]], 'inf', '-inf', '', defaults[names[0]]]):
+        lines.append(','.join([f'obj-{i}', str(first)] + [str(defaults[name]) for name in names[1:]]))
+    return names, '\n'.join(lines) + '\n'
+
+
+def test_non_finite_cells_fail_per_row(client, csv_text):
+    names, text = csv_text
+    response = client.post('/upload_predict?dataset=k2pandc&model=rf&id_column=id',
+                           data=text, content_type='text/csv')
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert records[-1] == {'done': True, 'total_rows': 5, 'failed_rows': 3}
+    for record in records[1:4]:
+        assert 'prediction' not in record and names[0] in record['error']
+    assert records[0]['prediction'] == records[4]['prediction']
@@ -0,0 +1,154 @@
+import gc
+import math
+import multiprocessing
+import threading
+
+import numpy as np
+
+# Set in the parent before forking; children inherit them (and every model
+# the registry holds) copy-on-write instead of loading their own copies.
+_registry = None
+_score_fn = None
+
+
+class StaleModelError(RuntimeError):
+    pass
+
+
+def _score_chunk(key, version, matrix):
+    """Runs in a child: score a slice with the model inherited from the parent"""
+    # No registry lock here: one another parent thread held at fork time is never released in the child
+    entry = _registry.resident(*key)
+    if entry is None or entry['version'] != version:
+        raise StaleModelError(f"{key[0]}/{key[1]} changed since the pool was forked")
+    return _score_fn(entry, key[1], matrix)
+
+
+class InferencePool:
+    """
+    Pre-forked processes that score large batches across cores
+
+    The pool is forked on the first batch it is given, not at import. Before
+    forking, the parent loads every scikit-learn model in the registry. The RF
+    tree arrays and the KNN training matrix are numpy buffers that nothing
+    writes to, so the children share the parent's physical pages instead of
+    holding their own copies; gc.freeze() keeps the collector from touching
+    (and so copying) the inherited objects. Keras models are not fork-safe
+    and always run in the parent.
+
+    The parent is multithreaded by then, so a child only runs code that takes
+    no lock another thread could have held at fork time: it reads the model
+    with registry.resident() and scores with `score_fn`, which must not
+    record metrics or load anything.
+
+    When the registry reloads a model the pool is re-forked on its next use
+    so the children see the new version; a child that still has the old one
+    refuses the work (StaleModelError) rather than returning stale results.
+    Batches already running on the old pool finish there: it is closed once
+    the last of them returns.
+    """
+
+    def __init__(self, registry, score_fn, processes, min_rows=512):
+        global _registry, _score_fn
+        _registry = registry
+        _score_fn = score_fn
+        self.registry = registry
+        self.processes = processes
+        self.min_rows = min_rows
+        self.batches = 0
+        self.rows = 0
+        self.restarts = 0
+        self._pool = None
+        self._stale = False
+        # Batches in flight per pool, current or retired
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def _fork(self):
+        """Load every scikit-learn model and fork a new pool; called with the lock held"""
+        # Cleared first, so a reload while the models load marks the new pool stale again
+        self._stale = False
+        for dataset, model_type in self.registry.keys():
+            if model_type == 'cnn':
+                continue
+            try:
+                self.registry.get(dataset, model_type)
+            except Exception as e:
+                print(f"Error loading model {dataset}/{model_type} for worker pool: {e}")
+        gc.collect()
+        gc.freeze()
+        return multiprocessing.get_context('fork').Pool(self.processes)
+
+    def mark_stale(self, *_):
+        """Registry reload listener: re-fork before the next batch"""
+        # No lock: reloads can run inside _fork's model loads, which hold it
+        self._stale = True
+
+    def accepts(self, model_type, rows):
+        return model_type != 'cnn' and rows >= self.min_rows
+
+    def _acquire(self):
+        """The current pool, forked first if there is none or it is stale, with one more batch on it"""
+        retired = None
+        with self._lock:
+            if self._pool is None or self._stale:
+                old = self._pool
+                self._pool = self._fork()
+                if old is not None:
+                    self.restarts += 1
+                    if not self._leases.get(old):
+                        self._leases.pop(old, None)
+                        retired = old
+            pool = self._pool
+            self._leases[pool] = self._leases.get(pool, 0) + 1
+        if retired is not None:
+            self._shutdown(retired)
+        return pool
+
+    def _release(self, pool):
+        with self._lock:
+            self._leases[pool] -= 1
+            retired = pool is not self._pool and not self._leases[pool]
+            if retired:
+                del self._leases[pool]
+        if retired:
+            self._shutdown(pool)
+
+    @staticmethod
+    def _shutdown(pool):
+        # No batch is running on it, so its children are idle and exit at once
+        pool.close()
+        pool.join()
+
+    def predict_proba(self, key, version, matrix):
+        """Split a matrix across the children and stack their probability matrices"""
+        pool = self._acquire()
+        try:
+            parts = min(self.processes, math.ceil(len(matrix) / self.min_rows))
+            chunks = np.array_split(matrix, parts)
+            results = pool.starmap(_score_chunk, [(key, version, chunk) for chunk in chunks])
+        finally:
+            self._release(pool)
+        with self._lock:
+            self.batches += 1
+            self.rows += len(matrix)
+        return np.vstack(results)
+
+    def stats(self):
+        return {
+            'processes': self.processes,
+            'min_rows': self.min_rows,
+            'started': self._pool is not None,
+            'batches': self.batches,
+            'rows': self.rows,
+            'restarts': self.restarts,
+        }
+
+    def close(self):
+        with self._lock:
+            pools = list(self._leases)
+            self._pool = None
+            self._leases = {}
+        for pool in pools:
+            pool.terminate()
+            pool.join()